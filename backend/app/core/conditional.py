@@ -0,0 +1,165 @@
+# app/core/conditional.py
+"""Conditional requests (ETag / Last-Modified) for read endpoints.
+
+Every read endpoint listed in `_CONDITIONAL_RE` is a pure function of the
+request (method, path, query, body), the caller's developer ids and the
+data. The data only changes when an import lands and bumps the data versions,
+so an ETag over those inputs identifies the response without computing it.
+Besides the caller's developers it includes the global version: names of IMVU
+users (buyers, recipients) come from rows any developer's import may update. A request whose `If-None-Match` matches gets a
+304 straight from the middleware: no route runs and the database is never
+touched. Browsers send `If-None-Match` on their own for GET; clients of the
+POST endpoints echo the ETag they were given.
+
+The middleware only acts when the developer ids are known without a query
+(from a current token claim or the scope cache); otherwise the request passes
+through untouched.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from email.utils import formatdate, parsedate_to_datetime
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.data_version import data_epoch, get_data_modified, get_data_version
+from app.security.developer_scope import peek_user_developer_ids
+
+_CONDITIONAL_RE = re.compile(
+    r"^/(?:analytics/.+"
+    r"|dashboard/summary"
+    r"|graph/.+"
+    r"|(?:buyer|recipient|product)/(?:list|options)"
+    r"|income_transaction/list"
+    r"|imvu_user/list)$"
+)
+
+# Larger bodies are not buffered for hashing; such requests pass through
+_MAX_BODY = 64 * 1024
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # weak comparison: W/"x" and "x" match
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def _not_modified_since(header: str, last_modified: int) -> bool:
+    try:
+        return parsedate_to_datetime(header).timestamp() >= last_modified
+    except (TypeError, ValueError):
+        return False
+
+
+class ConditionalRequestMiddleware:
+    """Pure ASGI middleware answering revalidations of read endpoints with 304.
+
+    Must run inside `AuthMiddleware`, which provides the principal.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD", "POST"):
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        root_path = (scope.get("root_path") or "").rstrip("/")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):] or "/"
+        principal = scope.get("state", {}).get("principal")
+        if principal is None or not _CONDITIONAL_RE.match(path):
+            await self.app(scope, receive, send)
+            return
+        developer_ids = peek_user_developer_ids(principal)
+        if developer_ids is None:
+            await self.app(scope, receive, send)
+            return
+
+        # Buffer the body so it can be hashed and then replayed to the app
+        chunks: list[bytes] = []
+        size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] != "http.request":
+                await self.app(scope, _replay(chunks, receive, pending=message), send)
+                return
+            chunk = message.get("body", b"")
+            chunks.append(chunk)
+            size += len(chunk)
+            more_body = message.get("more_body", False)
+            if size > _MAX_BODY and more_body:
+                await self.app(scope, _replay(chunks, receive), send)
+                return
+        body = b"".join(chunks)
+
+        developer_ids = sorted(set(developer_ids))
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{data_epoch()}|{scope['method']}|{path}|".encode())
+        digest.update(scope.get("query_string", b""))
+        digest.update(b"|")
+        digest.update(f"{get_data_version()}|".encode())
+        digest.update(",".join(f"{did}:{get_data_version(did)}" for did in developer_ids).encode())
+        digest.update(b"|")
+        digest.update(body)
+        etag = f'W/"{digest.hexdigest()}"'
+        # must move whenever the ETag does, so it follows the global version too
+        last_modified = get_data_modified()
+
+        validators = [
+            (b"etag", etag.encode("latin-1")),
+            (b"last-modified", formatdate(last_modified, usegmt=True).encode("latin-1")),
+            (b"cache-control", b"private, no-cache"),
+            (b"vary", b"Authorization"),
+        ]
+
+        headers = Headers(scope=scope)
+        if_none_match = headers.get("if-none-match")
+        if if_none_match is not None:
+            not_modified = _etag_matches(if_none_match, etag)
+        else:
+            # If-Modified-Since only has second resolution, so it is honoured for GET alone
+            if_modified_since = headers.get("if-modified-since")
+            not_modified = (
+                scope["method"] in ("GET", "HEAD")
+                and if_modified_since is not None
+                and _not_modified_since(if_modified_since, last_modified)
+            )
+        if not_modified:
+            await send({"type": "http.response.start", "status": 304, "headers": validators})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_validators(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                response_headers = MutableHeaders(scope=message)
+                if "etag" not in response_headers:
+                    for name, value in validators:
+                        response_headers.append(name.decode("latin-1"), value.decode("latin-1"))
+            await send(message)
+
+        await self.app(scope, _replay([body], receive, complete=True), send_with_validators)
+
+
+def _replay(chunks: list[bytes], receive: Receive, *, complete: bool = False, pending: Message | None = None) -> Receive:
+    """A `receive` that yields the buffered body chunks first, then falls back to `receive`."""
+    queue: list[Message] = [{"type": "http.request", "body": chunk, "more_body": True} for chunk in chunks]
+    if complete:
+        queue[-1]["more_body"] = False
+    if pending is not None:
+        queue.append(pending)
+
+    async def replay() -> Message:
+        if queue:
+            return queue.pop(0)
+        return await receive()
+
+    return replay
@@ -3,7 +3,7 @@ from __future__ import annotations
 import os
 from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
 import yaml
 from pydantic import BaseModel, Field
@@ -23,11 +23,23 @@ class MySQLConfig(BaseModel):
     password: str = ""
     db: str = "imvu_insight"
     echo: bool = False
+    # List totals: "separate" COUNT query, or "window" COUNT(*) OVER () on the page query (MySQL 8+)
+    pagination_count: Literal["separate", "window"] = "separate"
+
+
+class CacheConfig(BaseModel):
+    # Directory for caches shared by all worker processes (mmap-ed files).
+    # Empty: /dev/shm (or the temp dir) + "imvu-insight-<mysql.db>".
+    shared_dir: str = ""
+    # Per-process result cache of the read services (see app/core/query_cache.py)
+    query_cache_max_entries: int = 4096
+    query_cache_max_mb: int = 64
 
 
 class Settings(BaseModel):
     app: AppConfig = Field(default_factory=AppConfig)
     mysql: MySQLConfig = Field(default_factory=MySQLConfig)
+    cache: CacheConfig = Field(default_factory=CacheConfig)
 
     @property
     def sqlalchemy_database_uri(self) -> str:
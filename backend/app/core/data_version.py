@@ -0,0 +1,45 @@
+"""Per-developer data version counters.
+
+The import pipeline bumps the version of every developer it touched. In-process
+caches stamp what they build with the version they saw and rebuild lazily once
+it moves, so no cache needs to be told explicitly about an import.
+
+The counters are `SharedCounters` (a small memory-mapped file under
+`shared_dir()`), so an import handled by one worker process invalidates the
+caches of all of them. Developers are hashed into a fixed number of slots; two
+developers sharing a slot only cost each other a spurious rebuild.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from app.core.shared_state import SharedCounters
+
+SLOTS = 4096  # slot 0 is the global version
+
+_counters = SharedCounters("data_version.v2", SLOTS)
+
+
+def _slot(developer_id: int | None) -> int:
+    return 0 if developer_id is None else 1 + int(developer_id) % (SLOTS - 1)
+
+
+def bump_data_version(developer_ids: Iterable[int | None]) -> None:
+    """Advance the version of each given developer (and the global version)."""
+    _counters.bump({0} | {_slot(did) for did in developer_ids if did is not None})
+
+
+def get_data_version(developer_id: int | None = None) -> int:
+    """Return the version of `developer_id`, or the global version when None."""
+    return _counters.get(_slot(developer_id))
+
+
+def get_data_modified(developer_id: int | None = None) -> int:
+    """Unix time of the last bump of `developer_id` (or of any developer when None)."""
+    return _counters.modified(_slot(developer_id)) or _counters.created_at
+
+
+def data_epoch() -> int:
+    """Random id of the current counter file; changes whenever the counters start over."""
+    return _counters.epoch
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from collections.abc import AsyncIterator
 
-from sqlalchemy import text
+from sqlalchemy import inspect, text
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -31,5 +31,17 @@ async def get_db_session() -> AsyncIterator[AsyncSession]:
         yield session
 
 
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Dependency for routes that open several sessions of their own (e.g. to query concurrently)."""
+    return SessionLocal
+
+
 async def check_db_connection(session: AsyncSession) -> None:
     await session.execute(text("SELECT 1"))
+
+
+async def missing_tables(*names: str) -> list[str]:
+    """Those of `names` that do not exist yet (created by `alembic upgrade head`)."""
+    async with engine.connect() as conn:
+        existing = await conn.run_sync(lambda sync_conn: set(inspect(sync_conn).get_table_names()))
+    return [name for name in names if name not in existing]
@@ -0,0 +1,84 @@
+"""HyperLogLog sketches for approximate distinct counts.
+
+A sketch is a `uint8` array of `REGISTERS` registers. Sketches of different
+days (or developers) merge with an element-wise maximum, so a distinct count
+over any range is the estimate of the merged sketch. With `PRECISION = 14`
+the standard error is 1.04 / sqrt(2**14), about 0.8%.
+"""
+
+from __future__ import annotations
+
+import zlib
+from typing import Iterable
+
+import numpy as np
+
+PRECISION = 14
+REGISTERS = 1 << PRECISION
+_VALUE_BITS = 64 - PRECISION
+
+
+def _hash64(values: np.ndarray) -> np.ndarray:
+    """splitmix64 finaliser: well-mixed 64-bit hashes of integer ids."""
+    with np.errstate(over="ignore"):
+        x = values.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+
+def empty() -> np.ndarray:
+    return np.zeros(REGISTERS, dtype=np.uint8)
+
+
+def _index_rank(ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Register index and rank (position of the first set bit) of each id."""
+    h = _hash64(ids)
+    index = (h >> np.uint64(_VALUE_BITS)).astype(np.intp)
+    rest = h & np.uint64((1 << _VALUE_BITS) - 1)
+    # bit length via frexp is exact: `rest` < 2**50 fits a float64 mantissa
+    _, bit_length = np.frexp(rest.astype(np.float64))
+    return index, (_VALUE_BITS + 1 - bit_length).astype(np.uint8)
+
+
+def add(registers: np.ndarray, ids: Iterable[int] | np.ndarray) -> np.ndarray:
+    """Add integer ids to `registers` in place and return it."""
+    ids = np.asarray(ids if isinstance(ids, np.ndarray) else list(ids), dtype=np.int64)
+    if ids.size:
+        index, rank = _index_rank(ids)
+        np.maximum.at(registers, index, rank)
+    return registers
+
+
+def add_grouped(registers: np.ndarray, groups: np.ndarray, ids: np.ndarray) -> np.ndarray:
+    """Add `ids[i]` to sketch `registers[groups[i]]` of a 2-D (group, register) array, in place."""
+    if ids.size:
+        index, rank = _index_rank(ids.astype(np.int64))
+        np.maximum.at(registers, (groups, index), rank)
+    return registers
+
+
+def merge(sketches: Iterable[np.ndarray]) -> np.ndarray:
+    merged = empty()
+    for registers in sketches:
+        np.maximum(merged, registers, out=merged)
+    return merged
+
+
+def estimate(registers: np.ndarray) -> int:
+    m = float(REGISTERS)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / float(np.ldexp(1.0, -registers.astype(np.int64)).sum())
+    zeros = int(np.count_nonzero(registers == 0))
+    if raw <= 2.5 * m and zeros:
+        # linear counting is more accurate for small cardinalities
+        return int(round(m * np.log(m / zeros)))
+    return int(round(raw))
+
+
+def encode(registers: np.ndarray) -> bytes:
+    return zlib.compress(registers.tobytes(), 6)
+
+
+def decode(blob: bytes) -> np.ndarray:
+    return np.frombuffer(zlib.decompress(blob), dtype=np.uint8)
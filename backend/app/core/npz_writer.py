@@ -0,0 +1,68 @@
+"""Write NumPy `.npz` archives column by column from streamed batches.
+
+`np.savez` needs every array in memory. `ChunkedNpzWriter` instead appends
+each batch's columns to one spill file per column and, on `close`, writes the
+final `.npy` headers (the row count is only known then) and copies the spill
+files into a deflate-compressed zip. Memory stays bounded by one batch. The
+result loads with `np.load(path)` like any other `.npz`.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+import zipfile
+from typing import Dict, Mapping
+
+import numpy as np
+
+_COPY_CHUNK = 1 << 20
+
+
+class ChunkedNpzWriter:
+    def __init__(self, path: str, dtypes: Mapping[str, np.dtype]) -> None:
+        self.path = path
+        self.dtypes: Dict[str, np.dtype] = {name: np.dtype(dt) for name, dt in dtypes.items()}
+        self.rows = 0
+        self._spill_dir = tempfile.mkdtemp(prefix="npz-")
+        self._spills = {
+            name: open(os.path.join(self._spill_dir, f"{i}.bin"), "wb") for i, name in enumerate(self.dtypes)
+        }
+
+    def append(self, columns: Mapping[str, np.ndarray]) -> None:
+        """Append one batch; every declared column must be present with the same length."""
+        lengths = {len(columns[name]) for name in self.dtypes}
+        if len(lengths) != 1:
+            raise ValueError("All columns of a batch must have the same length")
+        for name, dtype in self.dtypes.items():
+            self._spills[name].write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+        self.rows += lengths.pop()
+
+    def close(self, extra: Mapping[str, np.ndarray] | None = None) -> None:
+        """Assemble the archive; `extra` holds small in-memory arrays stored as-is."""
+        try:
+            for f in self._spills.values():
+                f.close()
+            with zipfile.ZipFile(self.path, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as zf:
+                for i, (name, dtype) in enumerate(self.dtypes.items()):
+                    header = {
+                        "descr": np.lib.format.dtype_to_descr(dtype),
+                        "fortran_order": False,
+                        "shape": (self.rows,),
+                    }
+                    with zf.open(f"{name}.npy", "w", force_zip64=True) as member:
+                        np.lib.format.write_array_header_2_0(member, header)
+                        with open(os.path.join(self._spill_dir, f"{i}.bin"), "rb") as spill:
+                            shutil.copyfileobj(spill, member, _COPY_CHUNK)
+                for name, array in (extra or {}).items():
+                    with zf.open(f"{name}.npy", "w", force_zip64=True) as member:
+                        np.lib.format.write_array(member, np.asanyarray(array), allow_pickle=False)
+        finally:
+            self.discard()
+
+    def discard(self) -> None:
+        """Drop the spill files (called by `close`; use directly to abandon a write)."""
+        for f in self._spills.values():
+            f.close()
+        shutil.rmtree(self._spill_dir, ignore_errors=True)
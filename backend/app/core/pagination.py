@@ -0,0 +1,75 @@
+"""Page queries with their total row count.
+
+Two strategies, chosen by `mysql.pagination_count`:
+
+- "separate" (default): the page query, then a `COUNT` query with the same
+  filters; two round trips and the filters are evaluated twice.
+- "window": the page query also selects `COUNT(*) OVER ()`, so the total
+  arrives with the rows in one round trip (needs MySQL 8+). A page past the
+  end has no rows to carry it, so that case still runs the `COUNT` query.
+
+`fetch_page` hides the difference and returns rows in the shape the caller
+asked for, so list services keep their return types whatever the mode.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, List, Literal, Optional, Tuple
+
+from sqlalchemy import Select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+
+CountMode = Literal["separate", "window"]
+RowShape = Literal["scalars", "mappings", "tuples"]
+
+_TOTAL_LABEL = "_page_total"
+
+
+def count_mode() -> CountMode:
+    return get_settings().mysql.pagination_count
+
+
+async def fetch_page(
+    session: AsyncSession,
+    stmt: Select,
+    count_stmt: Callable[[], Select],
+    *,
+    offset: int,
+    limit: int,
+    shape: RowShape = "tuples",
+    mode: Optional[CountMode] = None,
+) -> Tuple[List[Any], int]:
+    """Run `stmt` (ordered, without offset/limit) for one page and return (rows, total).
+
+    `count_stmt` builds the `COUNT` query; it is only called when needed.
+    `shape` selects what a row is: the first entity ("scalars"), a mapping, or a tuple.
+    """
+    if (mode or count_mode()) == "window":
+        res = await session.execute(
+            stmt.add_columns(func.count().over().label(_TOTAL_LABEL)).offset(offset).limit(limit)
+        )
+        rows = res.all()
+        if rows:
+            total = int(rows[0][-1])
+            if shape == "scalars":
+                return [row[0] for row in rows], total
+            if shape == "mappings":
+                keys = list(res.keys())[:-1]
+                return [dict(zip(keys, row)) for row in rows], total
+            return [tuple(row)[:-1] for row in rows], total
+        if offset == 0:
+            return [], 0
+        items: List[Any] = []
+    else:
+        res = await session.execute(stmt.offset(offset).limit(limit))
+        if shape == "scalars":
+            items = list(res.scalars().all())
+        elif shape == "mappings":
+            items = list(res.mappings().all())
+        else:
+            items = list(res.tuples().all())
+
+    total = (await session.execute(count_stmt())).scalar_one()
+    return items, int(total or 0)
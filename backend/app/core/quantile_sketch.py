@@ -0,0 +1,143 @@
+"""Mergeable quantile sketches with relative-error guarantees (DDSketch).
+
+Positive values fall into logarithmic buckets `(GAMMA**(i-1), GAMMA**i]`;
+any quantile read back is within `RELATIVE_ACCURACY` of the true value.
+Sketches merge by adding bucket counts, so merging is exact and
+order-independent, and the buckets double as a histogram. Count, sum, min and
+max are kept exactly. Values <= 0 are counted in a separate zero bucket.
+"""
+
+from __future__ import annotations
+
+import math
+import zlib
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(GAMMA)
+
+_HEADER = np.dtype([("zero", "<i8"), ("count", "<i8"), ("sum", "<f8"), ("min", "<f8"), ("max", "<f8")])
+
+
+@dataclass
+class QuantileSketch:
+    zero_count: int = 0
+    count: int = 0
+    total: float = 0.0
+    min: float = math.inf
+    max: float = -math.inf
+    # sorted bucket indices and their counts
+    index: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int32))
+    counts: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+
+    @classmethod
+    def from_values(cls, values: Sequence[float] | np.ndarray) -> "QuantileSketch":
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return cls()
+        positive = values[values > 0]
+        index, counts = np.unique(np.ceil(np.log(positive) / _LOG_GAMMA).astype(np.int32), return_counts=True)
+        return cls(
+            zero_count=int(values.size - positive.size),
+            count=int(values.size),
+            total=float(values.sum()),
+            min=float(values.min()),
+            max=float(values.max()),
+            index=index,
+            counts=counts.astype(np.int64),
+        )
+
+    @classmethod
+    def merge(cls, sketches: Iterable["QuantileSketch"]) -> "QuantileSketch":
+        sketches = [s for s in sketches if s.count]
+        if not sketches:
+            return cls()
+        if len(sketches) == 1:
+            return sketches[0]
+        index, inverse = np.unique(np.concatenate([s.index for s in sketches]), return_inverse=True)
+        counts = np.bincount(inverse, weights=np.concatenate([s.counts for s in sketches]), minlength=index.size)
+        return cls(
+            zero_count=sum(s.zero_count for s in sketches),
+            count=sum(s.count for s in sketches),
+            total=sum(s.total for s in sketches),
+            min=min(s.min for s in sketches),
+            max=max(s.max for s in sketches),
+            index=index.astype(np.int32),
+            counts=counts.astype(np.int64),
+        )
+
+    def _values(self) -> np.ndarray:
+        """Representative value of each bucket (relative error <= RELATIVE_ACCURACY)."""
+        return 2 * np.power(GAMMA, self.index.astype(np.float64)) / (GAMMA + 1)
+
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]]:
+        if self.count == 0:
+            return [None for _ in qs]
+        values = np.r_[0.0, self._values()] if self.zero_count else self._values()
+        counts = np.r_[self.zero_count, self.counts] if self.zero_count else self.counts
+        cumulative = np.cumsum(counts)
+        out: List[Optional[float]] = []
+        for q in qs:
+            if q <= 0 or q >= 1:
+                out.append(self.min if q <= 0 else self.max)
+                continue
+            rank = q * (self.count - 1)
+            i = int(np.searchsorted(cumulative, rank, side="right"))
+            value = float(values[min(i, values.size - 1)])
+            out.append(min(max(value, self.min), self.max))
+        return out
+
+    def histogram(self, edges: Sequence[float]) -> List[int]:
+        """Counts per `[edges[k], edges[k+1])` bin (last bin closed), assigning buckets by their value."""
+        edges = np.asarray(edges, dtype=np.float64)
+        values = np.r_[0.0, self._values()] if self.zero_count else self._values()
+        counts = np.r_[self.zero_count, self.counts] if self.zero_count else self.counts
+        values = np.clip(values, self.min, self.max) if self.count else values
+        bins = np.searchsorted(edges, values, side="right") - 1
+        bins[values == edges[-1]] = edges.size - 2
+        inside = (bins >= 0) & (bins < edges.size - 1)
+        return np.bincount(bins[inside], weights=counts[inside], minlength=edges.size - 1).astype(np.int64).tolist()
+
+    def default_edges(self, bins: int) -> List[float]:
+        """`bins` log-spaced bins from the smallest positive bucket to the maximum, plus [0, first) when needed."""
+        if self.count == 0:
+            return []
+        if self.max <= 0:
+            return [self.min, 0.0]
+        lower = float(GAMMA ** (int(self.index[0]) - 1)) if self.index.size else self.max
+        edges = np.geomspace(max(lower, self.min, 1e-6), self.max, bins + 1)
+        if self.zero_count or self.min < edges[0]:
+            edges = np.r_[min(self.min, 0.0), edges[1:]] if bins > 1 else np.r_[min(self.min, 0.0), self.max]
+        return np.unique(edges).tolist()
+
+    def encode(self) -> bytes:
+        header = np.array([(self.zero_count, self.count, self.total, self.min, self.max)], dtype=_HEADER)
+        return zlib.compress(
+            header.tobytes()
+            + np.array(self.index.size, dtype="<i4").tobytes()
+            + self.index.astype("<i4").tobytes()
+            + self.counts.astype("<i8").tobytes()
+        )
+
+    @classmethod
+    def decode(cls, blob: bytes) -> "QuantileSketch":
+        raw = zlib.decompress(blob)
+        header = np.frombuffer(raw, dtype=_HEADER, count=1)[0]
+        offset = _HEADER.itemsize
+        n = int(np.frombuffer(raw, dtype="<i4", count=1, offset=offset)[0])
+        offset += 4
+        index = np.frombuffer(raw, dtype="<i4", count=n, offset=offset).astype(np.int32)
+        counts = np.frombuffer(raw, dtype="<i8", count=n, offset=offset + 4 * n).astype(np.int64)
+        return cls(
+            zero_count=int(header["zero"]),
+            count=int(header["count"]),
+            total=float(header["sum"]),
+            min=float(header["min"]),
+            max=float(header["max"]),
+            index=index,
+            counts=counts,
+        )
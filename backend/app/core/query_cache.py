@@ -0,0 +1,147 @@
+"""In-process result cache for read services.
+
+Keys come from `query_key` and therefore carry the data versions of the
+developers a query reads: once an import bumps a version, its old entries can
+no longer be hit (in every worker process, since the versions are shared). The
+cache is bounded by entry count and by an estimate of the bytes held, evicting
+least recently used entries first. `DataSyncService` also drops the affected
+entries right after an import so they do not linger until evicted. Concurrent
+misses for the same key run the loader once (see `SingleFlight`).
+
+Cached results are shared between requests and must be treated as read-only.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence, Set
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import islice
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Optional, TypeVar
+
+from app.core.config import get_settings
+from app.core.single_flight import SingleFlight
+
+T = TypeVar("T")
+
+# Items measured per collection; larger collections are extrapolated
+_SIZE_SAMPLE = 16
+_SCALARS = (str, bytes, int, float, bool, Decimal, datetime, date, type(None))
+
+
+def approx_size(value: Any, _depth: int = 0) -> int:
+    """Rough deep size in bytes of query results (rows, mappings, ORM objects)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, _SCALARS) or _depth > 4:
+        return size
+    if isinstance(value, Mapping):
+        items: Any = value.values()
+    elif isinstance(value, (Sequence, Set)):
+        items = value
+    elif hasattr(value, "__dict__"):
+        # ORM instances: skip SQLAlchemy's instance state
+        size += sys.getsizeof(vars(value))
+        items = [v for k, v in vars(value).items() if not k.startswith("_sa_")]
+    else:
+        return size
+    n = len(items)
+    if n == 0:
+        return size
+    sample = list(islice(items, _SIZE_SAMPLE))
+    measured = sum(approx_size(v, _depth + 1) for v in sample)
+    return size + measured * n // len(sample)
+
+
+class QueryCache:
+    """LRU of query results bounded by `max_entries` and roughly `max_bytes`."""
+
+    def __init__(self, max_entries: int, max_bytes: int) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: OrderedDict[Hashable, tuple[int, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[T]]) -> T:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        return await self._flight.do(key, lambda: self._load(key, loader))
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[T]]) -> T:
+        value = await loader()
+        size = approx_size(value)
+        # one oversized result must not flush the whole cache
+        if size <= self.max_bytes // 4:
+            with self._lock:
+                old = self._data.pop(key, None)
+                if old is not None:
+                    self.bytes -= old[0]
+                self._data[key] = (size, value)
+                self.bytes += size
+                while self._data and (len(self._data) > self.max_entries or self.bytes > self.max_bytes):
+                    _, (evicted, _) = self._data.popitem(last=False)
+                    self.bytes -= evicted
+                    self.evictions += 1
+        return value
+
+    def invalidate(
+        self, developer_ids: Optional[Iterable[int]] = None, names: Optional[Iterable[str]] = None
+    ) -> int:
+        """Drop entries reading any of `developer_ids` (or unscoped ones) and entries named in `names`.
+
+        With no arguments everything is dropped. Returns the number of entries removed.
+        """
+        developers = {int(d) for d in developer_ids or () if d is not None}
+        wanted = set(names or ())
+        drop_all = developer_ids is None and names is None
+        with self._lock:
+            doomed = [
+                key
+                for key in self._data
+                if drop_all
+                or key[0] in wanted
+                or (developers and any(did == "*" or did in developers for did, _ in key[1]))
+            ]
+            for key in doomed:
+                self.bytes -= self._data.pop(key)[0]
+            self.invalidations += len(doomed)
+        return len(doomed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "coalesced": self._flight.coalesced,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+_settings = get_settings().cache
+query_cache = QueryCache(
+    max_entries=_settings.query_cache_max_entries,
+    max_bytes=_settings.query_cache_max_mb * 1024 * 1024,
+)
@@ -0,0 +1,49 @@
+"""Fast JSON encoding for responses built from plain rows.
+
+Routes that already hold primitive values (ints, strings, datetimes, Decimals)
+can encode them straight to bytes and return `RawJSONResponse`, skipping
+Pydantic model construction and FastAPI's `response_model` re-validation.
+The output matches what Pydantic would produce for the same fields: Decimals
+are rendered as strings and datetimes in ISO 8601. `orjson` is used when it is
+installed; otherwise the standard library encoder is used.
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode `obj` to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(obj, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class RawJSONResponse(Response):
+    """JSON response whose content is encoded with `dumps` (no validation)."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
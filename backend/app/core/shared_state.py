@@ -0,0 +1,194 @@
+"""Files shared by all worker processes of one deployment.
+
+With several uvicorn workers every per-process cache is built (and held) once
+per worker. Caches that should exist once per host keep their data in files
+under `shared_dir()` (tmpfs `/dev/shm` where available, so reads are page-cache
+hits) and map them read-only. Writers serialise on a `FileLock` and publish
+with `write_json_atomic`, so a reader sees either the old or the new state.
+Small counters that every worker updates in place live in a `SharedCounters`
+file instead.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import os
+import secrets
+import tempfile
+import threading
+import time
+from collections.abc import Iterable
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional
+
+from app.core.config import get_settings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache
+def shared_dir() -> Path:
+    configured = get_settings().cache.shared_dir
+    if configured:
+        path = Path(configured).expanduser()
+    else:
+        base = Path("/dev/shm") if os.path.isdir("/dev/shm") else Path(tempfile.gettempdir())
+        path = base / f"imvu-insight-{get_settings().mysql.db}"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+class FileLock:
+    """Exclusive inter-process lock on `path` (created if missing); blocking, not reentrant."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def acquire(self) -> None:
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+
+    def release(self) -> None:
+        fd, self._fd = self._fd, None
+        if fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+def write_json_atomic(path: Path, data: Any) -> None:
+    """Replace `path` with `data` as JSON in one step (write a temp file, then rename)."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def read_json(path: Path) -> Optional[Any]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+class SharedCounters:
+    """A fixed number of int64 counters in a memory-mapped file under `shared_dir()`.
+
+    Each slot holds a counter and the unix time it was last bumped. The file
+    carries a random epoch chosen when it was created, so counters that restart
+    from zero (a wiped `/dev/shm`) are still distinguishable. Bumps serialise on
+    a `FileLock`; reads are plain memory reads. If the file cannot be used the
+    counters fall back to process memory.
+    """
+
+    # int64 layout: [epoch, created_at, values[slots], modified_at[slots]]
+    _HEADER = 2
+
+    def __init__(self, name: str, slots: int) -> None:
+        self.name = name
+        self.slots = slots
+        self._size = (self._HEADER + 2 * slots) * 8
+        self._lock = threading.Lock()
+        self._words: Optional[memoryview] = None
+        self._file_lock: Optional[FileLock] = None
+
+    def _init_header(self, words: memoryview) -> None:
+        if words[0] == 0:
+            words[1] = int(time.time())
+            words[0] = secrets.randbits(62) + 1
+
+    def _map(self) -> memoryview:
+        with self._lock:
+            if self._words is not None:
+                return self._words
+            try:
+                lock = FileLock(shared_dir() / f"{self.name}.lock")
+                with lock:
+                    fd = os.open(shared_dir() / f"{self.name}.bin", os.O_RDWR | os.O_CREAT, 0o644)
+                    try:
+                        if os.fstat(fd).st_size < self._size:
+                            os.ftruncate(fd, self._size)
+                        mm = mmap.mmap(fd, self._size)
+                    finally:
+                        os.close(fd)
+                    words = memoryview(mm).cast("q")
+                    self._init_header(words)
+                self._file_lock = lock
+            except OSError:
+                logger.warning("Shared counters %s unavailable; using per-process counters", self.name, exc_info=True)
+                words = memoryview(bytearray(self._size)).cast("q")
+                self._init_header(words)
+            self._words = words
+            return words
+
+    def bump(self, slots: Iterable[int]) -> None:
+        """Advance each given slot and stamp it with the current time."""
+        words = self._words if self._words is not None else self._map()
+        now = int(time.time())
+        with self._lock:
+            if self._file_lock is not None:
+                self._file_lock.acquire()
+            try:
+                for slot in set(slots):
+                    words[self._HEADER + slot] += 1
+                    words[self._HEADER + self.slots + slot] = now
+            finally:
+                if self._file_lock is not None:
+                    self._file_lock.release()
+
+    def get(self, slot: int) -> int:
+        words = self._words if self._words is not None else self._map()
+        return words[self._HEADER + slot]
+
+    def modified(self, slot: int) -> int:
+        """Unix time of the last bump of `slot`, or 0 if it was never bumped."""
+        words = self._words if self._words is not None else self._map()
+        return words[self._HEADER + self.slots + slot]
+
+    @property
+    def created_at(self) -> int:
+        words = self._words if self._words is not None else self._map()
+        return words[1]
+
+    @property
+    def epoch(self) -> int:
+        words = self._words if self._words is not None else self._map()
+        return words[0]
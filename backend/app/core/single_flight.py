@@ -0,0 +1,106 @@
+"""Coalescing of identical concurrent computations ("single flight").
+
+When several requests ask the same expensive question at the same time (an
+import has just landed and every operator reloads the same list), only the
+first one runs the query; the others await its result. Results can also be
+memoized for a short TTL. Keys built with `query_key` include the data
+versions of the developers involved, so a memoized result never outlives an
+import.
+
+Callers share the result object, so it must be treated as read-only.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Optional, TypeVar
+
+from app.core.cache import LRUCache
+from app.core.data_version import get_data_version
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+
+def _normalize(value: Any) -> Hashable:
+    """Hashable, order-stable form of request parameters (dicts, lists, pydantic models)."""
+    if hasattr(value, "model_dump"):
+        value = value.model_dump()
+    if isinstance(value, dict):
+        return tuple(sorted((k, _normalize(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(_normalize(v) for v in value))
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def query_key(name: str, developer_ids: Optional[Iterable[int]], **params: Any) -> Hashable:
+    """Key of a developer-scoped query: name, developer set with data versions, normalized params."""
+    if developer_ids is None:
+        scope: tuple = (("*", get_data_version()),)
+    else:
+        scope = tuple((did, get_data_version(did)) for did in sorted({int(d) for d in developer_ids}))
+    return (name, scope, _normalize(params))
+
+
+class SingleFlight:
+    """Run at most one computation per key at a time, optionally memoizing results.
+
+    Followers of a leader that gets cancelled (client went away) run the
+    computation themselves; errors are propagated to every waiter.
+    """
+
+    def __init__(self, memo_ttl: Optional[float] = None, memo_maxsize: int = 256) -> None:
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self._memo: Optional[LRUCache[Hashable, Any]] = (
+            LRUCache(maxsize=memo_maxsize, ttl=memo_ttl) if memo_ttl else None
+        )
+        self.executed = 0
+        self.coalesced = 0
+
+    @property
+    def memo_hits(self) -> int:
+        return self._memo.hits if self._memo is not None else 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        if self._memo is not None:
+            hit = self._memo.get(key, _MISSING)
+            if hit is not _MISSING:
+                return hit
+
+        loop = asyncio.get_running_loop()
+        future = self._inflight.get(key)
+        if future is not None and future.get_loop() is loop:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+            # the leader was cancelled; try again (possibly as the new leader)
+            return await self.do(key, fn)
+
+        future = loop.create_future()
+        self._inflight[key] = future
+        self.executed += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # mark retrieved: there may be no follower
+            raise
+        else:
+            future.set_result(result)
+            if self._memo is not None:
+                self._memo.set(key, result)
+            return result
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
@@ -0,0 +1,109 @@
+"""Precompiled ORDER BY specs for the list services.
+
+List requests carry `orders`: objects or dicts with a `property` (an alias such
+as "name", a model attribute, its camelCase form, or for some lists a dotted
+"table.column") and an optional `direction`. A `SortSpec` resolves every
+property it accepts once, when the service module is imported, and memoizes
+the ORDER BY clauses built for each distinct `orders` value. The clauses are
+immutable SQLAlchemy elements, so reusing them across requests is safe and
+keeps statements structurally identical for SQLAlchemy's compiled cache.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Iterable, Mapping, Optional, Tuple
+
+from sqlalchemy import asc, desc, inspect
+
+# (property, "ASC" | "DESC") pairs
+NormalizedOrders = Tuple[Tuple[str, str], ...]
+
+
+def _snake(name: str) -> str:
+    return "".join("_" + c.lower() if c.isupper() else c for c in name).lstrip("_")
+
+
+def _camel(name: str) -> str:
+    head, *rest = name.split("_")
+    return head + "".join(part.title() for part in rest)
+
+
+def model_fields(entity: Any, prefix: str = "", join: Optional[str] = None) -> dict[str, tuple[Any, Optional[str]]]:
+    """Sort fields for every mapped column of a model or alias, by attribute name and camelCase form."""
+    fields: dict[str, tuple[Any, Optional[str]]] = {}
+    for attr in inspect(entity).mapper.column_attrs:
+        column = getattr(entity, attr.key)
+        fields[prefix + attr.key] = (column, join)
+        fields.setdefault(prefix + _camel(attr.key), (column, join))
+    return fields
+
+
+class SortSpec:
+    """Sortable properties of one list and its default ordering.
+
+    `fields` maps a property to a column expression, or to `(expression, join)`
+    where `join` names a table the statement must join to sort by it. Unknown
+    properties are ignored; with `snake_case`, camelCase properties that are
+    not listed are retried in snake_case.
+    """
+
+    def __init__(
+        self,
+        fields: Mapping[str, Any],
+        *,
+        default: Iterable[Any] = (),
+        default_direction: str = "ASC",
+        snake_case: bool = True,
+        dotted: bool = False,
+    ) -> None:
+        self._fields: dict[str, tuple[Any, Optional[str]]] = {
+            name: value if isinstance(value, tuple) else (value, None) for name, value in fields.items()
+        }
+        self.default = tuple(default)
+        self.default_direction = default_direction
+        self.snake_case = snake_case
+        self.dotted = dotted
+        self._compile = lru_cache(maxsize=512)(self._build)
+
+    def normalize(self, orders: Optional[list]) -> NormalizedOrders:
+        """Canonical `(property, direction)` pairs of an `orders` list (also usable as a cache key)."""
+        out = []
+        for o in orders or ():
+            if isinstance(o, dict):
+                prop, direction = o.get("property"), o.get("direction")
+            else:
+                prop, direction = getattr(o, "property", None), getattr(o, "direction", None)
+            if isinstance(prop, str) and self.dotted:
+                # 'buyer_user,name' is accepted as 'buyer_user.name'
+                prop = prop.replace(",", ".").strip()
+            if not prop:
+                continue
+            direction = (direction or self.default_direction).upper()
+            out.append((prop, "ASC" if direction == "ASC" else "DESC"))
+        return tuple(out)
+
+    def order_by(self, orders: Optional[list]) -> Tuple[tuple, frozenset]:
+        """ORDER BY clauses for `orders` (the default when none resolve) and the joins they need."""
+        return self._compile(self.normalize(orders))
+
+    def _lookup(self, prop: str) -> Optional[tuple[Any, Optional[str]]]:
+        field = self._fields.get(prop)
+        if field is None and self.snake_case:
+            field = self._fields.get(_snake(prop))
+        return field
+
+    def _build(self, orders: NormalizedOrders) -> Tuple[tuple, frozenset]:
+        clauses = []
+        joins = set()
+        for prop, direction in orders:
+            field = self._lookup(prop)
+            if field is None:
+                continue
+            column, join = field
+            clauses.append(asc(column) if direction == "ASC" else desc(column))
+            if join is not None:
+                joins.add(join)
+        if not clauses:
+            return self.default, frozenset()
+        return tuple(clauses), frozenset(joins)
@@ -3,6 +3,7 @@ from __future__ import annotations
 import logging
 
 from app.security.middleware import AuthMiddleware
+from app.core.conditional import ConditionalRequestMiddleware
 from fastapi import APIRouter, Depends, FastAPI
 from fastapi.responses import JSONResponse
 from sqlalchemy.exc import SQLAlchemyError
@@ -11,6 +12,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import get_settings
 from app.core.db import check_db_connection, get_db_session
 from app.core.logging import configure_logging
+from app.core.query_cache import query_cache
 from app.routes.data_sync import router as data_sync_router
 from app.routes.product import router as product_router
 from app.routes.imvu_user import router as imvu_user_router
@@ -18,6 +20,10 @@ from app.routes.income_transaction import router as income_transaction_router
 from app.routes.buyer import router as buyer_router
 from app.routes.recipient import router as recipient_router
 from app.routes.auth import router as auth_router
+from app.routes.analytics import router as analytics_router
+from app.routes.dashboard import router as dashboard_router
+from app.routes.graph import router as graph_router
+from app.routes.batch import router as batch_router
 
 
 settings = get_settings()
@@ -29,6 +35,8 @@ app = FastAPI(
     root_path=settings.app.root_path or None,
 )
 
+# Added first so it runs inside AuthMiddleware and sees the principal
+app.add_middleware(ConditionalRequestMiddleware)
 app.add_middleware(AuthMiddleware)
 
 router = APIRouter()
@@ -77,6 +85,12 @@ async def health_db(session: AsyncSession = Depends(get_db_session)) -> dict:
         )
 
 
+@router.get("/health/cache", operation_id="health_cache")
+async def health_cache() -> dict:
+    """Hit ratio and memory use of this worker's query cache (requires authentication)."""
+    return query_cache.stats()
+
+
 app.include_router(router)
 app.include_router(data_sync_router)
 app.include_router(product_router)
@@ -85,3 +99,7 @@ app.include_router(income_transaction_router)
 app.include_router(buyer_router)
 app.include_router(recipient_router)
 app.include_router(auth_router)
+app.include_router(analytics_router)
+app.include_router(dashboard_router)
+app.include_router(graph_router)
+app.include_router(batch_router)
@@ -18,6 +18,11 @@ from .income_transaction import IncomeTransaction  # noqa: F401
 from .user import User  # noqa: F401
 from .refresh_token import RefreshToken  # noqa: F401
 from .user_developer import UserDeveloper  # noqa: F401
+from .income_daily_rollup import IncomeDailyRollup  # noqa: F401
+from .income_daily_sketch import IncomeDailySketch  # noqa: F401
+from .income_product_daily_sketch import IncomeProductDailySketch  # noqa: F401
+from .product_daily_metrics import ProductDailyMetrics  # noqa: F401
+from .product_daily_delta import ProductDailyDelta  # noqa: F401
 
 __all__ = [
     "DataSyncRecord",
@@ -30,4 +35,9 @@ __all__ = [
     "User",
     "RefreshToken",
     "UserDeveloper",
+    "IncomeDailyRollup",
+    "IncomeDailySketch",
+    "IncomeProductDailySketch",
+    "ProductDailyMetrics",
+    "ProductDailyDelta",
 ]
@@ -2,13 +2,16 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, BigInteger, String, DateTime
+from sqlalchemy import Column, BigInteger, String, DateTime, Index
 
 from . import Base
 
 
 class ImvuUser(Base):
     __tablename__ = "imvu_user"
+    __table_args__ = (
+        Index("ix_imvu_user_developer_last_seen", "developer_user_id", "last_seen_at"),
+    )
 
     user_id = Column(BigInteger, primary_key=True)
 
@@ -21,5 +24,5 @@ class ImvuUser(Base):
 
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
     
-    developer_user_id = Column(BigInteger, nullable=False, index=True)
+    developer_user_id = Column(BigInteger, nullable=False)
 
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, BigInteger, Integer, Date, DateTime, Numeric
+
+from . import Base
+
+
+class IncomeDailyRollup(Base):
+    """Analytics layer: income_transaction aggregated per (developer, product, day).
+
+    Derived data only; it is refreshed for the affected days on every income
+    import and can be dropped and rebuilt from `income_transaction` at any time.
+    """
+
+    __tablename__ = "income_daily_rollup"
+
+    developer_user_id = Column(BigInteger, primary_key=True)
+    product_id = Column(BigInteger, primary_key=True)
+    # Calendar day of transaction_time
+    day = Column(Date, primary_key=True, index=True)
+
+    transaction_count = Column(Integer, nullable=False)
+    # Transactions whose buyer and recipient differ
+    gift_count = Column(Integer, nullable=False)
+
+    paid_credits = Column(Numeric(18, 6), nullable=False)
+    paid_promo_credits = Column(Numeric(18, 6), nullable=False)
+    paid_total_credits = Column(Numeric(18, 6), nullable=False)
+    income_credits = Column(Numeric(18, 6), nullable=False)
+    income_promo_credits = Column(Numeric(18, 6), nullable=False)
+    income_total_credits = Column(Numeric(18, 6), nullable=False)
+
+    updated_at = Column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False
+    )
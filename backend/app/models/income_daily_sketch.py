@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, BigInteger, Integer, Date, DateTime, LargeBinary
+
+from . import Base
+
+
+class IncomeDailySketch(Base):
+    """Analytics layer: distinct buyers/recipients and buyer spend per (developer, day).
+
+    Holds the exact distinct counts of the day plus zlib-compressed
+    HyperLogLog registers (`app.core.hll`) that merge into distinct counts
+    over any range, and a quantile sketch (`app.core.quantile_sketch`) of
+    each buyer's total spend that day. Derived data, refreshed with
+    `income_daily_rollup`.
+    """
+
+    __tablename__ = "income_daily_sketch"
+
+    developer_user_id = Column(BigInteger, primary_key=True)
+    # Calendar day of transaction_time
+    day = Column(Date, primary_key=True, index=True)
+
+    buyer_count = Column(Integer, nullable=False)
+    recipient_count = Column(Integer, nullable=False)
+    buyer_hll = Column(LargeBinary, nullable=False)
+    recipient_hll = Column(LargeBinary, nullable=False)
+    # paid_total_credits summed per buyer over the day
+    buyer_spend_sketch = Column(LargeBinary, nullable=False)
+
+    updated_at = Column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False
+    )
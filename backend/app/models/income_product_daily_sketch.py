@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, BigInteger, Date, DateTime, LargeBinary
+
+from . import Base
+
+
+class IncomeProductDailySketch(Base):
+    """Analytics layer: price-point distribution per (developer, product, day).
+
+    A quantile sketch (`app.core.quantile_sketch`) of `paid_total_credits`
+    over the day's transactions of the product. Derived data, refreshed with
+    `income_daily_rollup`.
+    """
+
+    __tablename__ = "income_product_daily_sketch"
+
+    developer_user_id = Column(BigInteger, primary_key=True)
+    product_id = Column(BigInteger, primary_key=True)
+    # Calendar day of transaction_time
+    day = Column(Date, primary_key=True, index=True)
+
+    paid_sketch = Column(LargeBinary, nullable=False)
+
+    updated_at = Column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False
+    )
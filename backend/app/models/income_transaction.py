@@ -4,19 +4,45 @@ from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Optional
 
-from sqlalchemy import Column, BigInteger, DateTime, Numeric, TIMESTAMP
+from sqlalchemy import Column, BigInteger, DateTime, Index, Numeric, TIMESTAMP
 
 from . import Base
 
 
 class IncomeTransaction(Base):
     __tablename__ = "income_transaction"
+    # Hot queries filter by developer first. The buyer/recipient indexes also
+    # carry the columns the buyer/recipient lists and options read, so those
+    # are answered from the index alone.
+    __table_args__ = (
+        Index("ix_income_transaction_developer_time", "developer_user_id", "transaction_time"),
+        Index(
+            "ix_income_transaction_developer_buyer",
+            "developer_user_id",
+            "buyer_user_id",
+            "transaction_time",
+            "paid_total_credits",
+            "paid_credits",
+            "paid_promo_credits",
+        ),
+        Index(
+            "ix_income_transaction_developer_recipient",
+            "developer_user_id",
+            "recipient_user_id",
+            "transaction_time",
+            "paid_total_credits",
+            "paid_credits",
+            "paid_promo_credits",
+        ),
+        Index("ix_income_transaction_developer_product", "developer_user_id", "product_id", "transaction_time"),
+        Index("ix_income_transaction_product_time", "product_id", "transaction_time"),
+    )
 
     transaction_id = Column(BigInteger, primary_key=True, nullable=False)
 
     transaction_time = Column(DateTime, nullable=False, index=True)
 
-    product_id = Column(BigInteger, nullable=False, index=True)
+    product_id = Column(BigInteger, nullable=False)
     developer_user_id = Column(BigInteger, nullable=False, index=True)
     buyer_user_id = Column(BigInteger, nullable=False, index=True)
     recipient_user_id = Column(BigInteger, nullable=False, index=True)
@@ -2,17 +2,20 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, BigInteger, String, Numeric, Boolean, DateTime
+from sqlalchemy import Column, BigInteger, String, Numeric, Boolean, DateTime, Index
 
 from . import Base
 
 
 class Product(Base):
     __tablename__ = "product"
+    __table_args__ = (
+        Index("ix_product_developer_name", "developer_user_id", "product_name"),
+    )
 
     product_id = Column(BigInteger, primary_key=True)
 
-    developer_user_id = Column(BigInteger, nullable=False, index=True)
+    developer_user_id = Column(BigInteger, nullable=False)
 
     product_name = Column(String(255), nullable=False)
 
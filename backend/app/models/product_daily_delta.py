@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import (
+    Column,
+    BigInteger,
+    Integer,
+    Boolean,
+    Date,
+    DateTime,
+    Index,
+)
+
+from . import Base
+
+
+class ProductDailyDelta(Base):
+    """Change of a product's snapshot counters since its previous snapshot.
+
+    One row per (product, snapshot day) that has an earlier snapshot. When
+    snapshots are missing in between, the row covers `span_days` days. A
+    counter lower than before is treated as reset and its new value is the
+    delta (`reset` is set). Derived from `product_daily_metrics` at import time.
+    """
+
+    __tablename__ = "product_daily_delta"
+    __table_args__ = (
+        Index("ix_product_daily_delta_developer_date", "developer_user_id", "snapshot_date"),
+    )
+
+    product_id = Column(BigInteger, primary_key=True)
+    snapshot_date = Column(Date, primary_key=True)
+
+    developer_user_id = Column(BigInteger, nullable=False)
+    previous_date = Column(Date, nullable=False)
+    span_days = Column(Integer, nullable=False)
+    reset = Column(Boolean, nullable=False)
+
+    old_sales = Column(BigInteger, nullable=False)
+    new_sales = Column(BigInteger, nullable=False)
+    total_sales = Column(BigInteger, nullable=False)
+
+    derived_product_sales = Column(BigInteger, nullable=False)
+    direct_sales = Column(BigInteger, nullable=False)
+    indirect_sales = Column(BigInteger, nullable=False)
+    promoted_sales = Column(BigInteger, nullable=False)
+
+    cart_adds = Column(BigInteger, nullable=False)
+    wishlist_adds = Column(BigInteger, nullable=False)
+
+    organic_impressions = Column(BigInteger, nullable=False)
+    paid_impressions = Column(BigInteger, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
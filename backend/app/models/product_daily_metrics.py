@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import (
+    Column,
+    BigInteger,
+    Integer,
+    Boolean,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Numeric,
+)
+
+from . import Base
+
+
+class ProductDailyMetrics(Base):
+    """Typed copy of one `raw_product_list` snapshot row per (product, snapshot day).
+
+    Written at product import time so analytics never parse the raw string
+    columns. Counters are stored exactly as exported (cumulative values).
+    """
+
+    __tablename__ = "product_daily_metrics"
+    __table_args__ = (
+        Index("ix_product_daily_metrics_developer_date", "developer_user_id", "snapshot_date"),
+    )
+
+    product_id = Column(BigInteger, primary_key=True)
+    snapshot_date = Column(Date, primary_key=True)
+
+    developer_user_id = Column(BigInteger, nullable=False)
+    sync_record_id = Column(Integer, ForeignKey("data_sync_records.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    price = Column(Numeric(10, 2), nullable=False)
+    profit = Column(Numeric(10, 2), nullable=False)
+    visible = Column(Boolean, nullable=False)
+
+    old_sales = Column(BigInteger, nullable=False)
+    new_sales = Column(BigInteger, nullable=False)
+    total_sales = Column(BigInteger, nullable=False)
+
+    derived_product_sales = Column(BigInteger, nullable=False)
+    direct_sales = Column(BigInteger, nullable=False)
+    indirect_sales = Column(BigInteger, nullable=False)
+    promoted_sales = Column(BigInteger, nullable=False)
+
+    cart_adds = Column(BigInteger, nullable=False)
+    wishlist_adds = Column(BigInteger, nullable=False)
+
+    organic_impressions = Column(BigInteger, nullable=False)
+    paid_impressions = Column(BigInteger, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
@@ -0,0 +1,417 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import List, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import get_db_session
+from app.core.serialization import RawJSONResponse, dumps
+from app.security.developer_scope import get_user_developer_ids
+from app.services.columnar_store_service import ColumnarStoreService
+from app.services.income_analytics_service import IncomeAnalyticsService
+from app.services.income_sketch_service import IncomeSketchService
+from app.services.product_metrics_service import ProductMetricsService
+
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+
+class IncomeTimeseriesRequest(BaseModel):
+    start: date = Field(..., description="First day of the range (inclusive)")
+    end: date = Field(..., description="Last day of the range (inclusive)")
+    granularity: Literal["hour", "day", "week", "month"] = "day"
+    group_by: Literal["product", "buyer", "recipient"] | None = None
+    product_id: list[int] | None = None
+    metric: Literal[
+        "transaction_count",
+        "gift_count",
+        "paid_credits",
+        "paid_promo_credits",
+        "paid_total_credits",
+        "income_credits",
+        "income_promo_credits",
+        "income_total_credits",
+    ] = Field("income_total_credits", description="Metric used for ranking groups and the moving average")
+    top: int = Field(10, ge=1, le=50, description="Number of groups returned as separate series")
+    window: int = Field(7, ge=0, le=365, description="Moving average window in periods (0 disables it)")
+
+
+class IncomeTimeseriesSeries(BaseModel):
+    key: int | None = None
+    name: str | None = None
+    total: float
+    transaction_count: List[int]
+    gift_count: List[int]
+    paid_credits: List[float]
+    paid_promo_credits: List[float]
+    paid_total_credits: List[float]
+    income_credits: List[float]
+    income_promo_credits: List[float]
+    income_total_credits: List[float]
+    moving_average: List[float] | None = None
+
+
+class IncomeTimeseriesResponse(BaseModel):
+    granularity: str
+    group_by: str | None = None
+    metric: str
+    periods: List[date | datetime]
+    series: List[IncomeTimeseriesSeries]
+
+
+@router.post(
+    "/income/timeseries",
+    operation_id="getIncomeTimeseries",
+    summary="Income over time with optional grouping and moving average",
+    response_model=IncomeTimeseriesResponse,
+)
+async def income_timeseries(
+    params: IncomeTimeseriesRequest,
+    request: Request,
+    session: AsyncSession = Depends(get_db_session),
+):
+    developer_ids = await get_user_developer_ids(request, session)
+
+    try:
+        result = await IncomeAnalyticsService(session).timeseries(
+            developer_ids=developer_ids,
+            start=params.start,
+            end=params.end,
+            granularity=params.granularity,
+            group_by=params.group_by,
+            product_ids=params.product_id,
+            metric=params.metric,
+            top=params.top,
+            window=params.window,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from None
+
+    # Series are plain lists of numbers; encode them without per-element validation
+    return RawJSONResponse(dumps(result))
+
+
+class IncomeAggregateRequest(BaseModel):
+    start: datetime | None = Field(None, description="Earliest transaction time (inclusive)")
+    end: datetime | None = Field(None, description="Latest transaction time (exclusive)")
+    group_by: Literal["product", "buyer", "recipient", "day", "month", "weekday", "hour"] = "product"
+    product_id: list[int] | None = None
+    buyer_user_id: list[int] | None = None
+    recipient_user_id: list[int] | None = None
+    gifts_only: bool = False
+    metric: Literal[
+        "transaction_count",
+        "gift_count",
+        "paid_credits",
+        "paid_promo_credits",
+        "paid_total_credits",
+        "income_credits",
+        "income_promo_credits",
+        "income_total_credits",
+    ] = Field("income_total_credits", description="Metric used for ranking groups")
+    top: int = Field(20, ge=1, le=1000, description="Number of groups returned")
+    ascending: bool = Field(False, description="Return the lowest-ranked groups first")
+
+
+class IncomeAggregateTotals(BaseModel):
+    transaction_count: int
+    gift_count: int
+    paid_credits: float
+    paid_promo_credits: float
+    paid_total_credits: float
+    income_credits: float
+    income_promo_credits: float
+    income_total_credits: float
+
+
+class IncomeAggregateGroup(IncomeAggregateTotals):
+    key: int | date
+    name: str | None = None
+    share: float | None = None
+
+
+class IncomeAggregateResponse(BaseModel):
+    group_by: str
+    metric: str
+    rows_scanned: int
+    rows_matched: int
+    group_count: int
+    totals: IncomeAggregateTotals
+    groups: List[IncomeAggregateGroup]
+
+
+@router.post(
+    "/income/aggregate",
+    operation_id="aggregateIncome",
+    summary="Filter, group and rank transactions from the in-memory columnar store",
+    response_model=IncomeAggregateResponse,
+)
+async def income_aggregate(
+    params: IncomeAggregateRequest,
+    request: Request,
+    session: AsyncSession = Depends(get_db_session),
+):
+    developer_ids = await get_user_developer_ids(request, session)
+
+    try:
+        result = await ColumnarStoreService(session).aggregate(
+            developer_ids=developer_ids,
+            group_by=params.group_by,
+            start=params.start,
+            end=params.end,
+            product_ids=params.product_id,
+            buyer_user_ids=params.buyer_user_id,
+            recipient_user_ids=params.recipient_user_id,
+            gifts_only=params.gifts_only,
+            metric=params.metric,
+            top=params.top,
+            ascending=params.ascending,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from None
+
+    return RawJSONResponse(dumps(result))
+
+
+class UniqueUsersRequest(BaseModel):
+    start: date = Field(..., description="First day of the range (inclusive)")
+    end: date = Field(..., description="Last day of the range (inclusive)")
+    granularity: Literal["day", "week", "month", "total"] = "day"
+    exact: bool = Field(False, description="Count from transactions instead of merging sketches (slower)")
+
+
+class UniqueUsersCounts(BaseModel):
+    unique_buyers: int
+    unique_recipients: int
+
+
+class UniqueUsersPeriod(UniqueUsersCounts):
+    period: date
+
+
+class UniqueUsersResponse(BaseModel):
+    granularity: str
+    exact: bool
+    periods: List[UniqueUsersPeriod]
+    total: UniqueUsersCounts
+
+
+@router.post(
+    "/income/unique-users",
+    operation_id="getIncomeUniqueUsers",
+    summary="Distinct buyers and recipients per period (approximate unless exact is set)",
+    response_model=UniqueUsersResponse,
+)
+async def income_unique_users(
+    params: UniqueUsersRequest,
+    request: Request,
+    session: AsyncSession = Depends(get_db_session),
+):
+    if params.end < params.start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+
+    developer_ids = await get_user_developer_ids(request, session)
+    result = await IncomeSketchService(session).unique_users(
+        developer_ids=developer_ids,
+        start=params.start,
+        end=params.end,
+        granularity=params.granularity,
+        exact=params.exact,
+    )
+    return RawJSONResponse(dumps(result))
+
+
+class SpendDistributionRequest(BaseModel):
+    start: date = Field(..., description="First day of the range (inclusive)")
+    end: date = Field(..., description="Last day of the range (inclusive)")
+    measure: Literal["transaction", "buyer_day"] = Field(
+        "transaction", description="Spend per transaction, or per buyer and day"
+    )
+    product_id: list[int] | None = None
+    quantiles: list[float] = Field(default_factory=lambda: [0.5, 0.9, 0.99], min_length=1, max_length=20)
+    bins: int = Field(20, ge=1, le=200, description="Log-spaced histogram bins (ignored when edges are given)")
+    edges: list[float] | None = Field(None, min_length=2, max_length=201, description="Ascending histogram bin edges")
+    per_product: int = Field(0, ge=0, le=100, description="Also describe this many products separately (transaction only)")
+
+
+class SpendQuantile(BaseModel):
+    q: float
+    value: float | None = None
+
+
+class SpendSummary(BaseModel):
+    count: int
+    sum: float
+    mean: float | None = None
+    min: float | None = None
+    max: float | None = None
+    quantiles: List[SpendQuantile]
+
+
+class SpendHistogramBin(BaseModel):
+    lower: float
+    upper: float
+    count: int
+
+
+class SpendProductSummary(SpendSummary):
+    product_id: int
+    name: str | None = None
+
+
+class SpendDistributionResponse(SpendSummary):
+    measure: str
+    relative_accuracy: float
+    histogram: List[SpendHistogramBin]
+    products: List[SpendProductSummary]
+
+
+@router.post(
+    "/income/spend-distribution",
+    operation_id="getIncomeSpendDistribution",
+    summary="Spend quantiles and histogram from merged quantile sketches",
+    response_model=SpendDistributionResponse,
+)
+async def income_spend_distribution(
+    params: SpendDistributionRequest,
+    request: Request,
+    session: AsyncSession = Depends(get_db_session),
+):
+    if params.end < params.start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if params.edges is not None and any(b <= a for a, b in zip(params.edges, params.edges[1:])):
+        raise HTTPException(status_code=400, detail="edges must be strictly ascending")
+
+    developer_ids = await get_user_developer_ids(request, session)
+    try:
+        result = await IncomeSketchService(session).spend_distribution(
+            developer_ids=developer_ids,
+            start=params.start,
+            end=params.end,
+            measure=params.measure,
+            product_ids=params.product_id,
+            quantiles=params.quantiles,
+            bins=params.bins,
+            edges=params.edges,
+            per_product=params.per_product,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from None
+    return RawJSONResponse(dumps(result))
+
+
+class ProductFunnelRequest(BaseModel):
+    start: date = Field(..., description="First snapshot day of the range (inclusive)")
+    end: date = Field(..., description="Last snapshot day of the range (inclusive)")
+    product_id: list[int] | None = None
+    limit: int = Field(100, ge=1, le=1000, description="Maximum number of products returned")
+
+
+class ProductFunnelCounts(BaseModel):
+    impressions: int
+    organic_impressions: int
+    paid_impressions: int
+    wishlist_adds: int
+    cart_adds: int
+    total_sales: int
+    direct_sales: int
+    indirect_sales: int
+    promoted_sales: int
+
+    cart_rate: float | None = None
+    cart_to_sale_rate: float | None = None
+    sale_rate: float | None = None
+
+
+class ProductFunnelItem(ProductFunnelCounts):
+    product_id: int
+    name: str | None = None
+    baseline_date: date | None = None
+    snapshot_date: date
+
+
+class ProductFunnelResponse(BaseModel):
+    start: date
+    end: date
+    product_count: int
+    totals: ProductFunnelCounts | None = None
+    items: List[ProductFunnelItem]
+
+
+@router.post(
+    "/product/funnel",
+    operation_id="getProductFunnel",
+    summary="Impression to cart to sale funnel per product",
+    response_model=ProductFunnelResponse,
+)
+async def product_funnel(
+    params: ProductFunnelRequest,
+    request: Request,
+    session: AsyncSession = Depends(get_db_session),
+):
+    if params.end < params.start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+
+    developer_ids = await get_user_developer_ids(request, session)
+    result = await ProductMetricsService(session).funnel(
+        developer_ids=developer_ids,
+        start=params.start,
+        end=params.end,
+        product_ids=params.product_id,
+        limit=params.limit,
+    )
+    return RawJSONResponse(dumps(result))
+
+
+class ProductVelocityRequest(BaseModel):
+    start: date = Field(..., description="First snapshot day of the range (inclusive)")
+    end: date = Field(..., description="Last snapshot day of the range (inclusive)")
+    product_id: list[int] | None = None
+    limit: int = Field(100, ge=1, le=1000, description="Maximum number of products returned")
+
+
+class ProductVelocityItem(BaseModel):
+    product_id: int
+    name: str | None = None
+    from_date: date
+    to_date: date
+    days: int
+    total_sales: int
+    new_sales: int
+    cart_adds: int
+    impressions: int
+    sales_per_day: float | None = None
+
+
+class ProductVelocityResponse(BaseModel):
+    start: date
+    end: date
+    items: List[ProductVelocityItem]
+
+
+@router.post(
+    "/product/velocity",
+    operation_id="getProductSalesVelocity",
+    summary="Sales per day per product from snapshot deltas",
+    response_model=ProductVelocityResponse,
+)
+async def product_sales_velocity(
+    params: ProductVelocityRequest,
+    request: Request,
+    session: AsyncSession = Depends(get_db_session),
+):
+    if params.end < params.start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+
+    developer_ids = await get_user_developer_ids(request, session)
+    result = await ProductMetricsService(session).sales_velocity(
+        developer_ids=developer_ids,
+        start=params.start,
+        end=params.end,
+        product_ids=params.product_id,
+        limit=params.limit,
+    )
+    return RawJSONResponse(dumps(result))
@@ -110,7 +110,7 @@ async def login(
     )
 
     # issue tokens
-    access_token = create_access_token(user.id, user.username)
+    access_token = create_access_token(user.id, user.username, developer_ids=user.developer_ids)
     refresh_token = generate_refresh_token()
 
     # persist refresh token (store hash)
@@ -172,7 +172,9 @@ async def refresh_token(
     await rsvc.revoke_by_hash(incoming_hash, revoked_at=now)
 
     # issue new tokens (rotate refresh token)
-    access_token = create_access_token(rec.user_id, username)
+    access_token = create_access_token(
+        rec.user_id, username, developer_ids=user.developer_ids if user is not None else None
+    )
     new_refresh = generate_refresh_token()
 
     # persist new refresh token
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, Field, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.responses import Response
+
+from app.core.db import get_db_session, get_session_factory
+from app.core.serialization import RawJSONResponse, dumps
+from app.routes import analytics, buyer, dashboard, imvu_user, income_transaction, product, recipient
+from app.security.developer_scope import get_user_developer_ids
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/batch", tags=["Batch"])
+
+MAX_QUERIES = 32
+# Sub-queries running at once; each holds its own pooled connection
+BATCH_CONCURRENCY = 8
+
+# type -> (route handler, params model or None, name of the handler's params argument)
+_QUERIES: dict[str, tuple[Callable[..., Awaitable[Any]], Optional[type[BaseModel]], str]] = {
+    "buyer.list": (buyer.list_buyers, imvu_user.PaginationParams, "params"),
+    "buyer.options": (buyer.list_buyer_options, buyer.BuyerOptionsRequest, "body"),
+    "recipient.list": (recipient.list_recipients, imvu_user.PaginationParams, "params"),
+    "recipient.options": (recipient.list_recipient_options, recipient.RecipientOptionsRequest, "body"),
+    "product.list": (product.list_products, imvu_user.PaginationParams, "params"),
+    "product.options": (product.list_product_options, product.ProductOptionsRequest, "body"),
+    "imvu_user.list": (imvu_user.list_imvu_users, imvu_user.PaginationParams, "params"),
+    "income_transaction.list": (
+        income_transaction.list_income_transactions,
+        income_transaction.IncomeTransactionPaginationParams,
+        "params",
+    ),
+    "dashboard.summary": (dashboard.get_dashboard_summary, None, ""),
+    "analytics.income.timeseries": (analytics.income_timeseries, analytics.IncomeTimeseriesRequest, "params"),
+    "analytics.income.aggregate": (analytics.income_aggregate, analytics.IncomeAggregateRequest, "params"),
+    "analytics.income.unique_users": (analytics.income_unique_users, analytics.UniqueUsersRequest, "params"),
+    "analytics.income.spend_distribution": (
+        analytics.income_spend_distribution,
+        analytics.SpendDistributionRequest,
+        "params",
+    ),
+    "analytics.product.funnel": (analytics.product_funnel, analytics.ProductFunnelRequest, "params"),
+    "analytics.product.velocity": (analytics.product_sales_velocity, analytics.ProductVelocityRequest, "params"),
+}
+
+
+class BatchQuery(BaseModel):
+    name: str = Field(..., min_length=1, max_length=64, description="Caller's key for this result")
+    type: str = Field(..., description="One of: " + ", ".join(_QUERIES))
+    params: dict[str, Any] = Field(default_factory=dict, description="Body of the corresponding endpoint")
+
+
+class BatchRequest(BaseModel):
+    queries: List[BatchQuery] = Field(..., min_length=1, max_length=MAX_QUERIES)
+
+
+class BatchResult(BaseModel):
+    name: str
+    type: str
+    status: int
+    elapsed_ms: float
+    data: Any
+
+
+class BatchResponse(BaseModel):
+    elapsed_ms: float
+    results: List[BatchResult]
+
+
+def _encode(result: Any) -> tuple[int, bytes]:
+    if isinstance(result, Response):
+        return result.status_code, bytes(result.body)
+    return 200, dumps(jsonable_encoder(result))
+
+
+async def _run_one(
+    query: BatchQuery,
+    request: Request,
+    session_factory: async_sessionmaker[AsyncSession],
+    semaphore: asyncio.Semaphore,
+) -> tuple[int, bytes, float]:
+    handler, model, arg = _QUERIES[query.type]
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            kwargs: dict[str, Any] = {}
+            if model is not None:
+                kwargs[arg] = model.model_validate(query.params)
+            async with session_factory() as session:
+                status, body = _encode(await handler(request=request, session=session, **kwargs))
+        except ValidationError as exc:
+            status, body = 422, dumps({"detail": jsonable_encoder(exc.errors(include_url=False))})
+        except HTTPException as exc:
+            status, body = exc.status_code, dumps({"detail": exc.detail})
+        except Exception:
+            logger.exception("Batch query %r (%s) failed", query.name, query.type)
+            status, body = 500, dumps({"detail": "Internal Server Error"})
+        return status, body, (time.perf_counter() - started) * 1000
+
+
+@router.post(
+    "",
+    operation_id="runBatch",
+    summary="Run several list/options/analytics queries concurrently in one request",
+    response_model=BatchResponse,
+)
+async def run_batch(
+    body: BatchRequest,
+    request: Request,
+    session: AsyncSession = Depends(get_db_session),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+):
+    """Run each sub-query as its endpoint would, on its own session, with the caller's developer ids
+    resolved once. Results keep request order; a failing sub-query reports its own status and
+    `detail` without failing the batch.
+    """
+    started = time.perf_counter()
+    unknown = sorted({q.type for q in body.queries if q.type not in _QUERIES})
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown query type(s): {', '.join(unknown)}")
+    if len({q.name for q in body.queries}) != len(body.queries):
+        raise HTTPException(status_code=400, detail="Query names must be unique")
+
+    developer_ids = await get_user_developer_ids(request, session)
+    # sub-queries read this instead of resolving the developer ids again
+    request.state.developer_ids = tuple(developer_ids)
+
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    outcomes = await asyncio.gather(*(_run_one(q, request, session_factory, semaphore) for q in body.queries))
+
+    # Sub-results are already encoded; splice them in rather than decoding and re-encoding
+    parts = []
+    for query, (status, data, elapsed_ms) in zip(body.queries, outcomes):
+        meta = dumps({"name": query.name, "type": query.type, "status": status, "elapsed_ms": round(elapsed_ms, 3)})
+        parts.append(meta[:-1] + b',"data":' + data + b"}")
+    total_ms = round((time.perf_counter() - started) * 1000, 3)
+    return RawJSONResponse(b'{"elapsed_ms":' + dumps(total_ms) + b',"results":[' + b",".join(parts) + b"]}")
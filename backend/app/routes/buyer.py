@@ -5,14 +5,15 @@ from typing import List
 from datetime import datetime
 
 from app.routes.imvu_user import OrderItem, PaginationParams
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, Request
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
 from app.core.db import get_db_session
+from app.core.serialization import RawJSONResponse, dumps
+from app.security.developer_scope import get_user_developer_ids
 from app.services.buyer_service import BuyerService
-from app.services.user_service import UserService
+from app.services.options_index_service import OptionsIndexService
 
 
 router = APIRouter(prefix="/buyer", tags=["Buyer"])
@@ -59,15 +60,7 @@ async def list_buyers(
 ):
     """Return paginated buyer aggregated stats."""
 
-    principal = getattr(request.state, "principal", None)
-    if principal is None:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
-    user = await UserService(session).get_by_id(principal.user_id)
-    if user is None:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
-    developer_ids = user.developer_ids
+    developer_ids = await get_user_developer_ids(request, session)
     if not developer_ids:
         return PaginatedBuyerResponse(total=0, page=params.page, page_size=params.page_size, items=[])
 
@@ -80,21 +73,24 @@ async def list_buyers(
         developer_ids=developer_ids,
     )
 
+    # Rows are already column-projected; encode them directly in the PaginatedBuyerResponse shape.
     result_items = [
-        BuyerSummary(
-            id=int(r["user_id"]),
-            name=r.get("user_name"),
-            buy_count=int(r["buy_count"]),
-            total_spent=r.get("total_spent") or Decimal(0),
-            total_credits=r.get("total_credits") or Decimal(0),
-            total_promo_credits=r.get("total_promo_credits") or Decimal(0),
-            first_seen=r.get("first_seen_at"),
-            last_seen=r.get("last_seen_at"),
-        )
+        {
+            "id": int(r["user_id"]),
+            "name": r.get("user_name"),
+            "buy_count": int(r["buy_count"]),
+            "total_spent": r.get("total_spent") or Decimal(0),
+            "total_credits": r.get("total_credits") or Decimal(0),
+            "total_promo_credits": r.get("total_promo_credits") or Decimal(0),
+            "first_seen": r.get("first_seen_at"),
+            "last_seen": r.get("last_seen_at"),
+        }
         for r in items
     ]
 
-    return PaginatedBuyerResponse(total=total, page=params.page, page_size=params.page_size, items=result_items)
+    return RawJSONResponse(
+        dumps({"total": total, "page": params.page, "page_size": params.page_size, "items": result_items})
+    )
 
 
 @router.post(
@@ -109,72 +105,16 @@ async def list_buyer_options(
     session: AsyncSession = Depends(get_db_session),
 ):
     """Return select options for buyers. If `keyword` is provided and non-empty, search users by name or id.
-    Otherwise return the most-recent 20 buyers by payment time.
+    Otherwise return the most-recent 20 buyers by payment time. Served from the per-developer options index.
     """
 
-    principal = getattr(request.state, "principal", None)
-    if principal is None:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
-    user = await UserService(session).get_by_id(principal.user_id)
-    if user is None:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
-    developer_ids = user.developer_ids
+    developer_ids = await get_user_developer_ids(request, session)
     if not developer_ids:
         return []
 
     keyword = (body.keyword or "").strip()
-    limit = max(1, int(body.limit or 20))
-
-    # If keyword provided, search ImvuUser by name (case-insensitive) or by id when numeric.
-    if keyword:
-        from sqlalchemy import or_
-        from app.models import ImvuUser
-
-        stmt = None
-        try:
-            user_id = int(keyword)
-        except Exception:
-            user_id = None
-
-        if user_id is not None:
-            stmt = select(ImvuUser.user_id, ImvuUser.user_name).where(
-                or_(ImvuUser.user_id == user_id, ImvuUser.user_name.ilike(f"%{keyword}%"))
-            )
-        else:
-            stmt = select(ImvuUser.user_id, ImvuUser.user_name).where(ImvuUser.user_name.ilike(f"%{keyword}%"))
-
-        stmt = stmt.where(ImvuUser.developer_user_id.in_(developer_ids))
-        stmt = stmt.order_by(ImvuUser.user_name).limit(50)
-        res = await session.execute(stmt)
-        rows = res.mappings().all()
-        options = [BuyerOption(value=int(r["user_id"]), label=r.get("user_name")) for r in rows]
-        return options
-
-    # Fallback: get buyers from IncomeTransaction ordered by latest transaction_time
-    from sqlalchemy import func, desc
-    from app.models import IncomeTransaction, ImvuUser
-
-    subq = (
-        select(
-            IncomeTransaction.buyer_user_id.label("buyer_user_id"),
-            func.max(IncomeTransaction.transaction_time).label("last_paid"),
-        )
-        .where(IncomeTransaction.developer_user_id.in_(developer_ids))
-        .group_by(IncomeTransaction.buyer_user_id)
-        .order_by(desc(func.max(IncomeTransaction.transaction_time)))
-        .limit(limit)
-        .subquery()
-    )
-
-    stmt = (
-        select(ImvuUser.user_id, ImvuUser.user_name)
-        .join(subq, ImvuUser.user_id == subq.c.buyer_user_id)
-        .order_by(desc(subq.c.last_paid))
-    )
+    # keyword searches keep returning up to 50 matches; the recent fallback honours `limit`
+    limit = 50 if keyword else max(1, int(body.limit or 20))
 
-    res = await session.execute(stmt)
-    rows = res.mappings().all()
-    options = [BuyerOption(value=int(r["user_id"]), label=r.get("user_name")) for r in rows]
-    return options
+    items = await OptionsIndexService(session).options("buyer", developer_ids, keyword=keyword, limit=limit)
+    return [BuyerOption(value=oid, label=name) for oid, name in items]
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import List
+
+from fastapi import APIRouter, Depends, Request
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import get_db_session
+from app.core.serialization import RawJSONResponse
+from app.security.developer_scope import get_user_developer_ids
+from app.services.dashboard_service import DashboardService
+
+
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+
+class DashboardTopProduct(BaseModel):
+    id: int
+    name: str | None = None
+    transaction_count: int
+    income_total_credits: float
+
+
+class DashboardSummary(BaseModel):
+    developer_ids: List[int]
+    data_version: int
+    generated_at: datetime
+
+    transaction_count: int
+    gift_count: int
+    gift_share: float
+    unique_buyers: int
+    unique_recipients: int
+    product_count: int
+
+    paid_total_credits: float
+    income_credits: float
+    income_promo_credits: float
+    income_total_credits: float
+
+    first_sale_day: date | None = None
+    last_sale_day: date | None = None
+    recent_days: int
+    recent_income_total_credits: float
+
+    top_products: List[DashboardTopProduct]
+
+
+@router.get(
+    "/summary",
+    operation_id="getDashboardSummary",
+    summary="KPI bundle for the current user's developers",
+    response_model=DashboardSummary,
+)
+async def get_dashboard_summary(
+    request: Request,
+    session: AsyncSession = Depends(get_db_session),
+):
+    developer_ids = await get_user_developer_ids(request, session)
+    payload = await DashboardService(session).summary_json(developer_ids)
+    # Cached bundles are stored already encoded
+    return RawJSONResponse(payload)
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+from typing import List, Literal
+
+from fastapi import APIRouter, Depends, Request
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import get_db_session
+from app.core.serialization import RawJSONResponse, dumps
+from app.security.developer_scope import get_user_developer_ids
+from app.services.gift_graph_service import GiftGraphService
+
+
+router = APIRouter(prefix="/graph", tags=["Graph"])
+
+
+class GraphUser(BaseModel):
+    user_id: int
+    name: str | None = None
+    out_partners: int
+    in_partners: int
+    gifts_sent: int
+    gifts_received: int
+    credits_sent: float
+    credits_received: float
+
+
+class GraphUserRef(BaseModel):
+    user_id: int
+    name: str | None = None
+
+
+class EgoRequest(BaseModel):
+    user_id: int
+    direction: Literal["out", "in", "both"] = "both"
+    limit: int = Field(100, ge=1, le=1000, description="Maximum number of partners returned")
+
+
+class EgoNeighbor(BaseModel):
+    user_id: int
+    name: str | None = None
+    direction: Literal["out", "in"]
+    gift_count: int
+    paid_total_credits: float
+
+
+class EgoResponse(BaseModel):
+    user: GraphUser | GraphUserRef
+    neighbor_count: int
+    neighbors: List[EgoNeighbor]
+
+
+@router.post(
+    "/ego",
+    operation_id="getGiftEgoNetwork",
+    summary="A user's gift partners",
+    response_model=EgoResponse,
+)
+async def gift_ego_network(
+    params: EgoRequest,
+    request: Request,
+    session: AsyncSession = Depends(get_db_session),
+):
+    developer_ids = await get_user_developer_ids(request, session)
+    result = await GiftGraphService(session).ego(
+        developer_ids=developer_ids, user_id=params.user_id, direction=params.direction, limit=params.limit
+    )
+    return RawJSONResponse(dumps(result))
+
+
+class NeighborhoodRequest(BaseModel):
+    user_id: int
+    hops: int = Field(2, ge=1, le=4)
+    direction: Literal["out", "in", "both"] = "both"
+    max_nodes: int = Field(500, ge=1, le=5000, description="Node cap; the last hop keeps its most active users")
+
+
+class NeighborhoodNode(GraphUser):
+    hop: int
+
+
+class GraphEdge(BaseModel):
+    source: int
+    target: int
+    gift_count: int
+    paid_total_credits: float
+
+
+class NeighborhoodResponse(BaseModel):
+    truncated: bool
+    nodes: List[NeighborhoodNode]
+    edges: List[GraphEdge]
+
+
+@router.post(
+    "/neighborhood",
+    operation_id="getGiftNeighborhood",
+    summary="Users within k gift hops of a user and the edges among them",
+    response_model=NeighborhoodResponse,
+)
+async def gift_neighborhood(
+    params: NeighborhoodRequest,
+    request: Request,
+    session: AsyncSession = Depends(get_db_session),
+):
+    developer_ids = await get_user_developer_ids(request, session)
+    result = await GiftGraphService(session).neighborhood(
+        developer_ids=developer_ids,
+        user_id=params.user_id,
+        hops=params.hops,
+        direction=params.direction,
+        max_nodes=params.max_nodes,
+    )
+    return RawJSONResponse(dumps(result))
+
+
+class ComponentsRequest(BaseModel):
+    min_size: int = Field(2, ge=2)
+    limit: int = Field(50, ge=1, le=500, description="Maximum number of components returned")
+    members: int = Field(10, ge=0, le=100, description="Most active members listed per component")
+
+
+class GraphComponent(BaseModel):
+    size: int
+    edge_count: int
+    gift_count: int
+    paid_total_credits: float
+    members: List[GraphUser]
+
+
+class ComponentsResponse(BaseModel):
+    node_count: int
+    edge_count: int
+    component_count: int
+    components: List[GraphComponent]
+
+
+@router.post(
+    "/components",
+    operation_id="getGiftComponents",
+    summary="Connected gifting clusters",
+    response_model=ComponentsResponse,
+)
+async def gift_components(
+    params: ComponentsRequest,
+    request: Request,
+    session: AsyncSession = Depends(get_db_session),
+):
+    developer_ids = await get_user_developer_ids(request, session)
+    result = await GiftGraphService(session).components(
+        developer_ids=developer_ids, min_size=params.min_size, limit=params.limit, members=params.members
+    )
+    return RawJSONResponse(dumps(result))
+
+
+class DegreeRequest(BaseModel):
+    direction: Literal["out", "in", "both"] = "out"
+    weight: Literal["partners", "gift_count", "paid_total_credits"] = "paid_total_credits"
+    limit: int = Field(100, ge=1, le=1000)
+
+
+class DegreeItem(GraphUser):
+    score: float
+
+
+class DegreeResponse(BaseModel):
+    direction: str
+    weight: str
+    node_count: int
+    items: List[DegreeItem]
+
+
+@router.post(
+    "/degree",
+    operation_id="getGiftDegreeRanking",
+    summary="Users ranked by gift partners, gifts or credits",
+    response_model=DegreeResponse,
+)
+async def gift_degree_ranking(
+    params: DegreeRequest,
+    request: Request,
+    session: AsyncSession = Depends(get_db_session),
+):
+    developer_ids = await get_user_developer_ids(request, session)
+    result = await GiftGraphService(session).degree_ranking(
+        developer_ids=developer_ids, direction=params.direction, weight=params.weight, limit=params.limit
+    )
+    return RawJSONResponse(dumps(result))
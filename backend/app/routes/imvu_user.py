@@ -3,13 +3,13 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, Request
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.db import get_db_session
+from app.security.developer_scope import get_user_developer_ids
 from app.services.imvu_user_service import ImvuUserService
-from app.services.user_service import UserService
 
 
 router = APIRouter(prefix="/imvu_user", tags=["IMVU User"])
@@ -54,15 +54,7 @@ async def list_imvu_users(
 ):
     """Return paginated imvu users (summary fields)."""
 
-    principal = getattr(request.state, "principal", None)
-    if principal is None:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
-    user = await UserService(session).get_by_id(principal.user_id)
-    if user is None:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
-    developer_ids = user.developer_ids
+    developer_ids = await get_user_developer_ids(request, session)
     if not developer_ids:
         return PaginatedImvuUserResponse(total=0, page=params.page, page_size=params.page_size, items=[])
 
@@ -1,16 +1,25 @@
 from __future__ import annotations
 
+import csv
+import io
+import os
 from datetime import datetime
+from typing import AsyncIterator, Literal
 
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from starlette.background import BackgroundTask
 
 from app.core.db import get_db_session
-from app.services.income_transaction_service import IncomeTransactionService
+from app.core.serialization import RawJSONResponse, dumps
+from app.services.columnar_export_service import ColumnarExportService
+from app.services.income_transaction_service import EXPORT_COLUMNS, IncomeTransactionService
 from app.routes.imvu_user import ImvuUserSummary, OrderItem
-from app.routes.product import ProductSummary, _get_user_developer_ids
+from app.routes.product import ProductSummary
+from app.security.developer_scope import get_user_developer_ids
 
 
 router = APIRouter(prefix="/income_transaction", tags=["IncomeTransaction"])
@@ -61,6 +70,96 @@ class IncomeTransactionPaginationParams(BaseModel):
     recipient_user_id: list[int] | None = None
 
 
+class IncomeTransactionExportParams(BaseModel):
+    format: Literal["csv", "ndjson", "npz"] = Field(
+        "csv",
+        description="csv (with header row), ndjson (one JSON object per line) or npz (typed NumPy columns)",
+    )
+    orders: list[OrderItem] = []
+
+    product_id: list[int] | None = None
+    buyer_user_id: list[int] | None = None
+    recipient_user_id: list[int] | None = None
+
+
+# credit columns are emitted as JSON numbers in NDJSON, matching the list API
+_EXPORT_FLOAT_COLUMNS = {
+    "paid_credits",
+    "paid_promo_credits",
+    "income_credits",
+    "income_promo_credits",
+    "paid_total_credits",
+    "income_total_credits",
+}
+
+
+def _row_to_item(row: tuple) -> dict:
+    """Convert a `list_paginated_rows` tuple into an `IncomeTransactionItem`-shaped dict."""
+    (
+        transaction_id,
+        transaction_time,
+        product_id,
+        developer_user_id,
+        buyer_user_id,
+        recipient_user_id,
+        reseller_user_id,
+        paid_credits,
+        paid_promo_credits,
+        income_credits,
+        income_promo_credits,
+        paid_total_credits,
+        income_total_credits,
+        created_at,
+        product_ref,
+        product_name,
+        price,
+        visible,
+        buyer_ref,
+        buyer_name,
+        recipient_ref,
+        recipient_name,
+    ) = row
+
+    product = None
+    if product_ref is not None:
+        product = {
+            "id": product_ref,
+            "name": product_name,
+            "visible": visible,
+            "price": str(float(price)),
+            "first_sold_at": None,
+            "last_sold_at": None,
+        }
+
+    buyer_user = None
+    if buyer_ref is not None:
+        buyer_user = {"id": buyer_ref, "name": buyer_name, "first_seen": None, "last_seen": None}
+
+    recipient_user = None
+    if recipient_ref is not None:
+        recipient_user = {"id": recipient_ref, "name": recipient_name, "first_seen": None, "last_seen": None}
+
+    return {
+        "transaction_id": transaction_id,
+        "transaction_time": transaction_time,
+        "product_id": product_id,
+        "product": product,
+        "developer_user_id": developer_user_id,
+        "buyer_user_id": buyer_user_id,
+        "buyer_user": buyer_user,
+        "recipient_user_id": recipient_user_id,
+        "recipient_user": recipient_user,
+        "reseller_user_id": reseller_user_id,
+        "paid_credits": float(paid_credits),
+        "paid_promo_credits": float(paid_promo_credits),
+        "income_credits": float(income_credits),
+        "income_promo_credits": float(income_promo_credits),
+        "paid_total_credits": float(paid_total_credits),
+        "income_total_credits": float(income_total_credits),
+        "created_at": created_at,
+    }
+
+
 @router.post(
     "/list",
     operation_id="listIncomeTransactions",
@@ -72,13 +171,13 @@ async def list_income_transactions(
     request: Request,
     session: AsyncSession = Depends(get_db_session),
 ):
-    developer_ids = await _get_user_developer_ids(request, session)
+    developer_ids = await get_user_developer_ids(request, session)
     if not developer_ids:
         return PaginatedIncomeTransactionResponse(total=0, page=params.page, page_size=params.page_size, items=[])
 
     svc = IncomeTransactionService(session)
 
-    rows, total = await svc.list_paginated_with_relations(
+    rows, total = await svc.list_paginated_rows(
         page=params.page,
         per_page=params.page_size,
         orders=params.orders,
@@ -88,50 +187,89 @@ async def list_income_transactions(
         developer_ids=developer_ids,
     )
 
-    result_items: list[IncomeTransactionItem] = []
-    for t, prod, buyer, recipient in rows:
-        prod_summary = (
-            ProductSummary(
-                id=prod.product_id,
-                name=prod.product_name,
-                visible=prod.visible,
-                price=float(prod.price),
-            )
-            if prod is not None
-            else None
+    # Encode the projected rows directly; the shape matches PaginatedIncomeTransactionResponse.
+    return RawJSONResponse(
+        dumps(
+            {
+                "total": total,
+                "page": params.page,
+                "page_size": params.page_size,
+                "items": [_row_to_item(r) for r in rows],
+            }
         )
+    )
 
-        buyer_summary = (
-            ImvuUserSummary(id=buyer.user_id, name=buyer.user_name) if buyer is not None else None
-        )
-        recipient_summary = (
-            ImvuUserSummary(id=recipient.user_id, name=recipient.user_name)
-            if recipient is not None
-            else None
+
+async def _csv_chunks(batches: AsyncIterator) -> AsyncIterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(EXPORT_COLUMNS)
+    # send the header before the query runs so the client sees the first byte at once
+    yield buf.getvalue().encode("utf-8")
+    async for batch in batches:
+        buf.seek(0)
+        buf.truncate()
+        writer.writerows(
+            [None if v is None else v.isoformat() if isinstance(v, datetime) else v for v in row] for row in batch
         )
+        yield buf.getvalue().encode("utf-8")
 
-        result_items.append(
-            IncomeTransactionItem(
-                transaction_id=t.transaction_id,
-                transaction_time=t.transaction_time,
-                product_id=t.product_id,
-                product=prod_summary,
-                developer_user_id=t.developer_user_id,
-                buyer_user_id=t.buyer_user_id,
-                buyer_user=buyer_summary,
-                recipient_user_id=t.recipient_user_id,
-                recipient_user=recipient_summary,
-                reseller_user_id=getattr(t, "reseller_user_id", None),
-                paid_credits=float(t.paid_credits),
-                paid_promo_credits=float(t.paid_promo_credits),
-                income_credits=float(t.income_credits),
-                income_promo_credits=float(t.income_promo_credits),
-                paid_total_credits=float(t.paid_total_credits),
-                income_total_credits=float(t.income_total_credits),
-                created_at=getattr(t, "created_at", None),
-            )
+
+async def _ndjson_chunks(batches: AsyncIterator) -> AsyncIterator[bytes]:
+    float_positions = [i for i, name in enumerate(EXPORT_COLUMNS) if name in _EXPORT_FLOAT_COLUMNS]
+    async for batch in batches:
+        lines = []
+        for row in batch:
+            values = list(row)
+            for i in float_positions:
+                values[i] = float(values[i])
+            lines.append(dumps(dict(zip(EXPORT_COLUMNS, values))))
+        lines.append(b"")
+        yield b"\n".join(lines)
+
+
+@router.post(
+    "/export",
+    operation_id="exportIncomeTransactions",
+    summary="Export all matching IncomeTransaction rows as CSV, NDJSON or NumPy npz",
+)
+async def export_income_transactions(
+    params: IncomeTransactionExportParams,
+    request: Request,
+    session: AsyncSession = Depends(get_db_session),
+):
+    developer_ids = await get_user_developer_ids(request, session)
+
+    if params.format == "npz":
+        path = await ColumnarExportService(session).export_transactions(
+            developer_ids=developer_ids,
+            orders=params.orders,
+            product_ids=params.product_id,
+            buyer_user_ids=params.buyer_user_id,
+            recipient_user_ids=params.recipient_user_id,
         )
+        return FileResponse(
+            path,
+            media_type="application/octet-stream",
+            filename="income_transactions.npz",
+            background=BackgroundTask(os.unlink, path),
+        )
+
+    batches = IncomeTransactionService(session).stream_export_rows(
+        orders=params.orders,
+        product_ids=params.product_id,
+        buyer_user_ids=params.buyer_user_id,
+        recipient_user_ids=params.recipient_user_id,
+        developer_ids=developer_ids,
+    )
+
+    if params.format == "ndjson":
+        body, media_type, filename = _ndjson_chunks(batches), "application/x-ndjson", "income_transactions.ndjson"
+    else:
+        body, media_type, filename = _csv_chunks(batches), "text/csv; charset=utf-8", "income_transactions.csv"
 
-    return PaginatedIncomeTransactionResponse(
-        total=total, page=params.page, page_size=params.page_size, items=result_items
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
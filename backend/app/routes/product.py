@@ -1,18 +1,22 @@
 from __future__ import annotations
 
-from datetime import datetime
+import os
+from datetime import date, datetime
 from decimal import Decimal
 from typing import List
 
 from app.routes.imvu_user import OrderItem, PaginationParams
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import FileResponse
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from starlette.background import BackgroundTask
 
 from app.core.db import get_db_session
+from app.security.developer_scope import get_user_developer_ids
+from app.services.columnar_export_service import ColumnarExportService
 from app.services.product_service import ProductService
-from app.services.user_service import UserService
+from app.services.options_index_service import OptionsIndexService
 
 
 router = APIRouter(prefix="/product", tags=["Product"])
@@ -44,18 +48,6 @@ class ProductOptionsRequest(BaseModel):
     limit: int = Field(20, description="Maximum number of options to return when using recent products fallback")
 
 
-async def _get_user_developer_ids(request: Request, session: AsyncSession) -> list[int]:
-    principal = getattr(request.state, "principal", None)
-    if principal is None:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
-    user = await UserService(session).get_by_id(principal.user_id)
-    if user is None:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
-    return user.developer_ids
-
-
 @router.post(
     "/list",
     operation_id="listProducts",
@@ -69,7 +61,7 @@ async def list_products(
 ):
     """Return paginated products (only summary fields). Parameters are passed as an object via `Depends` for future extension."""
 
-    developer_ids = await _get_user_developer_ids(request, session)
+    developer_ids = await get_user_developer_ids(request, session)
     if not developer_ids:
         return PaginatedProductResponse(total=0, page=params.page, page_size=params.page_size, items=[])
 
@@ -109,63 +101,48 @@ async def list_product_options(
     session: AsyncSession = Depends(get_db_session),
 ):
     """Return select options for products. If `keyword` is provided and non-empty, search products by name or id.
-    Otherwise return the most-recent products by sale time.
+    Otherwise return the most-recent products by sale time. Served from the per-developer options index.
     """
 
-    developer_ids = await _get_user_developer_ids(request, session)
+    developer_ids = await get_user_developer_ids(request, session)
     if not developer_ids:
         return []
 
     keyword = (body.keyword or "").strip()
-    limit = max(1, int(body.limit or 20))
-
-    if keyword:
-        from sqlalchemy import or_
-        from app.models import Product
-
-        try:
-            pid = int(keyword)
-        except Exception:
-            pid = None
-
-        if pid is not None:
-            stmt = select(Product.product_id, Product.product_name).where(
-                or_(Product.product_id == pid, Product.product_name.ilike(f"%{keyword}%"))
-            )
-        else:
-            stmt = select(Product.product_id, Product.product_name).where(Product.product_name.ilike(f"%{keyword}%"))
-
-        stmt = stmt.where(Product.developer_user_id.in_(developer_ids))
-        stmt = stmt.order_by(Product.product_name).limit(50)
-        res = await session.execute(stmt)
-        rows = res.mappings().all()
-        options = [ProductOption(value=int(r["product_id"]), label=r.get("product_name")) for r in rows]
-        return options
-
-    # Fallback: get products from IncomeTransaction ordered by latest transaction_time
-    from sqlalchemy import func, desc
-    from app.models import IncomeTransaction, Product
-
-    subq = (
-        select(
-            IncomeTransaction.product_id.label("product_id"),
-            func.max(IncomeTransaction.transaction_time).label("last_sold"),
-        )
-        .where(IncomeTransaction.developer_user_id.in_(developer_ids))
-        .group_by(IncomeTransaction.product_id)
-        .order_by(desc(func.max(IncomeTransaction.transaction_time)))
-        .limit(limit)
-        .subquery()
-    )
+    # keyword searches keep returning up to 50 matches; the recent fallback honours `limit`
+    limit = 50 if keyword else max(1, int(body.limit or 20))
+
+    items = await OptionsIndexService(session).options("product", developer_ids, keyword=keyword, limit=limit)
+    return [ProductOption(value=oid, label=name) for oid, name in items]
+
+
+class ProductSnapshotExportParams(BaseModel):
+    start: date | None = Field(None, description="First snapshot day (inclusive)")
+    end: date | None = Field(None, description="Last snapshot day (inclusive)")
+    product_id: list[int] | None = None
 
-    stmt = (
-        select(Product.product_id, Product.product_name)
-        .join(subq, Product.product_id == subq.c.product_id)
-        .where(Product.developer_user_id.in_(developer_ids))
-        .order_by(desc(subq.c.last_sold))
-    )
 
-    res = await session.execute(stmt)
-    rows = res.mappings().all()
-    options = [ProductOption(value=int(r["product_id"]), label=r.get("product_name")) for r in rows]
-    return options
+@router.post(
+    "/snapshot/export",
+    operation_id="exportProductSnapshots",
+    summary="Export typed product snapshot metrics as a NumPy npz file",
+)
+async def export_product_snapshots(
+    params: ProductSnapshotExportParams,
+    request: Request,
+    session: AsyncSession = Depends(get_db_session),
+):
+    developer_ids = await get_user_developer_ids(request, session)
+
+    path = await ColumnarExportService(session).export_snapshots(
+        developer_ids=developer_ids,
+        start=params.start,
+        end=params.end,
+        product_ids=params.product_id,
+    )
+    return FileResponse(
+        path,
+        media_type="application/octet-stream",
+        filename="product_snapshots.npz",
+        background=BackgroundTask(os.unlink, path),
+    )
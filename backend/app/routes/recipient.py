@@ -5,14 +5,15 @@ from typing import List
 from datetime import datetime
 
 from app.routes.imvu_user import OrderItem, PaginationParams
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, Request
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
 from app.core.db import get_db_session
+from app.core.serialization import RawJSONResponse, dumps
+from app.security.developer_scope import get_user_developer_ids
 from app.services.recipient_service import RecipientService
-from app.services.user_service import UserService
+from app.services.options_index_service import OptionsIndexService
 
 
 router = APIRouter(prefix="/recipient", tags=["Recipient"])
@@ -59,15 +60,7 @@ async def list_recipients(
 ):
     """Return paginated recipient aggregated stats."""
 
-    principal = getattr(request.state, "principal", None)
-    if principal is None:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
-    user = await UserService(session).get_by_id(principal.user_id)
-    if user is None:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
-    developer_ids = user.developer_ids
+    developer_ids = await get_user_developer_ids(request, session)
     if not developer_ids:
         return PaginatedRecipientResponse(total=0, page=params.page, page_size=params.page_size, items=[])
 
@@ -80,21 +73,24 @@ async def list_recipients(
         developer_ids=developer_ids,
     )
 
+    # Rows are already column-projected; encode them directly in the PaginatedRecipientResponse shape.
     result_items = [
-        RecipientSummary(
-            id=int(r["user_id"]),
-            name=r.get("user_name"),
-            receive_count=int(r["receive_count"]),
-            total_received=r.get("total_received") or Decimal(0),
-            total_credits=r.get("total_credits") or Decimal(0),
-            total_promo_credits=r.get("total_promo_credits") or Decimal(0),
-            first_seen=r.get("first_seen_at"),
-            last_seen=r.get("last_seen_at"),
-        )
+        {
+            "id": int(r["user_id"]),
+            "name": r.get("user_name"),
+            "receive_count": int(r["receive_count"]),
+            "total_received": r.get("total_received") or Decimal(0),
+            "total_credits": r.get("total_credits") or Decimal(0),
+            "total_promo_credits": r.get("total_promo_credits") or Decimal(0),
+            "first_seen": r.get("first_seen_at"),
+            "last_seen": r.get("last_seen_at"),
+        }
         for r in items
     ]
 
-    return PaginatedRecipientResponse(total=total, page=params.page, page_size=params.page_size, items=result_items)
+    return RawJSONResponse(
+        dumps({"total": total, "page": params.page, "page_size": params.page_size, "items": result_items})
+    )
 
 
 @router.post(
@@ -109,70 +105,16 @@ async def list_recipient_options(
     session: AsyncSession = Depends(get_db_session),
 ):
     """Return select options for recipients. If `keyword` provided, search users by name or id.
-    Otherwise return the most-recent recipients by payment time.
+    Otherwise return the most-recent recipients by payment time. Served from the per-developer options index.
     """
 
-    principal = getattr(request.state, "principal", None)
-    if principal is None:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
-    user = await UserService(session).get_by_id(principal.user_id)
-    if user is None:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
-    developer_ids = user.developer_ids
+    developer_ids = await get_user_developer_ids(request, session)
     if not developer_ids:
         return []
 
     keyword = (body.keyword or "").strip()
-    limit = max(1, int(body.limit or 20))
-
-    if keyword:
-        from sqlalchemy import or_
-        from app.models import ImvuUser
-
-        try:
-            user_id = int(keyword)
-        except Exception:
-            user_id = None
-
-        if user_id is not None:
-            stmt = select(ImvuUser.user_id, ImvuUser.user_name).where(
-                or_(ImvuUser.user_id == user_id, ImvuUser.user_name.ilike(f"%{keyword}%"))
-            )
-        else:
-            stmt = select(ImvuUser.user_id, ImvuUser.user_name).where(ImvuUser.user_name.ilike(f"%{keyword}%"))
-
-        stmt = stmt.where(ImvuUser.developer_user_id.in_(developer_ids))
-        stmt = stmt.order_by(ImvuUser.user_name).limit(50)
-        res = await session.execute(stmt)
-        rows = res.mappings().all()
-        options = [RecipientOption(value=int(r["user_id"]), label=r.get("user_name")) for r in rows]
-        return options
-
-    # Fallback: get recipients from IncomeTransaction ordered by latest transaction_time
-    from sqlalchemy import func, desc
-    from app.models import IncomeTransaction, ImvuUser
-
-    subq = (
-        select(
-            IncomeTransaction.recipient_user_id.label("recipient_user_id"),
-            func.max(IncomeTransaction.transaction_time).label("last_paid"),
-        )
-        .where(IncomeTransaction.developer_user_id.in_(developer_ids))
-        .group_by(IncomeTransaction.recipient_user_id)
-        .order_by(desc(func.max(IncomeTransaction.transaction_time)))
-        .limit(limit)
-        .subquery()
-    )
-
-    stmt = (
-        select(ImvuUser.user_id, ImvuUser.user_name)
-        .join(subq, ImvuUser.user_id == subq.c.recipient_user_id)
-        .order_by(desc(subq.c.last_paid))
-    )
+    # keyword searches keep returning up to 50 matches; the recent fallback honours `limit`
+    limit = 50 if keyword else max(1, int(body.limit or 20))
 
-    res = await session.execute(stmt)
-    rows = res.mappings().all()
-    options = [RecipientOption(value=int(r["user_id"]), label=r.get("user_name")) for r in rows]
-    return options
+    items = await OptionsIndexService(session).options("recipient", developer_ids, keyword=keyword, limit=limit)
+    return [RecipientOption(value=oid, label=name) for oid, name in items]
@@ -0,0 +1,119 @@
+# app/security/developer_scope.py
+"""Resolve the developer ids an authenticated request may see.
+
+Resolution order: the signed `dev` claim of the access token, then a TTL/LRU
+cache of user -> developer ids, then the database. Committing a change to
+`UserDeveloper` links (or deleting a user) bumps the user's slot in a
+`SharedCounters` file, so in every worker process the cache entry is ignored
+and claims issued before the change are distrusted; the next request reloads
+the links. Users are hashed into slots; two users sharing a slot only cost
+each other a reload.
+"""
+
+from __future__ import annotations
+
+from fastapi import HTTPException, Request
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+
+from app.core.cache import LRUCache
+from app.core.shared_state import SharedCounters
+from app.models import User, UserDeveloper
+from app.services.user_service import UserService
+
+DEVELOPER_IDS_TTL_SECONDS = 300
+LINK_SLOTS = 4096
+
+# user_id -> (link version when loaded, developer ids)
+_cache: LRUCache[int, tuple[int, tuple[int, ...]]] = LRUCache(maxsize=4096, ttl=DEVELOPER_IDS_TTL_SECONDS)
+_link_versions = SharedCounters("user_links", LINK_SLOTS)
+_PENDING_KEY = "developer_scope.changed_user_ids"
+
+
+def _slot(user_id: int) -> int:
+    return int(user_id) % LINK_SLOTS
+
+
+def invalidate_user_developer_ids(user_id: int) -> None:
+    """Forget cached developer ids for `user_id` and distrust older token claims, in all workers."""
+    _link_versions.bump([_slot(user_id)])
+    _cache.pop(int(user_id))
+
+
+def _claim_is_current(user_id: int, issued_at: int | None) -> bool:
+    changed_at = _link_versions.modified(_slot(user_id))
+    if not changed_at:
+        return True
+    # `iat` has second resolution; a claim from the same second is not trusted
+    return issued_at is not None and issued_at > changed_at
+
+
+def _mark_changed(target, user_id: int | None) -> None:
+    # invalidated once the transaction commits (flushes may still roll back)
+    if user_id is None:
+        return
+    session = object_session(target)
+    if session is None:
+        invalidate_user_developer_ids(user_id)
+        return
+    session.info.setdefault(_PENDING_KEY, set()).add(int(user_id))
+
+
+@event.listens_for(UserDeveloper, "after_insert")
+@event.listens_for(UserDeveloper, "after_update")
+@event.listens_for(UserDeveloper, "after_delete")
+def _on_link_change(mapper, connection, target) -> None:
+    _mark_changed(target, target.user_id)
+
+
+@event.listens_for(User, "after_delete")
+def _on_user_delete(mapper, connection, target) -> None:
+    _mark_changed(target, target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _on_commit(session) -> None:
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        invalidate_user_developer_ids(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _on_rollback(session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def peek_user_developer_ids(principal) -> list[int] | None:
+    """Developer ids known without a database query (current token claim or cache), else None."""
+    if principal.developer_ids is not None and _claim_is_current(principal.user_id, principal.issued_at):
+        return list(principal.developer_ids)
+    cached = _cache.get(principal.user_id)
+    if cached is None or cached[0] != _link_versions.get(_slot(principal.user_id)):
+        return None
+    return list(cached[1])
+
+
+async def get_user_developer_ids(request: Request, session: AsyncSession) -> list[int]:
+    """Return the developer ids of the authenticated user, or raise 401."""
+    principal = getattr(request.state, "principal", None)
+    if principal is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    # already resolved for this request (e.g. once for all sub-queries of /batch)
+    resolved = getattr(request.state, "developer_ids", None)
+    if resolved is not None:
+        return list(resolved)
+
+    known = peek_user_developer_ids(principal)
+    if known is not None:
+        return known
+
+    # read before loading, so a change committed meanwhile leaves the entry stale
+    version = _link_versions.get(_slot(principal.user_id))
+    user = await UserService(session).get_by_id(principal.user_id)
+    if user is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    developer_ids = tuple(user.developer_ids)
+    _cache.set(principal.user_id, (version, developer_ids))
+    return list(developer_ids)
@@ -24,9 +24,17 @@ def _expires_at(minutes: int = 0, days: int = 0) -> datetime:
 	return _now_utc() + timedelta(minutes=minutes, days=days)
 
 
-def create_access_token(user_id: int, username: str, expires_minutes: int | None = None) -> str:
+def create_access_token(
+	user_id: int,
+	username: str,
+	expires_minutes: int | None = None,
+	developer_ids: list[int] | None = None,
+) -> str:
 	"""Create a JWT access token containing `sub` (user id) and `name` (username).
 
+	When `developer_ids` is given it is embedded as the signed `dev` claim so that
+	requests can be scoped without looking the user's developer links up again.
+
 	The token will be signed with `SECRET_KEY` and use `ALGORITHM`.
 	"""
 	if expires_minutes is None:
@@ -42,6 +50,8 @@ def create_access_token(user_id: int, username: str, expires_minutes: int | None
 		"exp": int(exp.timestamp()),
 		"typ": "access",
 	}
+	if developer_ids is not None:
+		payload["dev"] = [int(d) for d in developer_ids]
 
 	return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
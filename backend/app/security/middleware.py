@@ -1,21 +1,84 @@
 # app/security/middleware.py
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
+import time
 
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.cache import LRUCache
 from app.security.policy import is_docs_path, is_public_path
-from app.security.jwt import decode_token
+from app.security.jwt import decode_token, hash_token
 from app.security.models import Principal
 from app.core.config import get_settings
 
 
 _ENV = (get_settings().app.env or "dev").lower()
 
+# Verified access tokens keyed by their SHA-256 digest; each entry lives until the token's `exp`.
+_verified_tokens: LRUCache[str, Principal] = LRUCache(maxsize=10000)
+
+
+class _AuthError(Exception):
+    def __init__(self, detail: str) -> None:
+        self.detail = detail
+
+
+def _authenticate(token: str) -> Principal:
+    """Return the principal for a valid access token, from the cache when possible."""
+    digest = hash_token(token)
+    principal = _verified_tokens.get(digest)
+    if principal is not None:
+        return principal
+
+    # Validate token signature/expiry and ensure it is an access token
+    try:
+        payload = decode_token(token)
+    except Exception:
+        raise _AuthError("Invalid token") from None
+
+    if payload.get("typ") != "access":
+        raise _AuthError("Invalid token type")
+
+    try:
+        user_id = int(payload["sub"])
+    except Exception:
+        raise _AuthError("Invalid token payload") from None
+
+    dev_claim = payload.get("dev")
+    developer_ids = tuple(int(d) for d in dev_claim) if isinstance(dev_claim, list) else None
+
+    principal = Principal(
+        user_id=user_id,
+        user_name=str(payload.get("name", "")),
+        developer_ids=developer_ids,
+        issued_at=payload.get("iat"),
+    )
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next) -> Response:
-        path = request.url.path
-        root_path = (request.scope.get("root_path") or "").rstrip("/")
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        ttl = exp - time.time()
+        if ttl > 0:
+            _verified_tokens.set(digest, principal, expires_at=time.monotonic() + ttl)
+    return principal
+
+
+class AuthMiddleware:
+    """Pure ASGI authentication middleware.
+
+    Public paths pass through; every other HTTP request needs a valid Bearer
+    access token, whose principal is exposed as `request.state.principal`.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        root_path = (scope.get("root_path") or "").rstrip("/")
 
         # Handle root_path or reverse proxy prefix by stripping prefix before matching public paths
         candidates = [path]
@@ -24,34 +87,30 @@ class AuthMiddleware(BaseHTTPMiddleware):
             candidates.append(stripped)
 
         # Allow public paths
-        if any(is_docs_path(p) for p in candidates) and _ENV != "dev":
-            return JSONResponse({"detail": "API docs are disabled outside development."}, status_code=404)
+        if _ENV != "dev" and any(is_docs_path(p) for p in candidates):
+            response = JSONResponse({"detail": "API docs are disabled outside development."}, status_code=404)
+            await response(scope, receive, send)
+            return
 
         if any(is_public_path(p) for p in candidates):
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
 
         # Parse Bearer token
-        auth = request.headers.get("Authorization", "")
+        auth = Headers(scope=scope).get("authorization", "")
         if not auth.startswith("Bearer "):
-            return JSONResponse({"detail": "Not authenticated"}, status_code=401)
+            await JSONResponse({"detail": "Not authenticated"}, status_code=401)(scope, receive, send)
+            return
 
         token = auth.removeprefix("Bearer ").strip()
 
-        # Validate token signature/expiry and ensure it is an access token
-        try:
-            payload = decode_token(token)
-        except Exception:
-            return JSONResponse({"detail": "Invalid token"}, status_code=401)
-
-        if payload.get("typ") != "access":
-            return JSONResponse({"detail": "Invalid token type"}, status_code=401)
-
-        # Inject principal into request context
         try:
-            user_id = int(payload["sub"])
-        except Exception:
-            return JSONResponse({"detail": "Invalid token payload"}, status_code=401)
+            principal = _authenticate(token)
+        except _AuthError as exc:
+            await JSONResponse({"detail": exc.detail}, status_code=401)(scope, receive, send)
+            return
 
-        request.state.principal = Principal(user_id=user_id, user_name=str(payload.get("name", "")))
+        # Inject principal into request context (read back through `request.state`)
+        scope.setdefault("state", {})["principal"] = principal
 
-        return await call_next(request)
+        await self.app(scope, receive, send)
@@ -1,7 +1,12 @@
 # app/security/models.py
 from dataclasses import dataclass
+from typing import Optional, Tuple
 
 @dataclass(frozen=True)
 class Principal:
     user_id: int
     user_name: str
+    # Developer ids from the token's `dev` claim (None for tokens issued without it)
+    developer_ids: Optional[Tuple[int, ...]] = None
+    # Token `iat`, used to ignore claims issued before the user's links changed
+    issued_at: Optional[int] = None
@@ -28,9 +28,18 @@ def _allowlist() -> list[str]:
     return BASE_ALLOWLIST
 
 
+def _compile(patterns: list[str]) -> re.Pattern[str]:
+    # One alternation per list so a path is checked with a single match call
+    return re.compile("|".join(f"(?:{p})" for p in patterns))
+
+
+_PUBLIC_RE = _compile(_allowlist())
+_DOCS_RE = _compile(DEV_ONLY_ALLOWLIST)
+
+
 def is_public_path(path: str) -> bool:
-    return any(re.match(p, path) for p in _allowlist())
+    return _PUBLIC_RE.match(path) is not None
 
 
 def is_docs_path(path: str) -> bool:
-    return any(re.match(p, path) for p in DEV_ONLY_ALLOWLIST)
+    return _DOCS_RE.match(path) is not None
@@ -2,10 +2,47 @@ from __future__ import annotations
 
 from typing import List, Tuple, Optional
 
-from sqlalchemy import select, func, asc, desc, or_, cast, String
+from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.pagination import fetch_page
+from app.core.query_cache import query_cache
+from app.core.single_flight import query_key
+from app.core.sort_spec import SortSpec, model_fields
 from app.models import IncomeTransaction, ImvuUser
+from app.services.search_index_service import SearchIndexService
+
+# Built once: the labelled expressions double as sort keys
+_user_id = ImvuUser.user_id.label("user_id")
+_user_name = ImvuUser.user_name.label("user_name")
+_first_seen = ImvuUser.first_seen_at.label("first_seen_at")
+_last_seen = ImvuUser.last_seen_at.label("last_seen_at")
+_buy_count = func.count(IncomeTransaction.transaction_id).label("buy_count")
+_total_spent = func.sum(IncomeTransaction.paid_total_credits).label("total_spent")
+_total_credits = func.sum(IncomeTransaction.paid_credits).label("total_credits")
+_total_promo = func.sum(IncomeTransaction.paid_promo_credits).label("total_promo_credits")
+
+_PAGE = (
+    select(_user_id, _user_name, _first_seen, _last_seen, _buy_count, _total_spent, _total_credits, _total_promo)
+    .join_from(IncomeTransaction, ImvuUser, IncomeTransaction.buyer_user_id == ImvuUser.user_id)
+    .group_by(ImvuUser.user_id, ImvuUser.user_name, ImvuUser.first_seen_at, ImvuUser.last_seen_at)
+)
+_COUNT = select(func.count(func.distinct(IncomeTransaction.buyer_user_id))).select_from(IncomeTransaction)
+
+SORT = SortSpec(
+    {
+        **model_fields(ImvuUser),
+        "id": _user_id,
+        "name": _user_name,
+        "first_seen": _first_seen,
+        "last_seen": _last_seen,
+        "buy_count": _buy_count,
+        "total_spent": _total_spent,
+        "total_credits": _total_credits,
+        "total_promo_credits": _total_promo,
+    },
+    default=(ImvuUser.last_seen_at.desc(),),
+)
 
 
 class BuyerService:
@@ -19,120 +56,48 @@ class BuyerService:
         orders: Optional[list] = None,
         keyword: Optional[str] = None,
         developer_ids: Optional[list[int]] = None,
+    ) -> Tuple[List[dict], int]:
+        """Return (items, total_count), cached per data version (see `query_cache`)."""
+        key = query_key(
+            "buyer.list", developer_ids, page=page, per_page=per_page, orders=SORT.normalize(orders), keyword=keyword
+        )
+        return await query_cache.get_or_load(
+            key, lambda: self._list_paginated(page, per_page, orders, keyword, developer_ids)
+        )
+
+    async def _list_paginated(
+        self,
+        page: int,
+        per_page: int,
+        orders: Optional[list],
+        keyword: Optional[str],
+        developer_ids: Optional[list[int]],
     ) -> Tuple[List[dict], int]:
         if page < 1:
             page = 1
         if developer_ids is not None and len(developer_ids) == 0:
             return [], 0
         offset = (page - 1) * per_page
-        # build expressions so we can reuse them for ordering
-        user_id_expr = ImvuUser.user_id.label("user_id")
-        user_name_expr = ImvuUser.user_name.label("user_name")
-        first_seen_expr = ImvuUser.first_seen_at.label("first_seen_at")
-        last_seen_expr = ImvuUser.last_seen_at.label("last_seen_at")
-        buy_count_expr = func.count(IncomeTransaction.transaction_id).label("buy_count")
-        total_spent_expr = func.sum(IncomeTransaction.paid_total_credits).label("total_spent")
-        total_credits_expr = func.sum(IncomeTransaction.paid_credits).label("total_credits")
-        total_promo_expr = func.sum(IncomeTransaction.paid_promo_credits).label("total_promo_credits")
-
-        stmt = (
-            select(
-                user_id_expr,
-                user_name_expr,
-                first_seen_expr,
-                last_seen_expr,
-                buy_count_expr,
-                total_spent_expr,
-                total_credits_expr,
-                total_promo_expr,
-            )
-            .join_from(IncomeTransaction, ImvuUser, IncomeTransaction.buyer_user_id == ImvuUser.user_id)
-            .group_by(
-                ImvuUser.user_id,
-                ImvuUser.user_name,
-                ImvuUser.first_seen_at,
-                ImvuUser.last_seen_at,
-            )
-        )
 
+        stmt = _PAGE
         if developer_ids is not None:
             stmt = stmt.where(IncomeTransaction.developer_user_id.in_(developer_ids))
 
         # apply keyword filter when provided (fuzzy match on user_name OR user_id)
-        if keyword:
-            kw = keyword.strip()
-            if kw:
-                stmt = stmt.where(
-                    or_(
-                        ImvuUser.user_name.ilike(f"%{kw}%"),
-                        cast(ImvuUser.user_id, String).ilike(f"%{kw}%"),
-                    )
-                )
-
-        # ordering
-        order_cols = []
-        if orders:
-            special_map = {
-                "id": user_id_expr,
-                "name": user_name_expr,
-                "first_seen": first_seen_expr,
-                "last_seen": last_seen_expr,
-                "buy_count": buy_count_expr,
-                "total_spent": total_spent_expr,
-                "total_credits": total_credits_expr,
-                "total_promo_credits": total_promo_expr,
-            }
-
-            for o in orders:
-                if hasattr(o, "property"):
-                    prop = getattr(o, "property")
-                    direction = (getattr(o, "direction", None) or "ASC").upper()
-                else:
-                    prop = o.get("property")
-                    direction = (o.get("direction") or "ASC").upper()
-
-                if not prop:
-                    continue
-
-                col = special_map.get(prop)
-                if col is None:
-                    # try direct attribute on ImvuUser
-                    col = getattr(ImvuUser, prop, None)
-                    if col is None:
-                        snake = "".join(["_" + c.lower() if c.isupper() else c for c in prop]).lstrip("_")
-                        col = getattr(ImvuUser, snake, None)
-
-                if col is not None:
-                    order_cols.append(asc(col) if direction == "ASC" else desc(col))
-
-        if order_cols:
-            stmt = stmt.order_by(*order_cols)
-        else:
-            stmt = stmt.order_by(ImvuUser.last_seen_at.desc())
-
-        stmt = stmt.offset(offset).limit(per_page)
-
-        res = await self.session.execute(stmt)
-        items = res.mappings().all()
-
-        # count with same filter when keyword present: count distinct buyer_user_id joined to ImvuUser
-        count_stmt = (
-            select(func.count(func.distinct(IncomeTransaction.buyer_user_id))).select_from(IncomeTransaction)
-        )
-        if developer_ids is not None:
-            count_stmt = count_stmt.where(IncomeTransaction.developer_user_id.in_(developer_ids))
-        if keyword:
-            kw = keyword.strip()
-            if kw:
-                count_stmt = (
-                    count_stmt.join(ImvuUser, IncomeTransaction.buyer_user_id == ImvuUser.user_id)
-                    .where(
-                        or_(
-                            ImvuUser.user_name.ilike(f"%{kw}%"),
-                            cast(ImvuUser.user_id, String).ilike(f"%{kw}%"),
-                        )
-                    )
-                )
-        cnt_res = await self.session.execute(count_stmt)
-        total = int(cnt_res.scalar_one())
-        return items, total
+        keyword_clause = await SearchIndexService(self.session).imvu_user_keyword_clause(keyword)
+        if keyword_clause is not None:
+            stmt = stmt.where(keyword_clause)
+
+        order_cols, _ = SORT.order_by(orders)
+        stmt = stmt.order_by(*order_cols)
+
+        def count_stmt():
+            # count with same filter when keyword present: count distinct buyer_user_id joined to ImvuUser
+            count = _COUNT
+            if developer_ids is not None:
+                count = count.where(IncomeTransaction.developer_user_id.in_(developer_ids))
+            if keyword_clause is not None:
+                count = count.join(ImvuUser, IncomeTransaction.buyer_user_id == ImvuUser.user_id).where(keyword_clause)
+            return count
+
+        return await fetch_page(self.session, stmt, count_stmt, offset=offset, limit=per_page, shape="mappings")
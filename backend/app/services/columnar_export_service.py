@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import os
+import tempfile
+from decimal import Decimal
+from datetime import date
+from typing import AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.npz_writer import ChunkedNpzWriter
+from app.models import Product
+from app.services.income_transaction_service import TRANSACTION_COLUMNS, IncomeTransactionService
+from app.services.data_sync_product_metrics_service import COUNTER_FIELDS
+from app.services.product_metrics_service import SNAPSHOT_COLUMNS, ProductMetricsService
+
+# Credits are stored as int64 fixed-point: value * CREDIT_SCALE (Numeric(18, 6) is exact in int64)
+CREDIT_SCALE = 1_000_000
+# Product price / profit: int64 cents
+PRICE_SCALE = 100
+
+
+def _ints(values: list) -> np.ndarray:
+    return np.array([-1 if v is None else v for v in values], dtype=np.int64)
+
+
+def _fixed(scale: int) -> Callable[[list], np.ndarray]:
+    factor = Decimal(scale)
+
+    def convert(values: list) -> np.ndarray:
+        return np.array([int(Decimal(v or 0) * factor) for v in values], dtype=np.int64)
+
+    return convert
+
+
+def _datetimes(values: list) -> np.ndarray:
+    return np.array(values, dtype="datetime64[s]")
+
+
+def _dates(values: list) -> np.ndarray:
+    return np.array(values, dtype="datetime64[D]")
+
+
+def _bools(values: list) -> np.ndarray:
+    return np.array(values, dtype=np.bool_)
+
+
+# array name -> (dtype, converter) per selected column; missing ids (reseller) are -1
+TRANSACTION_ARRAYS: Dict[str, Tuple[str, Callable[[list], np.ndarray]]] = {
+    "transaction_id": ("int64", _ints),
+    "transaction_time": ("datetime64[s]", _datetimes),
+    "product_id": ("int64", _ints),
+    "developer_user_id": ("int64", _ints),
+    "buyer_user_id": ("int64", _ints),
+    "recipient_user_id": ("int64", _ints),
+    "reseller_user_id": ("int64", _ints),
+    "paid_credits": ("int64", _fixed(CREDIT_SCALE)),
+    "paid_promo_credits": ("int64", _fixed(CREDIT_SCALE)),
+    "income_credits": ("int64", _fixed(CREDIT_SCALE)),
+    "income_promo_credits": ("int64", _fixed(CREDIT_SCALE)),
+    "paid_total_credits": ("int64", _fixed(CREDIT_SCALE)),
+    "income_total_credits": ("int64", _fixed(CREDIT_SCALE)),
+    "created_at": ("datetime64[s]", _datetimes),
+}
+
+SNAPSHOT_ARRAYS: Dict[str, Tuple[str, Callable[[list], np.ndarray]]] = {
+    "product_id": ("int64", _ints),
+    "snapshot_date": ("datetime64[D]", _dates),
+    "developer_user_id": ("int64", _ints),
+    "price": ("int64", _fixed(PRICE_SCALE)),
+    "profit": ("int64", _fixed(PRICE_SCALE)),
+    "visible": ("bool", _bools),
+    **{name: ("int64", _ints) for name in COUNTER_FIELDS},
+}
+
+
+async def _write_npz(
+    batches: AsyncIterator[Sequence[tuple]],
+    columns: Sequence[str],
+    arrays: Dict[str, Tuple[str, Callable[[list], np.ndarray]]],
+) -> ChunkedNpzWriter:
+    fd, path = tempfile.mkstemp(suffix=".npz")
+    os.close(fd)
+    writer = ChunkedNpzWriter(path, {name: dtype for name, (dtype, _) in arrays.items()})
+    positions = {name: columns.index(name) for name in arrays}
+    try:
+        async for batch in batches:
+            if not batch:
+                continue
+            by_column: List[tuple] = list(zip(*batch))
+            writer.append(
+                {name: convert(list(by_column[positions[name]])) for name, (_, convert) in arrays.items()}
+            )
+    except BaseException:
+        writer.discard()
+        os.unlink(path)
+        raise
+    return writer
+
+
+async def _close(writer: ChunkedNpzWriter, extra: Dict[str, np.ndarray]) -> str:
+    try:
+        await run_in_threadpool(writer.close, extra)
+    except BaseException:
+        os.unlink(writer.path)
+        raise
+    return writer.path
+
+
+class ColumnarExportService:
+    """Typed `.npz` extracts for pandas/NumPy users.
+
+    Rows are pulled from a server-side cursor and appended column by column,
+    one batch at a time. Every array without `__` in its name is one column of
+    equal length (`pd.DataFrame({k: f[k] for k in f.files if "__" not in k})`);
+    fixed-point columns carry their scale in a `<name>__scale` array. Returns
+    the path of a temporary file the caller must delete.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def export_transactions(
+        self,
+        developer_ids: list[int],
+        orders: Optional[list] = None,
+        product_ids: Optional[list[int]] = None,
+        buyer_user_ids: Optional[list[int]] = None,
+        recipient_user_ids: Optional[list[int]] = None,
+    ) -> str:
+        batches = IncomeTransactionService(self.session).stream_export_rows(
+            orders=orders,
+            product_ids=product_ids,
+            buyer_user_ids=buyer_user_ids,
+            recipient_user_ids=recipient_user_ids,
+            developer_ids=developer_ids,
+            with_names=False,
+        )
+        writer = await _write_npz(batches, TRANSACTION_COLUMNS, TRANSACTION_ARRAYS)
+
+        # product names as a small lookup table next to the id columns
+        product_ids_out: List[int] = []
+        product_names: List[str] = []
+        if developer_ids:
+            res = await self.session.execute(
+                select(Product.product_id, Product.product_name)
+                .where(Product.developer_user_id.in_(developer_ids))
+                .order_by(Product.product_id)
+            )
+            for pid, name in res.tuples().all():
+                product_ids_out.append(pid)
+                product_names.append(name or "")
+
+        extra = {
+            f"{name}__scale": np.array(CREDIT_SCALE, dtype=np.int64)
+            for name in TRANSACTION_COLUMNS
+            if name.endswith("_credits")
+        }
+        extra["product__product_id"] = np.array(product_ids_out, dtype=np.int64)
+        extra["product__product_name"] = np.array(product_names, dtype=np.str_)
+        return await _close(writer, extra)
+
+    async def export_snapshots(
+        self,
+        developer_ids: list[int],
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        product_ids: Optional[list[int]] = None,
+    ) -> str:
+        batches = ProductMetricsService(self.session).stream_snapshot_rows(
+            developer_ids=developer_ids, start=start, end=end, product_ids=product_ids
+        )
+        writer = await _write_npz(batches, SNAPSHOT_COLUMNS, SNAPSHOT_ARRAYS)
+        extra = {f"{name}__scale": np.array(PRICE_SCALE, dtype=np.int64) for name in ("price", "profit")}
+        return await _close(writer, extra)
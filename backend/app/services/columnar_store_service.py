@@ -0,0 +1,380 @@
+from __future__ import annotations
+
+import asyncio
+import shutil
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cache import LRUCache
+from app.core.data_version import get_data_version
+from app.core.shared_state import FileLock, read_json, shared_dir, write_json_atomic
+from app.models import IncomeTransaction
+from app.services.income_rollup_service import CREDIT_COLUMNS
+from app.services.name_cache_service import NameCacheService
+
+ID_COLUMNS = ("transaction_id", "product_id", "buyer_user_id", "recipient_user_id")
+LOAD_BATCH_SIZE = 20_000
+# Re-read rows created this long before the newest loaded row, to catch
+# imports whose rows were committed after a later `created_at` was seen
+SYNC_OVERLAP = timedelta(minutes=10)
+
+GROUP_BY_KEYS = ("product", "buyer", "recipient", "day", "month", "weekday", "hour")
+AGGREGATE_METRICS = ("transaction_count", "gift_count", *CREDIT_COLUMNS)
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+COLUMN_DTYPES: Dict[str, np.dtype] = {
+    "time": np.dtype(np.int64),
+    **{c: np.dtype(np.int64) for c in ID_COLUMNS},
+    **{c: np.dtype(np.float64) for c in CREDIT_COLUMNS},
+}
+
+
+class TransactionColumns:
+    """One developer's transactions as parallel read-only NumPy arrays.
+
+    Times are seconds since the epoch (`transaction_time` is naive, so no
+    timezone is applied). The arrays are maps of the shared column files of
+    one published generation.
+    """
+
+    def __init__(self, pointer: Dict, arrays: Dict[str, np.ndarray]) -> None:
+        self.generation: int = pointer["generation"]
+        # rows are only ever appended within one base directory
+        self.base: str = pointer["base"]
+        self.data_version: int = pointer["data_version"]
+        self.size: int = pointer["size"]
+        # newest `created_at` loaded, for incremental loads
+        self.watermark: Optional[datetime] = datetime.fromisoformat(pointer["watermark"]) if pointer["watermark"] else None
+        self._arrays = arrays
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self._arrays[name]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in self._arrays.values())
+
+
+def _batch_to_columns(batch: Sequence[tuple]) -> Dict[str, np.ndarray]:
+    """Convert (transaction_time, ids..., credits..., created_at) rows to arrays."""
+    cols = list(zip(*batch))
+    times = np.array(cols[0], dtype="datetime64[s]").astype(np.int64)
+    out: Dict[str, np.ndarray] = {"time": times}
+    for i, name in enumerate(ID_COLUMNS, start=1):
+        out[name] = np.array(cols[i], dtype=np.int64)
+    for i, name in enumerate(CREDIT_COLUMNS, start=1 + len(ID_COLUMNS)):
+        out[name] = np.array(cols[i], dtype=np.float64)
+    return out
+
+
+class _ColumnarRegistry:
+    """Per-developer column files shared by all worker processes.
+
+    Each developer has a directory under `shared_dir()/columnar` with one raw
+    little-endian file per column and a `current.json` pointer naming the
+    published generation: its directory, row count, `created_at` watermark and
+    the data version it reflects. Workers map the files read-only, so the page
+    cache holds a single copy however many workers there are.
+
+    When the pointer is behind the developer's data version, the worker that
+    takes the developer's file lock becomes the leader: it appends the rows
+    created since the watermark past the published row count (readers of the
+    old generation never look there), then swaps the pointer atomically with
+    the next generation number. Others wait for the lock and map the result.
+    """
+
+    def __init__(self, max_developers: int = 64) -> None:
+        self._entries: LRUCache[int, TransactionColumns] = LRUCache(maxsize=max_developers)
+        self._locks: dict[int, asyncio.Lock] = {}
+
+    @staticmethod
+    def _dir(developer_id: int) -> Path:
+        path = shared_dir() / "columnar" / str(int(developer_id))
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def is_published(self, developer_id: int) -> bool:
+        return (self._dir(developer_id) / "current.json").exists()
+
+    async def get(self, session: AsyncSession, developer_id: int) -> TransactionColumns:
+        version = get_data_version(developer_id)
+        columns = self._entries.get(developer_id)
+        if columns is not None and columns.data_version >= version:
+            return columns
+
+        lock = self._locks.setdefault(developer_id, asyncio.Lock())
+        async with lock:
+            columns = self._entries.get(developer_id)
+            if columns is not None and columns.data_version >= version:
+                return columns
+            pointer = read_json(self._dir(developer_id) / "current.json")
+            if pointer is None or pointer["data_version"] < version:
+                pointer = await self._publish(session, developer_id, version)
+            if columns is None or columns.generation != pointer["generation"]:
+                columns = self._map(developer_id, pointer)
+            self._entries.set(developer_id, columns)
+            return columns
+
+    def _map(self, developer_id: int, pointer: Dict) -> TransactionColumns:
+        base = self._dir(developer_id) / pointer["base"]
+        size = pointer["size"]
+        arrays = {}
+        for name, dtype in COLUMN_DTYPES.items():
+            if size == 0:
+                arrays[name] = np.empty(0, dtype=dtype)
+            else:
+                arrays[name] = np.memmap(base / f"{name}.bin", dtype=dtype, mode="r", shape=(size,))
+        return TransactionColumns(pointer, arrays)
+
+    async def _publish(self, session: AsyncSession, developer_id: int, version: int) -> Dict:
+        directory = self._dir(developer_id)
+        file_lock = FileLock(directory / ".lock")
+        await run_in_threadpool(file_lock.acquire)
+        try:
+            pointer = read_json(directory / "current.json")
+            if pointer is not None and pointer["data_version"] >= version:
+                # another worker published while we waited
+                return pointer
+            # stamp with the version current before reading, so a concurrent import triggers another round
+            version = get_data_version(developer_id)
+
+            current = None
+            if pointer is not None:
+                try:
+                    current = self._map(developer_id, pointer)
+                except (OSError, ValueError):
+                    current = None
+            if current is None:
+                # first load, or unreadable files: start a fresh directory
+                generation = pointer["generation"] + 1 if pointer is not None else 1
+                pointer = {"generation": generation - 1, "base": f"g{generation}", "size": 0, "watermark": None}
+                (directory / pointer["base"]).mkdir(exist_ok=True)
+                current = TransactionColumns({**pointer, "data_version": 0}, {})
+
+            size, watermark = await self._append_new_rows(session, developer_id, directory / pointer["base"], current)
+            published = {
+                "generation": pointer["generation"] + 1,
+                "base": pointer["base"],
+                "size": size,
+                "watermark": watermark.isoformat() if watermark else None,
+                "data_version": version,
+            }
+            write_json_atomic(directory / "current.json", published)
+            for stale in directory.glob("g*"):
+                if stale.name != published["base"]:
+                    shutil.rmtree(stale, ignore_errors=True)
+            return published
+        finally:
+            file_lock.release()
+
+    async def _append_new_rows(
+        self, session: AsyncSession, developer_id: int, base: Path, current: TransactionColumns
+    ) -> Tuple[int, Optional[datetime]]:
+        """Write rows created since `current.watermark` after its last row; returns (size, watermark)."""
+        stmt = select(
+            IncomeTransaction.transaction_time,
+            *(getattr(IncomeTransaction, c) for c in ID_COLUMNS),
+            *(getattr(IncomeTransaction, c) for c in CREDIT_COLUMNS),
+            IncomeTransaction.created_at,
+        ).where(IncomeTransaction.developer_user_id == developer_id)
+
+        known_ids: Optional[np.ndarray] = None
+        if current.watermark is not None:
+            stmt = stmt.where(IncomeTransaction.created_at >= current.watermark - SYNC_OVERLAP)
+            known_ids = np.sort(current["transaction_id"]) if current.size else None
+
+        # rows past the published size are leftovers of an interrupted append; overwrite them
+        files = {}
+        for name, dtype in COLUMN_DTYPES.items():
+            f = open(base / f"{name}.bin", "ab+")
+            f.seek(current.size * dtype.itemsize)
+            f.truncate()
+            files[name] = f
+
+        size, watermark = current.size, current.watermark
+        result = await session.stream(stmt.execution_options(yield_per=LOAD_BATCH_SIZE))
+        try:
+            async for batch in result.partitions():
+                if not batch:
+                    continue
+                batch_max = max(row[-1] for row in batch)
+                watermark = batch_max if watermark is None else max(watermark, batch_max)
+                new = _batch_to_columns(batch)
+                if known_ids is not None:
+                    pos = np.searchsorted(known_ids, new["transaction_id"])
+                    seen = (pos < known_ids.size) & (known_ids[np.minimum(pos, known_ids.size - 1)] == new["transaction_id"])
+                    new = {name: array[~seen] for name, array in new.items()}
+                for name, dtype in COLUMN_DTYPES.items():
+                    files[name].write(np.ascontiguousarray(new[name], dtype=dtype).tobytes())
+                size += len(new["transaction_id"])
+        finally:
+            await result.close()
+            for f in files.values():
+                f.close()
+        return size, watermark
+
+
+_registry = _ColumnarRegistry()
+
+
+def _epoch_seconds(value: datetime) -> int:
+    """Seconds since `_EPOCH` of a naive (stored) time; aware times are converted to naive UTC first."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return int((value - _EPOCH).total_seconds())
+
+
+def _group_keys(columns: TransactionColumns, group_by: str, mask: np.ndarray) -> np.ndarray:
+    if group_by == "product":
+        return columns["product_id"][mask]
+    if group_by == "buyer":
+        return columns["buyer_user_id"][mask]
+    if group_by == "recipient":
+        return columns["recipient_user_id"][mask]
+
+    seconds = columns["time"][mask]
+    if group_by == "hour":
+        return (seconds // 3600) % 24
+    days = seconds // 86400
+    if group_by == "day":
+        return days
+    if group_by == "weekday":
+        # 1970-01-01 was a Thursday; 0 = Monday
+        return (days + 3) % 7
+    # month as months since epoch
+    return seconds.astype("datetime64[s]").astype("datetime64[M]").astype(np.int64)
+
+
+def _key_label(group_by: str, key: int):
+    if group_by == "day":
+        return (_EPOCH + timedelta(days=int(key))).date()
+    if group_by == "month":
+        return np.datetime64(int(key), "M").astype("datetime64[D]").item()
+    return int(key)
+
+
+class ColumnarStoreService:
+    """Ad hoc slices of income transactions from memory-mapped NumPy columns.
+
+    Columns are loaded on first use per developer and topped up with the rows
+    of later imports (see `_ColumnarRegistry`); filters are boolean masks and group-bys use
+    `np.unique` + `np.bincount`, so a query makes no database round trip.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def columns(self, developer_id: int) -> TransactionColumns:
+        """The current columns of one developer (loaded or topped up as needed)."""
+        return await _registry.get(self.session, developer_id)
+
+    async def refresh(self, developer_ids) -> None:
+        """Bring developers that already have published columns up to date (after an import)."""
+        for developer_id in {int(d) for d in developer_ids if d is not None}:
+            if _registry.is_published(developer_id):
+                await _registry.get(self.session, developer_id)
+
+    async def aggregate(
+        self,
+        developer_ids: List[int],
+        group_by: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        product_ids: Optional[List[int]] = None,
+        buyer_user_ids: Optional[List[int]] = None,
+        recipient_user_ids: Optional[List[int]] = None,
+        gifts_only: bool = False,
+        metric: str = "income_total_credits",
+        top: int = 20,
+        ascending: bool = False,
+    ) -> Dict:
+        """Filter, group and rank transactions; returns the top `top` groups by `metric`.
+
+        `start` is inclusive and `end` exclusive. Times with a UTC offset are compared in UTC.
+        """
+        if group_by not in GROUP_BY_KEYS:
+            raise ValueError(f"Unsupported group_by: {group_by}")
+        if metric not in AGGREGATE_METRICS:
+            raise ValueError(f"Unsupported metric: {metric}")
+
+        keys_parts: List[np.ndarray] = []
+        value_parts: Dict[str, List[np.ndarray]] = {m: [] for m in ("gift_count", *CREDIT_COLUMNS)}
+        scanned = 0
+        for developer_id in sorted(set(developer_ids)):
+            columns = await self.columns(developer_id)
+            scanned += columns.size
+            if columns.size == 0:
+                continue
+
+            mask = np.ones(columns.size, dtype=bool)
+            if start is not None:
+                mask &= columns["time"] >= _epoch_seconds(start)
+            if end is not None:
+                mask &= columns["time"] < _epoch_seconds(end)
+            if product_ids:
+                mask &= np.isin(columns["product_id"], product_ids)
+            if buyer_user_ids:
+                mask &= np.isin(columns["buyer_user_id"], buyer_user_ids)
+            if recipient_user_ids:
+                mask &= np.isin(columns["recipient_user_id"], recipient_user_ids)
+            gifts = columns["buyer_user_id"] != columns["recipient_user_id"]
+            if gifts_only:
+                mask &= gifts
+
+            keys_parts.append(_group_keys(columns, group_by, mask))
+            value_parts["gift_count"].append(gifts[mask].astype(np.float64))
+            for c in CREDIT_COLUMNS:
+                value_parts[c].append(columns[c][mask])
+
+        keys = np.concatenate(keys_parts) if keys_parts else np.empty(0, dtype=np.int64)
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        sums = {"transaction_count": np.bincount(inverse, minlength=unique_keys.size).astype(np.float64)}
+        for name, parts in value_parts.items():
+            values = np.concatenate(parts) if parts else np.empty(0)
+            sums[name] = np.bincount(inverse, weights=values, minlength=unique_keys.size)
+
+        ranking = sums[metric]
+        if ascending:
+            order = np.lexsort((unique_keys, ranking))[:top]
+        else:
+            order = np.lexsort((unique_keys, -ranking))[:top]
+
+        names: Dict[int, Optional[str]] = {}
+        top_keys = [int(k) for k in unique_keys[order]]
+        if group_by == "product":
+            products = await NameCacheService(self.session).products(top_keys)
+            names = {pid: info[0] for pid, info in products.items()}
+        elif group_by in ("buyer", "recipient"):
+            names = await NameCacheService(self.session).user_names(top_keys)
+
+        metric_total = float(ranking.sum())
+        groups = []
+        for i in order:
+            key = int(unique_keys[i])
+            group = {"key": _key_label(group_by, key), "name": names.get(key)}
+            for name in AGGREGATE_METRICS:
+                value = sums[name][i]
+                group[name] = int(value) if name in ("transaction_count", "gift_count") else round(float(value), 6)
+            group["share"] = float(ranking[i]) / metric_total if metric_total else None
+            groups.append(group)
+
+        return {
+            "group_by": group_by,
+            "metric": metric,
+            "rows_scanned": scanned,
+            "rows_matched": int(keys.size),
+            "group_count": int(unique_keys.size),
+            "totals": {
+                name: int(sums[name].sum()) if name in ("transaction_count", "gift_count") else round(float(sums[name].sum()), 6)
+                for name in AGGREGATE_METRICS
+            },
+            "groups": groups,
+        }
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import distinct, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import hll
+from app.core.cache import LRUCache
+from app.core.data_version import get_data_version
+from app.core.serialization import dumps
+from app.models import IncomeDailyRollup, IncomeDailySketch
+from app.services.name_cache_service import NameCacheService
+
+TOP_PRODUCTS = 10
+RECENT_DAYS = 30
+
+
+@dataclass(frozen=True)
+class DeveloperKpis:
+    """Dashboard figures for one developer, mergeable across developers."""
+
+    transaction_count: int
+    gift_count: int
+    paid_total_credits: float
+    income_credits: float
+    income_promo_credits: float
+    income_total_credits: float
+    product_count: int
+    first_day: Optional[date]
+    last_day: Optional[date]
+    # day -> income_total_credits for the last RECENT_DAYS days with data
+    recent_income: Tuple[Tuple[date, float], ...]
+    # (income_total_credits, transaction_count, product_id), best first
+    top_products: Tuple[Tuple[float, int, int], ...]
+    # HyperLogLog registers of all sketched days merged, so that unions across
+    # developers are a register maximum; with a single day its exact counts are used
+    sketch_days: int
+    buyer_hll: np.ndarray
+    recipient_hll: np.ndarray
+    day_users: Tuple[int, int]
+
+
+async def _load_developer_kpis(session: AsyncSession, developer_id: int) -> DeveloperKpis:
+    totals = (
+        await session.execute(
+            select(
+                func.sum(IncomeDailyRollup.transaction_count),
+                func.sum(IncomeDailyRollup.gift_count),
+                func.sum(IncomeDailyRollup.paid_total_credits),
+                func.sum(IncomeDailyRollup.income_credits),
+                func.sum(IncomeDailyRollup.income_promo_credits),
+                func.sum(IncomeDailyRollup.income_total_credits),
+                func.count(distinct(IncomeDailyRollup.product_id)),
+                func.min(IncomeDailyRollup.day),
+                func.max(IncomeDailyRollup.day),
+            ).where(IncomeDailyRollup.developer_user_id == developer_id)
+        )
+    ).one()
+    count, gifts, paid_total, income, income_promo, income_total, products, first_day, last_day = totals
+
+    recent: List[Tuple[date, float]] = []
+    if last_day is not None:
+        res = await session.execute(
+            select(IncomeDailyRollup.day, func.sum(IncomeDailyRollup.income_total_credits))
+            .where(
+                IncomeDailyRollup.developer_user_id == developer_id,
+                IncomeDailyRollup.day > last_day - timedelta(days=RECENT_DAYS),
+            )
+            .group_by(IncomeDailyRollup.day)
+        )
+        recent = [(day, float(value or 0)) for day, value in res.tuples().all()]
+
+    income_sum = func.sum(IncomeDailyRollup.income_total_credits)
+    res = await session.execute(
+        select(IncomeDailyRollup.product_id, income_sum, func.sum(IncomeDailyRollup.transaction_count))
+        .where(IncomeDailyRollup.developer_user_id == developer_id)
+        .group_by(IncomeDailyRollup.product_id)
+        .order_by(income_sum.desc())
+        .limit(TOP_PRODUCTS)
+    )
+    top = tuple((float(value or 0), int(n or 0), pid) for pid, value, n in res.tuples().all())
+
+    res = await session.execute(
+        select(
+            IncomeDailySketch.buyer_count,
+            IncomeDailySketch.recipient_count,
+            IncomeDailySketch.buyer_hll,
+            IncomeDailySketch.recipient_hll,
+        ).where(IncomeDailySketch.developer_user_id == developer_id)
+    )
+    buyer_hll, recipient_hll = hll.empty(), hll.empty()
+    day_users = (0, 0)
+    sketch_days = 0
+    for buyers, recipients, buyer_blob, recipient_blob in res.tuples():
+        np.maximum(buyer_hll, hll.decode(buyer_blob), out=buyer_hll)
+        np.maximum(recipient_hll, hll.decode(recipient_blob), out=recipient_hll)
+        day_users = (int(buyers), int(recipients))
+        sketch_days += 1
+
+    return DeveloperKpis(
+        transaction_count=int(count or 0),
+        gift_count=int(gifts or 0),
+        paid_total_credits=float(paid_total or 0),
+        income_credits=float(income or 0),
+        income_promo_credits=float(income_promo or 0),
+        income_total_credits=float(income_total or 0),
+        product_count=int(products or 0),
+        first_day=first_day,
+        last_day=last_day,
+        recent_income=tuple(recent),
+        top_products=top,
+        sketch_days=sketch_days,
+        buyer_hll=buyer_hll,
+        recipient_hll=recipient_hll,
+        day_users=day_users,
+    )
+
+
+class _KpiRegistry:
+    """Per-developer KPIs and encoded per-developer-set bundles, both stamped with data versions."""
+
+    def __init__(self) -> None:
+        self._developers: dict[int, Tuple[int, DeveloperKpis]] = {}
+        self._locks: dict[int, asyncio.Lock] = {}
+        # sorted developer ids -> (their versions, encoded summary)
+        self.bundles: LRUCache[Tuple[int, ...], Tuple[Tuple[int, ...], bytes]] = LRUCache(maxsize=1024)
+
+    async def developer(self, session: AsyncSession, developer_id: int) -> DeveloperKpis:
+        version = get_data_version(developer_id)
+        cached = self._developers.get(developer_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        lock = self._locks.setdefault(developer_id, asyncio.Lock())
+        async with lock:
+            cached = self._developers.get(developer_id)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            kpis = await _load_developer_kpis(session, developer_id)
+            self._developers[developer_id] = (version, kpis)
+            return kpis
+
+
+_registry = _KpiRegistry()
+
+
+class DashboardService:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def refresh(self, developer_ids: Iterable[Optional[int]]) -> None:
+        """Rebuild the KPIs of the given developers for their current data version."""
+        for developer_id in {int(d) for d in developer_ids if d is not None}:
+            await _registry.developer(self.session, developer_id)
+
+    async def summary_json(self, developer_ids: list[int]) -> bytes:
+        """Return the encoded KPI bundle for a developer set.
+
+        A bundle is reused as long as none of its developers has new data, which
+        makes a repeat dashboard load a single cache lookup.
+        """
+        key = tuple(sorted(set(developer_ids)))
+        versions = tuple(get_data_version(d) for d in key)
+        cached = _registry.bundles.get(key)
+        if cached is not None and cached[0] == versions:
+            return cached[1]
+
+        parts = [await _registry.developer(self.session, d) for d in key]
+        payload = dumps(await self._merge(key, sum(versions), parts))
+        _registry.bundles.set(key, (versions, payload))
+        return payload
+
+    async def _merge(self, key: Tuple[int, ...], data_version: int, parts: List[DeveloperKpis]) -> Dict:
+        transaction_count = sum(p.transaction_count for p in parts)
+        gift_count = sum(p.gift_count for p in parts)
+
+        # distinct buyers/recipients come from the daily sketches (about 0.8% standard error)
+        sketched = [p for p in parts if p.sketch_days]
+        if len(sketched) == 1 and sketched[0].sketch_days == 1:
+            unique_buyers, unique_recipients = sketched[0].day_users
+        elif sketched:
+            unique_buyers = hll.estimate(hll.merge(p.buyer_hll for p in sketched))
+            unique_recipients = hll.estimate(hll.merge(p.recipient_hll for p in sketched))
+        else:
+            unique_buyers = unique_recipients = 0
+
+        days = [d for p in parts for d in (p.first_day, p.last_day) if d is not None]
+        last_day = max(days) if days else None
+        recent_total = 0.0
+        if last_day is not None:
+            cutoff = last_day - timedelta(days=RECENT_DAYS)
+            recent_total = sum(v for p in parts for day, v in p.recent_income if day > cutoff)
+
+        # Products belong to one developer, so the overall top N is within the per-developer top Ns
+        top = sorted((t for p in parts for t in p.top_products), key=lambda t: (-t[0], t[2]))[:TOP_PRODUCTS]
+        products = await NameCacheService(self.session).products(pid for _, _, pid in top)
+
+        return {
+            "developer_ids": list(key),
+            "data_version": data_version,
+            "generated_at": datetime.now(timezone.utc),
+            "transaction_count": transaction_count,
+            "gift_count": gift_count,
+            "gift_share": gift_count / transaction_count if transaction_count else 0.0,
+            "unique_buyers": unique_buyers,
+            "unique_recipients": unique_recipients,
+            "product_count": sum(p.product_count for p in parts),
+            "paid_total_credits": sum(p.paid_total_credits for p in parts),
+            "income_credits": sum(p.income_credits for p in parts),
+            "income_promo_credits": sum(p.income_promo_credits for p in parts),
+            "income_total_credits": sum(p.income_total_credits for p in parts),
+            "first_sale_day": min(days) if days else None,
+            "last_sale_day": last_day,
+            "recent_days": RECENT_DAYS,
+            "recent_income_total_credits": recent_total,
+            "top_products": [
+                {
+                    "id": pid,
+                    "name": products[pid][0] if pid in products else None,
+                    "transaction_count": n,
+                    "income_total_credits": value,
+                }
+                for value, n, pid in top
+            ],
+        }
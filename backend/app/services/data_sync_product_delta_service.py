@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+from datetime import date
+
+from sqlalchemy import and_, delete, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.product_daily_delta import ProductDailyDelta
+from app.models.product_daily_metrics import ProductDailyMetrics
+from app.services.data_sync_product_metrics_service import COUNTER_FIELDS
+
+
+def merge_pairs(
+    previous: Sequence[ProductDailyMetrics], current: Sequence[ProductDailyMetrics]
+) -> Iterator[Tuple[ProductDailyMetrics, ProductDailyMetrics]]:
+    """Merge-join two snapshots sorted by product_id, yielding (previous, current) per shared product."""
+    i = j = 0
+    while i < len(previous) and j < len(current):
+        a, b = previous[i].product_id, current[j].product_id
+        if a == b:
+            yield previous[i], current[j]
+            i += 1
+            j += 1
+        elif a < b:
+            i += 1
+        else:
+            j += 1
+
+
+def compute_delta(previous: ProductDailyMetrics, current: ProductDailyMetrics) -> ProductDailyDelta:
+    counters = {}
+    reset = False
+    for field in COUNTER_FIELDS:
+        before, after = getattr(previous, field), getattr(current, field)
+        if after >= before:
+            counters[field] = after - before
+        else:
+            counters[field] = after
+            reset = True
+    return ProductDailyDelta(
+        product_id=current.product_id,
+        snapshot_date=current.snapshot_date,
+        developer_user_id=current.developer_user_id,
+        previous_date=previous.snapshot_date,
+        span_days=(current.snapshot_date - previous.snapshot_date).days,
+        reset=reset,
+        **counters,
+    )
+
+
+class DataSyncProductDeltaService:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def _neighbours(self, snapshot_date: date, product_ids: List[int], before: bool) -> List[ProductDailyMetrics]:
+        """Each product's closest snapshot before (or after) `snapshot_date`, sorted by product_id."""
+        if before:
+            closest = func.max(ProductDailyMetrics.snapshot_date)
+            condition = ProductDailyMetrics.snapshot_date < snapshot_date
+        else:
+            closest = func.min(ProductDailyMetrics.snapshot_date)
+            condition = ProductDailyMetrics.snapshot_date > snapshot_date
+        dates = (
+            select(ProductDailyMetrics.product_id, closest.label("snapshot_date"))
+            .where(ProductDailyMetrics.product_id.in_(product_ids), condition)
+            .group_by(ProductDailyMetrics.product_id)
+            .subquery()
+        )
+        stmt = (
+            select(ProductDailyMetrics)
+            .join(
+                dates,
+                and_(
+                    ProductDailyMetrics.product_id == dates.c.product_id,
+                    ProductDailyMetrics.snapshot_date == dates.c.snapshot_date,
+                ),
+            )
+            .order_by(ProductDailyMetrics.product_id)
+        )
+        res = await self.session.execute(stmt)
+        return list(res.scalars().all())
+
+    async def refresh_snapshot(self, *, snapshot_date: date, product_ids: Iterable[int]) -> int:
+        """Recompute deltas touched by the snapshot of `snapshot_date` for `product_ids`.
+
+        That is each product's delta at `snapshot_date` (against its previous
+        snapshot) and at its next later snapshot, which covers imports arriving
+        out of order and snapshots that were removed. Call after the metrics
+        rows are written (or deleted). Does not commit; returns the number of
+        deltas written.
+        """
+        pids = sorted({int(p) for p in product_ids if p is not None})
+        if not pids:
+            return 0
+        await self.session.flush()
+
+        res = await self.session.execute(
+            select(ProductDailyMetrics)
+            .where(ProductDailyMetrics.snapshot_date == snapshot_date, ProductDailyMetrics.product_id.in_(pids))
+            .order_by(ProductDailyMetrics.product_id)
+        )
+        current = list(res.scalars().all())
+        previous = await self._neighbours(snapshot_date, pids, before=True)
+        following = await self._neighbours(snapshot_date, pids, before=False)
+
+        # a later snapshot is diffed against this one, or against the previous one if this one is gone
+        current_ids = {row.product_id for row in current}
+        base_for_next = sorted(
+            current + [row for row in previous if row.product_id not in current_ids],
+            key=lambda row: row.product_id,
+        )
+
+        stale: List[Tuple[int, date]] = [(pid, snapshot_date) for pid in pids]
+        stale += [(row.product_id, row.snapshot_date) for row in following]
+        await self.session.execute(
+            delete(ProductDailyDelta).where(
+                tuple_(ProductDailyDelta.product_id, ProductDailyDelta.snapshot_date).in_(stale)
+            )
+        )
+
+        deltas = [compute_delta(a, b) for a, b in merge_pairs(previous, current)]
+        deltas += [compute_delta(a, b) for a, b in merge_pairs(base_for_next, following)]
+        self.session.add_all(deltas)
+        return len(deltas)
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from typing import Sequence, Dict, List
+
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.product_daily_metrics import ProductDailyMetrics
+
+COUNTER_FIELDS = (
+    "old_sales",
+    "new_sales",
+    "total_sales",
+    "derived_product_sales",
+    "direct_sales",
+    "indirect_sales",
+    "promoted_sales",
+    "cart_adds",
+    "wishlist_adds",
+    "organic_impressions",
+    "paid_impressions",
+)
+
+
+def parse_count(raw) -> int:
+    """Parse an exported counter ("1,234", "12.0", "") into an int; unparsable values count as 0."""
+    text = str(raw or "").strip().replace(",", "")
+    if not text:
+        return 0
+    try:
+        return int(text)
+    except ValueError:
+        try:
+            return int(Decimal(text))
+        except (InvalidOperation, ValueError):
+            return 0
+
+
+def parse_amount(raw) -> Decimal:
+    text = str(raw or "").strip().replace(",", "")
+    try:
+        return Decimal(text).quantize(Decimal("0.01"))
+    except (InvalidOperation, ValueError):
+        return Decimal("0.00")
+
+
+class DataSyncProductMetricsService:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def upsert_snapshot(self, *, sync_record_id: int, snapshot_date: date, records: Sequence[Dict]) -> List[ProductDailyMetrics]:
+        """Write typed metrics rows for one product list snapshot.
+
+        Rows already stored for the same products and day (a re-import of that
+        day) are replaced. Adds objects to the current session but does not commit.
+        """
+        rows: Dict[int, ProductDailyMetrics] = {}
+        for r in records:
+            pid = r.get("product_id")
+            if pid is None:
+                continue
+            vis_raw = r.get("visible", "")
+            rows[pid] = ProductDailyMetrics(
+                product_id=pid,
+                snapshot_date=snapshot_date,
+                developer_user_id=r.get("developer_id") or 0,
+                sync_record_id=sync_record_id,
+                price=parse_amount(r.get("price")),
+                profit=parse_amount(r.get("profit")),
+                visible=str(vis_raw).lower() in ("1", "true", "yes", "y", "t"),
+                **{field: parse_count(r.get(field)) for field in COUNTER_FIELDS},
+            )
+
+        if not rows:
+            return []
+
+        await self.session.execute(
+            delete(ProductDailyMetrics).where(
+                ProductDailyMetrics.snapshot_date == snapshot_date,
+                ProductDailyMetrics.product_id.in_(list(rows)),
+            )
+        )
+        self.session.add_all(rows.values())
+        return list(rows.values())
@@ -1,21 +1,37 @@
 from __future__ import annotations
 
-from typing import Optional, Sequence, Tuple, List
+import logging
+from typing import Awaitable, Callable, Optional, Sequence, Tuple, List
 
 from datetime import date
 
 from sqlalchemy import select, func, delete
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
+from app.core.data_version import bump_data_version
+from app.core.pagination import fetch_page
+from app.core.query_cache import query_cache
+from app.core.single_flight import query_key
 from app.models.data_sync import DataSyncRecord, DataType
 from app.models.raw_product_list import RawProductList
 from app.models.raw_income_log import RawIncomeLog
 from app.models.income_transaction import IncomeTransaction
+from app.models.product_daily_metrics import ProductDailyMetrics
 from app.services.data_sync_developer_service import DataSyncDeveloperService
 from app.services.data_sync_imvu_user_service import DataSyncImvuUserService
 from app.services.data_sync_product_service import DataSyncProductService
 from app.services.data_sync_income_service import DataSyncIncomeService
+from app.services.data_sync_product_metrics_service import DataSyncProductMetricsService
+from app.services.data_sync_product_delta_service import DataSyncProductDeltaService
+from app.services.income_rollup_service import IncomeRollupService
+from app.services.income_sketch_service import IncomeSketchService
+from app.services.columnar_store_service import ColumnarStoreService
+from app.services.dashboard_service import DashboardService
+from app.services.gift_graph_service import GiftGraphService
+
+logger = logging.getLogger(__name__)
 
 
 class DataSyncService:
@@ -25,6 +41,13 @@ class DataSyncService:
         self.imvu_user_service = DataSyncImvuUserService(session)
         self.product_service = DataSyncProductService(session)
         self.income_service = DataSyncIncomeService(session)
+        self.product_metrics_service = DataSyncProductMetricsService(session)
+        self.product_delta_service = DataSyncProductDeltaService(session)
+        self.rollup_service = IncomeRollupService(session)
+        self.sketch_service = IncomeSketchService(session)
+        self.dashboard_service = DashboardService(session)
+        self.columnar_store = ColumnarStoreService(session)
+        self.gift_graph = GiftGraphService(session)
         
 
     async def get_by_hash(self, hash_value: str, user_id: Optional[int] = None) -> Optional[DataSyncRecord]:
@@ -57,6 +80,7 @@ class DataSyncService:
         self.session.add(record)
         await self.session.commit()
         await self.session.refresh(record)
+        self._records_changed()
         return record
 
     async def delete(self, record_id: int, user_id: Optional[int] = None) -> bool:
@@ -69,8 +93,15 @@ class DataSyncService:
             return False
         await self.session.delete(record)
         await self.session.commit()
+        self._records_changed()
         return True
 
+    @staticmethod
+    def _records_changed() -> None:
+        # record lists are keyed on the global version; bumping it reaches every worker
+        bump_data_version(())
+        query_cache.invalidate(names=["data_sync.list"])
+
     async def list(
         self,
         page: int = 1,
@@ -78,12 +109,18 @@ class DataSyncService:
         type: Optional[DataType] = None,
         user_id: Optional[int] = None,
     ) -> Tuple[Sequence[DataSyncRecord], int]:
+        """Return (records, total) without file content, cached per data version."""
         if page < 1:
             page = 1
         if page_size < 1:
             page_size = 20
+        key = query_key("data_sync.list", None, page=page, page_size=page_size, type=type, user_id=user_id)
+        return await query_cache.get_or_load(key, lambda: self._list(page, page_size, type, user_id))
 
-        base_q = select(DataSyncRecord)
+    async def _list(
+        self, page: int, page_size: int, type: Optional[DataType], user_id: Optional[int]
+    ) -> Tuple[Sequence[DataSyncRecord], int]:
+        base_q = select(DataSyncRecord).options(defer(DataSyncRecord.content))
         count_q = select(func.count()).select_from(DataSyncRecord)
         if user_id is not None:
             base_q = base_q.where(DataSyncRecord.user_id == user_id)
@@ -94,13 +131,8 @@ class DataSyncService:
 
         base_q = base_q.order_by(DataSyncRecord.uploaded_at.desc())
 
-        total_res = await self.session.execute(count_q)
-        total = int(total_res.scalar_one() or 0)
-
         offset = (page - 1) * page_size
-        page_res = await self.session.execute(base_q.offset(offset).limit(page_size))
-        records = page_res.scalars().all()
-        return records, total
+        return await fetch_page(self.session, base_q, lambda: count_q, offset=offset, limit=page_size, shape="scalars")
 
     async def add_raw_product_list(self, *, sync_record_id: int, snapshot_date: date, records: Sequence[dict]) -> int:
         """Bulk insert raw product list rows for a given sync record and snapshot date.
@@ -142,8 +174,8 @@ class DataSyncService:
         await self.session.commit()
 
         # After inserting raw rows, ensure developer/imvu_user and product records.
+        developer_ids = {r.get("developer_id") for r in records if r.get("developer_id") is not None}
         try:
-            developer_ids = {r.get("developer_id") for r in records if r.get("developer_id") is not None}
             product_ids = {r.get("product_id") for r in records if r.get("product_id") is not None}
 
             await self.developer_service.ensure_developers_and_users(developer_ids=developer_ids, snapshot_date=snapshot_date)
@@ -151,9 +183,36 @@ class DataSyncService:
 
             # Commit any created/updated developer/user/product rows
             await self.session.commit()
+            imported = True
         except Exception:
-            # best-effort: log/ignore here; do not fail the raw insertion
+            # best-effort: keep the raw insertion even if deriving rows from it fails
+            logger.exception("Deriving product rows from sync record %s failed", sync_record_id)
             await self.session.rollback()
+            imported = False
+
+        if imported:
+            snapshot_product_ids: list[int] = []
+
+            async def refresh_metrics() -> None:
+                # typed per-day metrics for analytics, so queries never cast raw string columns
+                metrics = await self.product_metrics_service.upsert_snapshot(
+                    sync_record_id=sync_record_id, snapshot_date=snapshot_date, records=records
+                )
+                snapshot_product_ids.extend(m.product_id for m in metrics)
+
+            if await self._refresh_derived("product_daily_metrics", sync_record_id, refresh_metrics):
+                # per-day counter deltas against each product's previous snapshot
+                await self._refresh_derived(
+                    "product_daily_delta",
+                    sync_record_id,
+                    lambda: self.product_delta_service.refresh_snapshot(
+                        snapshot_date=snapshot_date, product_ids=snapshot_product_ids
+                    ),
+                )
+
+        # let in-process caches built from these developers' data rebuild lazily
+        bump_data_version(developer_ids)
+        query_cache.invalidate(developer_ids)
 
         return len(objs)
 
@@ -162,6 +221,32 @@ class DataSyncService:
         stmt = delete(RawProductList).where(RawProductList.sync_record_id == sync_record_id)
         res = await self.session.execute(stmt)
         await self.session.commit()
+
+        # drop the typed metrics of this snapshot and re-diff the neighbouring snapshots
+        removed: dict[date, list[int]] = {}
+        developer_ids: set[int] = set()
+
+        async def drop_metrics() -> None:
+            metrics_res = await self.session.execute(
+                select(ProductDailyMetrics.snapshot_date, ProductDailyMetrics.product_id, ProductDailyMetrics.developer_user_id).where(
+                    ProductDailyMetrics.sync_record_id == sync_record_id
+                )
+            )
+            for snapshot_date, product_id, developer_id in metrics_res.tuples().all():
+                removed.setdefault(snapshot_date, []).append(product_id)
+                developer_ids.add(developer_id)
+            await self.session.execute(delete(ProductDailyMetrics).where(ProductDailyMetrics.sync_record_id == sync_record_id))
+
+        async def refresh_deltas() -> None:
+            for snapshot_date, product_ids in removed.items():
+                await self.product_delta_service.refresh_snapshot(snapshot_date=snapshot_date, product_ids=product_ids)
+
+        if await self._refresh_derived("product_daily_metrics", sync_record_id, drop_metrics):
+            await self._refresh_derived("product_daily_delta", sync_record_id, refresh_deltas)
+
+        if developer_ids:
+            bump_data_version(developer_ids)
+            query_cache.invalidate(developer_ids)
         # rowcount may be None in some backends; coerce to int
         return int(res.rowcount or 0)
 
@@ -206,8 +291,8 @@ class DataSyncService:
         await self.session.commit()
 
         # After inserting raw rows, ensure developer/imvu_user and product records.
+        developer_ids = {r.get("developer_id") for r in records if r.get("developer_id") is not None}
         try:
-            developer_ids = {r.get("developer_id") for r in records if r.get("developer_id") is not None}
             product_ids = {r.get("product_id") for r in records if r.get("product_id") is not None}
 
             # collect and ensure developer rows and imvu users for developers
@@ -225,12 +310,76 @@ class DataSyncService:
 
             # Commit any created/updated developer/user/product rows and derived transactions
             await self.session.commit()
+            imported = True
+        except Exception:
+            # best-effort: keep the raw insertion even if deriving rows from it fails
+            logger.exception("Deriving income rows from sync record %s failed", sync_record_id)
+            await self.session.rollback()
+            imported = False
+
+        if imported:
+            # analytics tables are derived data: a failed refresh must not undo the import.
+            # Each covers the (developer, day) pairs this file touched.
+            affected_days = self._affected_days(records)
+            await self._refresh_derived(
+                "income_daily_rollup", sync_record_id, lambda: self.rollup_service.refresh_days(affected_days)
+            )
+            await self._refresh_derived(
+                "income_daily_sketch", sync_record_id, lambda: self.sketch_service.refresh_days(affected_days)
+            )
+            await self._refresh_derived(
+                "income_product_daily_sketch",
+                sync_record_id,
+                lambda: self.sketch_service.refresh_product_days(affected_days),
+            )
+
+        # let in-process caches built from these developers' data rebuild lazily
+        bump_data_version(developer_ids)
+        query_cache.invalidate(developer_ids)
+
+        # warm the dashboard figures so the next dashboard load is a cache hit
+        try:
+            await self.dashboard_service.refresh(developer_ids)
+        except Exception:
+            # best-effort: the dashboard rebuilds on demand if warming fails
+            await self.session.rollback()
+
+        # append the new transactions to published columnar stores and cached gift graphs
+        try:
+            await self.columnar_store.refresh(developer_ids)
+            await self.gift_graph.refresh(developer_ids)
         except Exception:
-            # best-effort: rollback and ignore so raw insertion remains successful
+            # best-effort: the store tops itself up on its next query
             await self.session.rollback()
 
         return len(objs)
 
+    async def _refresh_derived(self, table: str, sync_record_id: int, refresh: Callable[[], Awaitable[object]]) -> bool:
+        """Run one derived-table refresh in its own transaction after the import has committed.
+
+        A failure is logged and rolled back; the table can be rebuilt later with the scripts.
+        """
+        try:
+            await refresh()
+            await self.session.commit()
+            return True
+        except Exception:
+            logger.exception("Refreshing %s for sync record %s failed; rebuild it with scripts/", table, sync_record_id)
+            await self.session.rollback()
+            return False
+
+    @staticmethod
+    def _affected_days(records: Sequence[dict]) -> dict[int, set[date]]:
+        """Map developer_id -> calendar days of the records' purchase dates."""
+        affected: dict[int, set[date]] = {}
+        for r in records:
+            dev_id = r.get("developer_id")
+            purchase_dt = r.get("purchase_date")
+            if dev_id is None or purchase_dt is None:
+                continue
+            affected.setdefault(dev_id, set()).add(purchase_dt.date())
+        return affected
+
     async def delete_raw_income_by_sync_record(self, sync_record_id: int) -> int:
         """Delete raw_income_log rows by sync_record_id. Returns number of rows deleted."""
         stmt = delete(RawIncomeLog).where(RawIncomeLog.sync_record_id == sync_record_id)
@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import LRUCache
+from app.services.columnar_store_service import ColumnarStoreService
+from app.services.name_cache_service import NameCacheService
+
+DIRECTIONS = ("out", "in", "both")
+DEGREE_WEIGHTS = ("partners", "gift_count", "paid_total_credits")
+
+Edges = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]  # buyer, recipient, gift_count, credits
+
+
+def aggregate_edges(src: np.ndarray, dst: np.ndarray, count: np.ndarray, credits: np.ndarray) -> Edges:
+    """Sum duplicate (src, dst) pairs; the result is sorted by src, then dst."""
+    if src.size == 0:
+        return (np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.float64))
+    order = np.lexsort((dst, src))
+    src, dst = src[order], dst[order]
+    starts = np.flatnonzero(np.r_[True, (src[1:] != src[:-1]) | (dst[1:] != dst[:-1])])
+    return (
+        src[starts],
+        dst[starts],
+        np.add.reduceat(count[order].astype(np.int64), starts),
+        np.add.reduceat(credits[order].astype(np.float64), starts),
+    )
+
+
+def _gather(indptr: np.ndarray, nodes: np.ndarray) -> np.ndarray:
+    """Concatenated CSR positions `indptr[n]:indptr[n + 1]` for every n in `nodes`."""
+    starts = indptr[nodes]
+    lengths = indptr[nodes + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    offsets = np.cumsum(lengths) - lengths
+    return np.arange(total) - np.repeat(offsets - starts, lengths)
+
+
+class GiftGraph:
+    """Buyer -> recipient gift graph in compressed sparse row form.
+
+    Nodes are the sorted distinct user ids; edge `e` goes from node
+    `edge_src[e]` to `edge_dst[e]` and carries the number of gifts and the
+    credits paid. `out_indptr` indexes edges (sorted by source) per node;
+    `in_indptr`/`in_edges` is the transpose. Self-purchases are not edges.
+    """
+
+    def __init__(self, edges: Edges) -> None:
+        buyers, recipients, self.edge_count, self.edge_credits = edges
+        self.nodes = np.unique(np.concatenate([buyers, recipients]))
+        n = self.nodes.size
+        self.edge_src = np.searchsorted(self.nodes, buyers)
+        self.edge_dst = np.searchsorted(self.nodes, recipients)
+
+        self.out_indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.edge_src, minlength=n), out=self.out_indptr[1:])
+        self.in_edges = np.argsort(self.edge_dst, kind="stable")
+        self.in_indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.edge_dst, minlength=n), out=self.in_indptr[1:])
+
+        self.gifts_sent = np.bincount(self.edge_src, weights=self.edge_count, minlength=n).astype(np.int64)
+        self.gifts_received = np.bincount(self.edge_dst, weights=self.edge_count, minlength=n).astype(np.int64)
+        self.credits_sent = np.bincount(self.edge_src, weights=self.edge_credits, minlength=n)
+        self.credits_received = np.bincount(self.edge_dst, weights=self.edge_credits, minlength=n)
+        self._components: Optional[np.ndarray] = None
+
+    @property
+    def edge_total(self) -> int:
+        return int(self.edge_src.size)
+
+    def index_of(self, user_id: int) -> Optional[int]:
+        i = int(np.searchsorted(self.nodes, user_id))
+        return i if i < self.nodes.size and self.nodes[i] == user_id else None
+
+    def incident_edges(self, nodes: np.ndarray, direction: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Edge indices touching `nodes` and, for each, the node at the other end."""
+        parts_e, parts_n = [], []
+        if direction in ("out", "both"):
+            e = _gather(self.out_indptr, nodes)
+            parts_e.append(e)
+            parts_n.append(self.edge_dst[e])
+        if direction in ("in", "both"):
+            e = self.in_edges[_gather(self.in_indptr, nodes)]
+            parts_e.append(e)
+            parts_n.append(self.edge_src[e])
+        return np.concatenate(parts_e), np.concatenate(parts_n)
+
+    def components(self) -> np.ndarray:
+        """Weakly connected component label per node (the smallest node index in it)."""
+        if self._components is None:
+            labels = np.arange(self.nodes.size)
+            while True:
+                ls, ld = labels[self.edge_src], labels[self.edge_dst]
+                np.minimum.at(labels, ls, ld)
+                np.minimum.at(labels, ld, ls)
+                # pointer jumping until every node points at a root
+                while True:
+                    jumped = labels[labels]
+                    if np.array_equal(jumped, labels):
+                        break
+                    labels = jumped
+                if np.array_equal(labels[self.edge_src], labels[self.edge_dst]):
+                    break
+            self._components = labels
+        return self._components
+
+
+class _EdgeState:
+    """Aggregated edges of one developer and how many store rows they cover."""
+
+    def __init__(self, base: str, rows: int, edges: Edges) -> None:
+        self.base = base
+        self.rows = rows
+        self.edges = edges
+
+
+_edge_states: LRUCache[int, _EdgeState] = LRUCache(maxsize=64)
+_graphs: LRUCache[tuple, GiftGraph] = LRUCache(maxsize=32)
+
+
+class GiftGraphService:
+    """Gift network queries over a CSR graph derived from the columnar store.
+
+    Each developer's edges are aggregated from the store's transaction columns.
+    After an import only the appended rows are aggregated and merged into the
+    previous edges, so no query scans `income_transaction`.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+        self.store = ColumnarStoreService(session)
+
+    async def _edges(self, developer_id: int) -> _EdgeState:
+        columns = await self.store.columns(developer_id)
+        state = _edge_states.get(developer_id)
+        if state is not None and state.base == columns.base and state.rows == columns.size:
+            return state
+
+        start = state.rows if state is not None and state.base == columns.base and state.rows < columns.size else 0
+        buyers = columns["buyer_user_id"][start:]
+        recipients = columns["recipient_user_id"][start:]
+        gifts = buyers != recipients
+        new = aggregate_edges(
+            buyers[gifts],
+            recipients[gifts],
+            np.ones(int(gifts.sum()), dtype=np.int64),
+            columns["paid_total_credits"][start:][gifts],
+        )
+        if start:
+            new = aggregate_edges(*(np.concatenate([old, added]) for old, added in zip(state.edges, new)))
+        state = _EdgeState(columns.base, columns.size, new)
+        _edge_states.set(developer_id, state)
+        return state
+
+    async def graph(self, developer_ids: Sequence[int]) -> GiftGraph:
+        developer_ids = sorted(set(developer_ids))
+        states = [await self._edges(did) for did in developer_ids]
+        key = tuple((did, s.base, s.rows) for did, s in zip(developer_ids, states))
+        graph = _graphs.get(key)
+        if graph is None:
+            if len(states) == 1:
+                edges = states[0].edges
+            elif states:
+                edges = aggregate_edges(*(np.concatenate(parts) for parts in zip(*(s.edges for s in states))))
+            else:
+                edges = aggregate_edges(*(np.empty(0),) * 4)
+            graph = GiftGraph(edges)
+            _graphs.set(key, graph)
+        return graph
+
+    async def refresh(self, developer_ids) -> None:
+        """Merge newly imported rows into edges already held by this process."""
+        for developer_id in {int(d) for d in developer_ids if d is not None}:
+            if _edge_states.get(developer_id) is not None:
+                await self._edges(developer_id)
+
+    def _node_entry(self, graph: GiftGraph, i: int, names: Dict[int, Optional[str]]) -> Dict:
+        uid = int(graph.nodes[i])
+        return {
+            "user_id": uid,
+            "name": names.get(uid),
+            "out_partners": int(graph.out_indptr[i + 1] - graph.out_indptr[i]),
+            "in_partners": int(graph.in_indptr[i + 1] - graph.in_indptr[i]),
+            "gifts_sent": int(graph.gifts_sent[i]),
+            "gifts_received": int(graph.gifts_received[i]),
+            "credits_sent": round(float(graph.credits_sent[i]), 6),
+            "credits_received": round(float(graph.credits_received[i]), 6),
+        }
+
+    async def ego(self, developer_ids: List[int], user_id: int, direction: str = "both", limit: int = 100) -> Dict:
+        """A user's gift partners, strongest (by credits) first."""
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unsupported direction: {direction}")
+        graph = await self.graph(developer_ids)
+        i = graph.index_of(user_id)
+        result: Dict = {"user": None, "neighbor_count": 0, "neighbors": []}
+        if i is None:
+            result["user"] = {"user_id": user_id, "name": (await NameCacheService(self.session).user_names([user_id])).get(user_id)}
+            return result
+
+        out_e = _gather(graph.out_indptr, np.array([i]))
+        in_e = graph.in_edges[_gather(graph.in_indptr, np.array([i]))]
+        rows = []
+        if direction in ("out", "both"):
+            rows += [("out", int(graph.edge_dst[e]), e) for e in out_e]
+        if direction in ("in", "both"):
+            rows += [("in", int(graph.edge_src[e]), e) for e in in_e]
+        rows.sort(key=lambda r: (-graph.edge_credits[r[2]], r[1], r[0]))
+
+        shown = rows[:limit]
+        names = await NameCacheService(self.session).user_names([user_id, *(int(graph.nodes[n]) for _, n, _ in shown)])
+        result["user"] = self._node_entry(graph, i, names)
+        result["neighbor_count"] = len(rows)
+        result["neighbors"] = [
+            {
+                "user_id": int(graph.nodes[n]),
+                "name": names.get(int(graph.nodes[n])),
+                "direction": d,
+                "gift_count": int(graph.edge_count[e]),
+                "paid_total_credits": round(float(graph.edge_credits[e]), 6),
+            }
+            for d, n, e in shown
+        ]
+        return result
+
+    async def neighborhood(
+        self,
+        developer_ids: List[int],
+        user_id: int,
+        hops: int = 2,
+        direction: str = "both",
+        max_nodes: int = 500,
+    ) -> Dict:
+        """Users within `hops` gift edges of `user_id` and the edges among them (breadth first)."""
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unsupported direction: {direction}")
+        graph = await self.graph(developer_ids)
+        result: Dict = {"truncated": False, "nodes": [], "edges": []}
+        start = graph.index_of(user_id)
+        if start is None:
+            return result
+
+        hop_of = {start: 0}
+        frontier = np.array([start])
+        for hop in range(1, hops + 1):
+            if frontier.size == 0:
+                break
+            _, reached = graph.incident_edges(frontier, direction)
+            fresh = [int(n) for n in np.unique(reached) if int(n) not in hop_of]
+            if len(hop_of) + len(fresh) > max_nodes:
+                # keep the strongest senders/receivers of the last hop
+                fresh.sort(key=lambda n: -(graph.credits_sent[n] + graph.credits_received[n]))
+                fresh = fresh[: max_nodes - len(hop_of)]
+                result["truncated"] = True
+            for n in fresh:
+                hop_of[n] = hop
+            frontier = np.array(fresh, dtype=np.int64)
+            if result["truncated"]:
+                break
+
+        members = np.array(sorted(hop_of), dtype=np.int64)
+        out_e = _gather(graph.out_indptr, members)
+        induced = out_e[np.isin(graph.edge_dst[out_e], members)]
+        names = await NameCacheService(self.session).user_names(int(graph.nodes[n]) for n in members)
+
+        result["nodes"] = [{**self._node_entry(graph, int(n), names), "hop": hop_of[int(n)]} for n in members]
+        result["nodes"].sort(key=lambda node: (node["hop"], -node["credits_sent"] - node["credits_received"]))
+        result["edges"] = [
+            {
+                "source": int(graph.nodes[graph.edge_src[e]]),
+                "target": int(graph.nodes[graph.edge_dst[e]]),
+                "gift_count": int(graph.edge_count[e]),
+                "paid_total_credits": round(float(graph.edge_credits[e]), 6),
+            }
+            for e in induced
+        ]
+        return result
+
+    async def components(
+        self, developer_ids: List[int], min_size: int = 2, limit: int = 50, members: int = 10
+    ) -> Dict:
+        """Weakly connected gifting clusters, largest first, with their most active members."""
+        graph = await self.graph(developer_ids)
+        labels = graph.components()
+        roots, inverse, sizes = np.unique(labels, return_inverse=True, return_counts=True)
+        edge_comp = inverse[graph.edge_src]
+        edge_counts = np.bincount(edge_comp, minlength=roots.size)
+        gift_counts = np.bincount(edge_comp, weights=graph.edge_count, minlength=roots.size)
+        credits = np.bincount(edge_comp, weights=graph.edge_credits, minlength=roots.size)
+
+        keep = np.flatnonzero(sizes >= min_size)
+        keep = keep[np.lexsort((-credits[keep], -sizes[keep]))]
+        shown = keep[:limit]
+
+        # nodes grouped by component, most active first within each
+        by_component = np.lexsort((-(graph.credits_sent + graph.credits_received), inverse))
+        first = np.searchsorted(inverse[by_component], shown)
+        top_members = {int(c): by_component[f : f + min(members, int(sizes[c]))] for c, f in zip(shown, first)}
+        names = await NameCacheService(self.session).user_names(
+            int(graph.nodes[n]) for nodes in top_members.values() for n in nodes
+        )
+
+        return {
+            "node_count": int(graph.nodes.size),
+            "edge_count": graph.edge_total,
+            "component_count": int(keep.size),
+            "components": [
+                {
+                    "size": int(sizes[c]),
+                    "edge_count": int(edge_counts[c]),
+                    "gift_count": int(gift_counts[c]),
+                    "paid_total_credits": round(float(credits[c]), 6),
+                    "members": [self._node_entry(graph, int(n), names) for n in top_members[int(c)]],
+                }
+                for c in shown
+            ],
+        }
+
+    async def degree_ranking(
+        self, developer_ids: List[int], direction: str = "out", weight: str = "paid_total_credits", limit: int = 100
+    ) -> Dict:
+        """Users ranked by gifting degree: distinct partners, gifts or credits, sent and/or received."""
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unsupported direction: {direction}")
+        if weight not in DEGREE_WEIGHTS:
+            raise ValueError(f"Unsupported weight: {weight}")
+        graph = await self.graph(developer_ids)
+
+        per_direction = {
+            "partners": (np.diff(graph.out_indptr), np.diff(graph.in_indptr)),
+            "gift_count": (graph.gifts_sent, graph.gifts_received),
+            "paid_total_credits": (graph.credits_sent, graph.credits_received),
+        }[weight]
+        if direction == "out":
+            score = per_direction[0]
+        elif direction == "in":
+            score = per_direction[1]
+        else:
+            score = per_direction[0] + per_direction[1]
+
+        top = np.lexsort((graph.nodes, -score))[:limit]
+        names = await NameCacheService(self.session).user_names(int(graph.nodes[i]) for i in top)
+        return {
+            "direction": direction,
+            "weight": weight,
+            "node_count": int(graph.nodes.size),
+            "items": [{**self._node_entry(graph, int(i), names), "score": float(score[i])} for i in top],
+        }
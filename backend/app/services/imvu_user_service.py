@@ -3,10 +3,26 @@ from __future__ import annotations
 from typing import Optional, List, Tuple
 from datetime import datetime
 
-from sqlalchemy import select, func, asc, desc, or_, cast, String
+from sqlalchemy import select, func, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.pagination import fetch_page
+from app.core.query_cache import query_cache
+from app.core.single_flight import query_key
+from app.core.sort_spec import SortSpec, model_fields
 from app.models import ImvuUser
+from app.services.search_index_service import SearchIndexService
+
+SORT = SortSpec(
+    {
+        **model_fields(ImvuUser),
+        "name": ImvuUser.user_name,
+        "id": ImvuUser.user_id,
+        "first_seen": ImvuUser.first_seen_at,
+        "last_seen": ImvuUser.last_seen_at,
+    },
+    default=(desc(ImvuUser.last_seen_at),),
+)
 
 
 class ImvuUserService:
@@ -69,7 +85,23 @@ class ImvuUserService:
         `orders` is an optional list of objects or dicts with `property` and
         optional `direction` ("ASC"/"DESC"). We map common Java/camelCase
         names to model attributes and fall back to snake_case conversion.
+        Results are cached per data version (see `query_cache`).
         """
+        key = query_key(
+            "imvu_user.list", developer_ids, page=page, per_page=per_page, orders=SORT.normalize(orders), keyword=keyword
+        )
+        return await query_cache.get_or_load(
+            key, lambda: self._list_paginated(page, per_page, orders, keyword, developer_ids)
+        )
+
+    async def _list_paginated(
+        self,
+        page: int,
+        per_page: int,
+        orders: Optional[list],
+        keyword: Optional[str],
+        developer_ids: Optional[list[int]],
+    ) -> Tuple[List[ImvuUser], int]:
         if page < 1:
             page = 1
         offset = (page - 1) * per_page
@@ -83,77 +115,21 @@ class ImvuUserService:
             stmt = stmt.where(ImvuUser.developer_user_id.in_(developer_ids))
 
         # apply keyword filter when provided (fuzzy match on user_name OR user_id)
-        if keyword:
-            kw = keyword.strip()
-            if kw:
-                stmt = stmt.where(
-                    or_(
-                        ImvuUser.user_name.ilike(f"%{kw}%"),
-                        cast(ImvuUser.user_id, String).ilike(f"%{kw}%"),
-                    )
-                )
-
-        # build ordering
-        order_cols = []
-        if orders:
-            # map some common property names to model attributes
-            special_map = {
-                "name": "user_name",
-                "id": "user_id",
-                "first_seen": "first_seen_at",
-                "last_seen": "last_seen_at"
-            }
-
-            for o in orders:
-                # support either Pydantic object or plain dict
-                if hasattr(o, "property"):
-                    prop = getattr(o, "property")
-                    direction = (getattr(o, "direction", None) or "ASC").upper()
-                else:
-                    prop = o.get("property")
-                    direction = (o.get("direction") or "ASC").upper()
-
-                if not prop:
-                    continue
-
-                mapped = special_map.get(prop)
-                col = None
-                if mapped:
-                    col = getattr(ImvuUser, mapped, None)
-                else:
-                    col = getattr(ImvuUser, prop, None)
-                    if col is None:
-                        # camelCase -> snake_case
-                        snake = "".join(
-                            ["_" + c.lower() if c.isupper() else c for c in prop]
-                        ).lstrip("_")
-                        col = getattr(ImvuUser, snake, None)
-
-                if col is not None:
-                    order_cols.append(asc(col) if direction == "ASC" else desc(col))
-
-        if order_cols:
-            stmt = stmt.order_by(*order_cols)
-        else:
-            stmt = stmt.order_by(desc(ImvuUser.last_seen_at))
-
-        stmt = stmt.offset(offset).limit(per_page)
-        res = await self.session.execute(stmt)
-        items = res.scalars().all()
+        keyword_clause = await SearchIndexService(self.session).imvu_user_keyword_clause(
+            keyword, developer_ids
+        )
+        if keyword_clause is not None:
+            stmt = stmt.where(keyword_clause)
 
-        count_stmt = select(func.count()).select_from(ImvuUser)
-        if developer_ids is not None:
-            count_stmt = count_stmt.where(ImvuUser.developer_user_id.in_(developer_ids))
-        if keyword:
-            kw = keyword.strip()
-            if kw:
-                count_stmt = count_stmt.where(
-                    or_(
-                        ImvuUser.user_name.ilike(f"%{kw}%"),
-                        cast(ImvuUser.user_id, String).ilike(f"%{kw}%"),
-                    )
-                )
-
-        cnt_res = await self.session.execute(count_stmt)
-        total = int(cnt_res.scalar_one())
-        return items, total
+        order_cols, _ = SORT.order_by(orders)
+        stmt = stmt.order_by(*order_cols)
+
+        def count_stmt():
+            count = select(func.count()).select_from(ImvuUser)
+            if developer_ids is not None:
+                count = count.where(ImvuUser.developer_user_id.in_(developer_ids))
+            if keyword_clause is not None:
+                count = count.where(keyword_clause)
+            return count
+
+        return await fetch_page(self.session, stmt, count_stmt, offset=offset, limit=per_page, shape="scalars")
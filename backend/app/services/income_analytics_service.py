@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import Date, case, extract, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import IncomeDailyRollup, IncomeTransaction
+from app.services.income_rollup_service import CREDIT_COLUMNS, GRANULARITIES, period_start
+from app.services.name_cache_service import NameCacheService
+
+TIMESERIES_GRANULARITIES = ("hour", *GRANULARITIES)
+GROUP_BY_FIELDS = ("product", "buyer", "recipient")
+METRICS = ("transaction_count", "gift_count", *CREDIT_COLUMNS)
+
+# Upper bound on points per series, so a wide range at hourly granularity stays cheap
+MAX_PERIODS = 5000
+
+_TRANSACTION_GROUP_COLUMNS = {
+    "product": IncomeTransaction.product_id,
+    "buyer": IncomeTransaction.buyer_user_id,
+    "recipient": IncomeTransaction.recipient_user_id,
+}
+
+
+def period_axis(start: date, end: date, granularity: str) -> List[date | datetime]:
+    """Return every bucket start from `start` to `end` (inclusive), used for gap filling."""
+    if granularity == "hour":
+        first = datetime.combine(start, time.min)
+        count = ((end - start).days + 1) * 24
+        return [first + timedelta(hours=i) for i in range(count)]
+
+    periods: List[date | datetime] = []
+    current = period_start(start, granularity)
+    while current <= end:
+        periods.append(current)
+        if granularity == "day":
+            current += timedelta(days=1)
+        elif granularity == "week":
+            current += timedelta(weeks=1)
+        else:
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return periods
+
+
+def moving_average(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing moving average along the last axis of a 2-D array.
+
+    The first `window - 1` points average over the points available so far.
+    """
+    padded = np.concatenate([np.zeros((values.shape[0], 1)), np.cumsum(values, axis=1)], axis=1)
+    idx = np.arange(values.shape[1])
+    lower = np.maximum(idx + 1 - window, 0)
+    return (padded[:, idx + 1] - padded[:, lower]) / (idx + 1 - lower)
+
+
+class IncomeAnalyticsService:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def _rollup_rows(
+        self,
+        developer_ids: list[int],
+        start: date,
+        end: date,
+        group_by: Optional[str],
+        product_ids: Optional[list[int]],
+    ) -> Sequence[tuple]:
+        """Daily sums from `income_daily_rollup` as (day, hour, key, *metrics) rows."""
+        key_col = IncomeDailyRollup.product_id if group_by == "product" else None
+        group_cols = [IncomeDailyRollup.day] + ([key_col] if key_col is not None else [])
+        stmt = (
+            select(
+                IncomeDailyRollup.day,
+                *group_cols[1:],
+                func.sum(IncomeDailyRollup.transaction_count),
+                func.sum(IncomeDailyRollup.gift_count),
+                *(func.sum(getattr(IncomeDailyRollup, c)) for c in CREDIT_COLUMNS),
+            )
+            .where(
+                IncomeDailyRollup.developer_user_id.in_(developer_ids),
+                IncomeDailyRollup.day >= start,
+                IncomeDailyRollup.day <= end,
+            )
+            .group_by(*group_cols)
+        )
+        if product_ids:
+            stmt = stmt.where(IncomeDailyRollup.product_id.in_(product_ids))
+
+        res = await self.session.execute(stmt)
+        if key_col is None:
+            return [(day, None, None, *metrics) for day, *metrics in res.tuples().all()]
+        return [(day, None, key, *metrics) for day, key, *metrics in res.tuples().all()]
+
+    async def _transaction_rows(
+        self,
+        developer_ids: list[int],
+        start: date,
+        end: date,
+        hourly: bool,
+        group_by: Optional[str],
+        product_ids: Optional[list[int]],
+    ) -> Sequence[tuple]:
+        """Sums over `income_transaction` restricted to the range, as (day, hour, key, *metrics) rows.
+
+        Used for hourly buckets and buyer/recipient breakdowns, which the daily
+        rollup does not carry; the scan is bounded by the requested range.
+        """
+        day_expr = func.date(IncomeTransaction.transaction_time, type_=Date)
+        hour_expr = extract("hour", IncomeTransaction.transaction_time)
+        key_col = _TRANSACTION_GROUP_COLUMNS.get(group_by) if group_by else None
+
+        group_cols = [day_expr]
+        if hourly:
+            group_cols.append(hour_expr)
+        if key_col is not None:
+            group_cols.append(key_col)
+
+        stmt = (
+            select(
+                *group_cols,
+                func.count(IncomeTransaction.transaction_id),
+                func.sum(case((IncomeTransaction.buyer_user_id != IncomeTransaction.recipient_user_id, 1), else_=0)),
+                *(func.sum(getattr(IncomeTransaction, c)) for c in CREDIT_COLUMNS),
+            )
+            .where(
+                IncomeTransaction.developer_user_id.in_(developer_ids),
+                IncomeTransaction.transaction_time >= datetime.combine(start, time.min),
+                IncomeTransaction.transaction_time < datetime.combine(end + timedelta(days=1), time.min),
+            )
+            .group_by(*group_cols)
+        )
+        if product_ids:
+            stmt = stmt.where(IncomeTransaction.product_id.in_(product_ids))
+
+        res = await self.session.execute(stmt)
+        rows = []
+        for row in res.tuples().all():
+            day = row[0]
+            pos = 1
+            hour = None
+            if hourly:
+                hour = int(row[pos])
+                pos += 1
+            key = None
+            if key_col is not None:
+                key = row[pos]
+                pos += 1
+            rows.append((day, hour, key, *row[pos:]))
+        return rows
+
+    async def _series_names(self, group_by: Optional[str], keys: list[int]) -> Dict[int, Optional[str]]:
+        names = NameCacheService(self.session)
+        if group_by == "product":
+            return {pid: info[0] for pid, info in (await names.products(keys)).items()}
+        if group_by in ("buyer", "recipient"):
+            return await names.user_names(keys)
+        return {}
+
+    async def timeseries(
+        self,
+        developer_ids: list[int],
+        start: date,
+        end: date,
+        granularity: str = "day",
+        group_by: Optional[str] = None,
+        product_ids: Optional[list[int]] = None,
+        metric: str = "income_total_credits",
+        top: int = 10,
+        window: int = 7,
+    ) -> Dict:
+        """Gap-filled income series for `start`..`end` (inclusive).
+
+        Without `group_by` a single total series is returned. With it, the `top`
+        groups by `metric` get their own series and the remainder is folded into
+        one series with a null key. Each series carries every metric plus the
+        trailing moving average of `metric` over `window` periods (0 disables it).
+        """
+        if granularity not in TIMESERIES_GRANULARITIES:
+            raise ValueError(f"Unsupported granularity: {granularity}")
+        if group_by is not None and group_by not in GROUP_BY_FIELDS:
+            raise ValueError(f"Unsupported group_by: {group_by}")
+        if metric not in METRICS:
+            raise ValueError(f"Unsupported metric: {metric}")
+        if end < start:
+            raise ValueError("end must not be before start")
+
+        hourly = granularity == "hour"
+        if hourly and ((end - start).days + 1) * 24 > MAX_PERIODS:
+            raise ValueError(f"Range too large for hourly granularity (max {MAX_PERIODS // 24} days)")
+        periods = period_axis(start, end, granularity)
+        if len(periods) > MAX_PERIODS:
+            raise ValueError(f"Range too large: {len(periods)} periods (max {MAX_PERIODS})")
+
+        result: Dict = {
+            "granularity": granularity,
+            "group_by": group_by,
+            "metric": metric,
+            "periods": periods,
+            "series": [],
+        }
+        if not developer_ids:
+            return result
+
+        if hourly or group_by in ("buyer", "recipient"):
+            rows = await self._transaction_rows(developer_ids, start, end, hourly, group_by, product_ids)
+        else:
+            rows = await self._rollup_rows(developer_ids, start, end, group_by, product_ids)
+
+        period_index = {p: i for i, p in enumerate(periods)}
+        keys: List[Optional[int]] = []
+        key_index: Dict[Optional[int], int] = {}
+        n_rows = len(rows)
+        p_idx = np.empty(n_rows, dtype=np.int64)
+        g_idx = np.empty(n_rows, dtype=np.int64)
+        values = np.empty((n_rows, len(METRICS)), dtype=np.float64)
+        for i, (day, hour, key, *metrics) in enumerate(rows):
+            bucket = datetime.combine(day, time(hour)) if hourly else period_start(day, granularity)
+            p_idx[i] = period_index[bucket]
+            g = key_index.get(key)
+            if g is None:
+                g = key_index[key] = len(keys)
+                keys.append(key)
+            g_idx[i] = g
+            values[i] = [float(v or 0) for v in metrics]
+
+        if not keys:
+            if group_by is not None:
+                return result
+            keys.append(None)
+
+        # Scatter all rows into a (metric, group, period) cube in one pass per metric
+        n_groups, n_periods = len(keys), len(periods)
+        flat = g_idx * n_periods + p_idx
+        cube = np.stack(
+            [
+                np.bincount(flat, weights=values[:, m], minlength=n_groups * n_periods).reshape(n_groups, n_periods)
+                for m in range(len(METRICS))
+            ]
+        )
+
+        metric_pos = METRICS.index(metric)
+        if group_by is not None:
+            order = np.argsort(-cube[metric_pos].sum(axis=1), kind="stable")
+            head, rest = order[:top], order[top:]
+            parts = [cube[:, head]]
+            ordered_keys = [keys[i] for i in head]
+            if len(rest):
+                parts.append(cube[:, rest].sum(axis=1, keepdims=True))
+                ordered_keys.append(None)
+            cube = np.concatenate(parts, axis=1)
+            keys = ordered_keys
+
+        averages = moving_average(cube[metric_pos], window) if window > 0 else None
+        names = await self._series_names(group_by, [k for k in keys if k is not None])
+
+        for g, key in enumerate(keys):
+            series = {
+                "key": key,
+                "name": names.get(key) if key is not None else None,
+                "total": float(cube[metric_pos, g].sum()),
+            }
+            for m, name in enumerate(METRICS):
+                column = cube[m, g]
+                series[name] = column.astype(np.int64).tolist() if m < 2 else column.tolist()
+            series["moving_average"] = averages[g].tolist() if averages is not None else None
+            result["series"].append(series)
+        return result
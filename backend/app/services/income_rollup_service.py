@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List, Mapping, Optional
+
+from sqlalchemy import and_, case, delete, func, insert, literal, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import IncomeDailyRollup, IncomeTransaction
+
+GRANULARITIES = ("day", "week", "month")
+
+# Summed money columns, in the same order on income_transaction and the rollup
+CREDIT_COLUMNS = (
+    "paid_credits",
+    "paid_promo_credits",
+    "paid_total_credits",
+    "income_credits",
+    "income_promo_credits",
+    "income_total_credits",
+)
+
+
+def period_start(day: date, granularity: str) -> date:
+    """Return the first day of the bucket containing `day` (ISO weeks start on Monday)."""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def day_runs(days: List[date]) -> List[tuple[date, date]]:
+    """Collapse sorted distinct days into (first, last) runs of consecutive days."""
+    runs: List[tuple[date, date]] = []
+    for d in days:
+        if runs and d == runs[-1][1] + timedelta(days=1):
+            runs[-1] = (runs[-1][0], d)
+        else:
+            runs.append((d, d))
+    return runs
+
+
+class IncomeRollupService:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    def _aggregate_select(self):
+        day_expr = func.date(IncomeTransaction.transaction_time)
+        return select(
+            IncomeTransaction.developer_user_id,
+            IncomeTransaction.product_id,
+            day_expr,
+            func.count(IncomeTransaction.transaction_id),
+            func.sum(case((IncomeTransaction.buyer_user_id != IncomeTransaction.recipient_user_id, 1), else_=0)),
+            *(func.sum(getattr(IncomeTransaction, c)) for c in CREDIT_COLUMNS),
+            literal(datetime.now(timezone.utc), IncomeDailyRollup.updated_at.type),
+        ).group_by(IncomeTransaction.developer_user_id, IncomeTransaction.product_id, day_expr)
+
+    async def _insert_from(self, source) -> None:
+        target_cols = [
+            "developer_user_id",
+            "product_id",
+            "day",
+            "transaction_count",
+            "gift_count",
+            *CREDIT_COLUMNS,
+            "updated_at",
+        ]
+        await self.session.execute(insert(IncomeDailyRollup).from_select(target_cols, source))
+
+    async def refresh_days(self, developer_days: Mapping[int, Iterable[date]]) -> None:
+        """Recompute rollup rows for the given developer -> days from `income_transaction`.
+
+        Existing rows for those days are replaced, so refreshing is idempotent.
+        Executes in the current transaction but does not commit.
+        """
+        for developer_id, days in developer_days.items():
+            days = sorted(set(days))
+            if developer_id is None or not days:
+                continue
+
+            await self.session.execute(
+                delete(IncomeDailyRollup).where(
+                    IncomeDailyRollup.developer_user_id == developer_id,
+                    IncomeDailyRollup.day.in_(days),
+                )
+            )
+
+            # half-open time ranges over runs of consecutive days keep the scan on the transaction_time index
+            ranges = [
+                and_(
+                    IncomeTransaction.transaction_time >= datetime.combine(first, time.min),
+                    IncomeTransaction.transaction_time < datetime.combine(last + timedelta(days=1), time.min),
+                )
+                for first, last in day_runs(days)
+            ]
+            source = self._aggregate_select().where(
+                IncomeTransaction.developer_user_id == developer_id, or_(*ranges)
+            )
+            await self._insert_from(source)
+
+    async def rebuild(self, developer_ids: Optional[Iterable[int]] = None) -> None:
+        """Drop and regenerate the rollup (for all developers, or only the given ones). Commits."""
+        stmt = delete(IncomeDailyRollup)
+        source = self._aggregate_select()
+        if developer_ids is not None:
+            developer_ids = list(developer_ids)
+            stmt = stmt.where(IncomeDailyRollup.developer_user_id.in_(developer_ids))
+            source = source.where(IncomeTransaction.developer_user_id.in_(developer_ids))
+        await self.session.execute(stmt)
+        await self._insert_from(source)
+        await self.session.commit()
+
+    async def period_totals(
+        self,
+        developer_ids: list[int],
+        start: date,
+        end: date,
+        granularity: str = "day",
+        product_ids: Optional[list[int]] = None,
+    ) -> List[Dict]:
+        """Return totals per day, ISO week or month for `start`..`end` (inclusive).
+
+        Daily sums come from the rollup in one grouped query; weeks and months are
+        derived from them. Periods without sales are omitted.
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unsupported granularity: {granularity}")
+        if not developer_ids:
+            return []
+
+        stmt = (
+            select(
+                IncomeDailyRollup.day,
+                func.sum(IncomeDailyRollup.transaction_count),
+                func.sum(IncomeDailyRollup.gift_count),
+                *(func.sum(getattr(IncomeDailyRollup, c)) for c in CREDIT_COLUMNS),
+            )
+            .where(
+                IncomeDailyRollup.developer_user_id.in_(developer_ids),
+                IncomeDailyRollup.day >= start,
+                IncomeDailyRollup.day <= end,
+            )
+            .group_by(IncomeDailyRollup.day)
+            .order_by(IncomeDailyRollup.day)
+        )
+        if product_ids:
+            stmt = stmt.where(IncomeDailyRollup.product_id.in_(product_ids))
+
+        res = await self.session.execute(stmt)
+
+        buckets: Dict[date, Dict] = {}
+        for day, count, gifts, *credits in res.tuples().all():
+            key = period_start(day, granularity)
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = {
+                    "period": key,
+                    "transaction_count": 0,
+                    "gift_count": 0,
+                    **{c: Decimal(0) for c in CREDIT_COLUMNS},
+                }
+            bucket["transaction_count"] += int(count or 0)
+            bucket["gift_count"] += int(gifts or 0)
+            for name, value in zip(CREDIT_COLUMNS, credits):
+                bucket[name] += value or Decimal(0)
+        return list(buckets.values())
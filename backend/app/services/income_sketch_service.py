@@ -0,0 +1,410 @@
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import and_, delete, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import hll
+from app.core.quantile_sketch import RELATIVE_ACCURACY, QuantileSketch
+from app.models import IncomeDailySketch, IncomeProductDailySketch, IncomeTransaction
+from app.services.name_cache_service import NameCacheService
+from app.services.income_rollup_service import day_runs
+
+UNIQUE_GRANULARITIES = ("day", "week", "month", "total")
+# transaction: paid_total_credits per transaction; buyer_day: a buyer's paid_total_credits over one day
+SPEND_MEASURES = ("transaction", "buyer_day")
+EXACT_BATCH_SIZE = 20_000
+# Days refreshed per statement when rebuilding
+REBUILD_CHUNK_DAYS = 31
+
+
+def _distinct_per_group(groups: np.ndarray, ids: np.ndarray, group_count: int) -> np.ndarray:
+    """Number of distinct ids in each group."""
+    if ids.size == 0:
+        return np.zeros(group_count, dtype=np.int64)
+    order = np.lexsort((ids, groups))
+    g, v = groups[order], ids[order]
+    first = np.r_[True, (g[1:] != g[:-1]) | (v[1:] != v[:-1])]
+    return np.bincount(g[first], minlength=group_count)
+
+
+def _runs(*keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Sort order over `keys` (last key primary) and the start offsets of equal-key runs in it."""
+    order = np.lexsort(keys)
+    changed = np.zeros(order.size, dtype=bool)
+    changed[0] = True
+    for k in keys:
+        sk = k[order]
+        changed[1:] |= sk[1:] != sk[:-1]
+    return order, np.flatnonzero(changed)
+
+
+def _period_starts(days: np.ndarray, granularity: str) -> np.ndarray:
+    """Map `datetime64[D]` days to the first day of their period (ISO weeks start on Monday)."""
+    if granularity == "week":
+        # 1970-01-01 was a Thursday
+        return days - ((days.astype(np.int64) + 3) % 7)
+    if granularity == "month":
+        return days.astype("datetime64[M]").astype("datetime64[D]")
+    if granularity == "total":
+        return np.zeros_like(days)
+    return days
+
+
+class IncomeSketchService:
+    """Distinct counts and spend distributions from per-day sketches.
+
+    Distinct buyers/recipients over a range merge the day HyperLogLog
+    sketches in that range (about 0.8% standard error) instead of scanning
+    `income_transaction`; a period made of a single sketch row uses its stored
+    exact count. `exact=True` falls back to scanning the transactions of the
+    range. Spend quantiles and histograms merge the day quantile sketches.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def _day_rows(self, developer_id: int, days: Sequence[date]) -> Optional[tuple]:
+        """(day keys, day index, buyers, recipients, products, paid) of the developer's transactions on `days`."""
+        ranges = [
+            and_(
+                IncomeTransaction.transaction_time >= datetime.combine(first, time.min),
+                IncomeTransaction.transaction_time < datetime.combine(last + timedelta(days=1), time.min),
+            )
+            for first, last in day_runs(days)
+        ]
+        res = await self.session.execute(
+            select(
+                IncomeTransaction.transaction_time,
+                IncomeTransaction.buyer_user_id,
+                IncomeTransaction.recipient_user_id,
+                IncomeTransaction.product_id,
+                IncomeTransaction.paid_total_credits,
+            ).where(IncomeTransaction.developer_user_id == developer_id, or_(*ranges))
+        )
+        rows = res.tuples().all()
+        if not rows:
+            return None
+
+        times, buyers, recipients, products, paid = zip(*rows)
+        day_keys, groups = np.unique(np.array(times, dtype="datetime64[D]"), return_inverse=True)
+        return (
+            day_keys,
+            groups,
+            np.array(buyers, dtype=np.int64),
+            np.array(recipients, dtype=np.int64),
+            np.array(products, dtype=np.int64),
+            np.array(paid, dtype=np.float64),
+        )
+
+    async def refresh_days(self, developer_days: Mapping[int, Iterable[date]]) -> None:
+        """Recompute `income_daily_sketch` for the given developer -> days from `income_transaction`.
+
+        Existing rows for those days are replaced, so refreshing is idempotent.
+        Executes in the current transaction but does not commit.
+        """
+        for developer_id, days in developer_days.items():
+            days = sorted(set(days))
+            if developer_id is None or not days:
+                continue
+
+            await self.session.execute(
+                delete(IncomeDailySketch).where(
+                    IncomeDailySketch.developer_user_id == developer_id,
+                    IncomeDailySketch.day.in_(days),
+                )
+            )
+            loaded = await self._day_rows(developer_id, days)
+            if loaded is None:
+                continue
+            day_keys, groups, buyers, recipients, _, paid = loaded
+
+            buyer_regs = hll.add_grouped(np.zeros((day_keys.size, hll.REGISTERS), np.uint8), groups, buyers)
+            recipient_regs = hll.add_grouped(np.zeros((day_keys.size, hll.REGISTERS), np.uint8), groups, recipients)
+            buyer_counts = _distinct_per_group(groups, buyers, day_keys.size)
+            recipient_counts = _distinct_per_group(groups, recipients, day_keys.size)
+
+            # each buyer's spend per day, then one sketch of those totals per day
+            order, starts = _runs(buyers, groups)
+            buyer_day_spend = np.add.reduceat(paid[order], starts)
+            buyer_day_group = groups[order][starts]
+            spend_bounds = np.searchsorted(buyer_day_group, np.arange(day_keys.size + 1))
+
+            now = datetime.now(timezone.utc)
+            self.session.add_all(
+                IncomeDailySketch(
+                    developer_user_id=developer_id,
+                    day=day_keys[i].item(),
+                    buyer_count=int(buyer_counts[i]),
+                    recipient_count=int(recipient_counts[i]),
+                    buyer_hll=hll.encode(buyer_regs[i]),
+                    recipient_hll=hll.encode(recipient_regs[i]),
+                    buyer_spend_sketch=QuantileSketch.from_values(
+                        buyer_day_spend[spend_bounds[i] : spend_bounds[i + 1]]
+                    ).encode(),
+                    updated_at=now,
+                )
+                for i in range(day_keys.size)
+            )
+        await self.session.flush()
+
+    async def refresh_product_days(self, developer_days: Mapping[int, Iterable[date]]) -> None:
+        """Recompute `income_product_daily_sketch` for the given developer -> days, like `refresh_days`."""
+        for developer_id, days in developer_days.items():
+            days = sorted(set(days))
+            if developer_id is None or not days:
+                continue
+
+            await self.session.execute(
+                delete(IncomeProductDailySketch).where(
+                    IncomeProductDailySketch.developer_user_id == developer_id,
+                    IncomeProductDailySketch.day.in_(days),
+                )
+            )
+            loaded = await self._day_rows(developer_id, days)
+            if loaded is None:
+                continue
+            day_keys, groups, _, _, products, paid = loaded
+
+            order, starts = _runs(products, groups)
+            ends = np.r_[starts[1:], order.size]
+            now = datetime.now(timezone.utc)
+            self.session.add_all(
+                IncomeProductDailySketch(
+                    developer_user_id=developer_id,
+                    product_id=int(products[order[a]]),
+                    day=day_keys[groups[order[a]]].item(),
+                    paid_sketch=QuantileSketch.from_values(paid[order[a:b]]).encode(),
+                    updated_at=now,
+                )
+                for a, b in zip(starts, ends)
+            )
+        await self.session.flush()
+
+    async def rebuild(self, developer_ids: Optional[Iterable[int]] = None) -> None:
+        """Drop and regenerate the sketches (for all developers, or only the given ones). Commits."""
+        stmts = [delete(IncomeDailySketch), delete(IncomeProductDailySketch)]
+        days_stmt = select(IncomeTransaction.developer_user_id, IncomeTransaction.transaction_time)
+        if developer_ids is not None:
+            developer_ids = list(developer_ids)
+            stmts[0] = stmts[0].where(IncomeDailySketch.developer_user_id.in_(developer_ids))
+            stmts[1] = stmts[1].where(IncomeProductDailySketch.developer_user_id.in_(developer_ids))
+            days_stmt = days_stmt.where(IncomeTransaction.developer_user_id.in_(developer_ids))
+        for stmt in stmts:
+            await self.session.execute(stmt)
+        await self.session.commit()
+
+        developer_days: Dict[int, set] = {}
+        result = await self.session.stream(days_stmt.execution_options(yield_per=EXACT_BATCH_SIZE))
+        try:
+            async for batch in result.partitions():
+                for developer_id, transaction_time in batch:
+                    developer_days.setdefault(developer_id, set()).add(transaction_time.date())
+        finally:
+            await result.close()
+
+        for developer_id, days in developer_days.items():
+            days = sorted(days)
+            for i in range(0, len(days), REBUILD_CHUNK_DAYS):
+                chunk = {developer_id: days[i : i + REBUILD_CHUNK_DAYS]}
+                await self.refresh_days(chunk)
+                await self.refresh_product_days(chunk)
+                await self.session.commit()
+
+    async def unique_users(
+        self,
+        developer_ids: list[int],
+        start: date,
+        end: date,
+        granularity: str = "day",
+        exact: bool = False,
+    ) -> Dict:
+        """Distinct buyers and recipients per period of `start`..`end` (inclusive) and over the whole range."""
+        if granularity not in UNIQUE_GRANULARITIES:
+            raise ValueError(f"Unsupported granularity: {granularity}")
+        result: Dict = {
+            "granularity": granularity,
+            "exact": exact,
+            "periods": [],
+            "total": {"unique_buyers": 0, "unique_recipients": 0},
+        }
+        if not developer_ids:
+            return result
+        if exact:
+            return await self._exact(result, developer_ids, start, end, granularity)
+
+        res = await self.session.execute(
+            select(
+                IncomeDailySketch.day,
+                IncomeDailySketch.buyer_count,
+                IncomeDailySketch.recipient_count,
+                IncomeDailySketch.buyer_hll,
+                IncomeDailySketch.recipient_hll,
+            )
+            .where(
+                IncomeDailySketch.developer_user_id.in_(developer_ids),
+                IncomeDailySketch.day >= start,
+                IncomeDailySketch.day <= end,
+            )
+            .order_by(IncomeDailySketch.day)
+        )
+        rows = res.tuples().all()
+        if not rows:
+            return result
+
+        periods = _period_starts(np.array([r[0] for r in rows], dtype="datetime64[D]"), granularity)
+        buyer_total, recipient_total = hll.empty(), hll.empty()
+        for key in np.unique(periods):
+            members = [rows[i] for i in np.flatnonzero(periods == key)]
+            if len(members) == 1:
+                _, buyers, recipients, buyer_blob, recipient_blob = members[0]
+                buyer_regs, recipient_regs = hll.decode(buyer_blob), hll.decode(recipient_blob)
+            else:
+                buyer_regs = hll.merge(hll.decode(m[3]) for m in members)
+                recipient_regs = hll.merge(hll.decode(m[4]) for m in members)
+                buyers, recipients = hll.estimate(buyer_regs), hll.estimate(recipient_regs)
+            np.maximum(buyer_total, buyer_regs, out=buyer_total)
+            np.maximum(recipient_total, recipient_regs, out=recipient_total)
+            if granularity != "total":
+                result["periods"].append(
+                    {"period": key.item(), "unique_buyers": int(buyers), "unique_recipients": int(recipients)}
+                )
+
+        if len(rows) == 1:
+            result["total"] = {"unique_buyers": int(rows[0][1]), "unique_recipients": int(rows[0][2])}
+        else:
+            result["total"] = {
+                "unique_buyers": hll.estimate(buyer_total),
+                "unique_recipients": hll.estimate(recipient_total),
+            }
+        return result
+
+    async def spend_distribution(
+        self,
+        developer_ids: list[int],
+        start: date,
+        end: date,
+        measure: str = "transaction",
+        product_ids: Optional[list[int]] = None,
+        quantiles: Sequence[float] = (0.5, 0.9, 0.99),
+        bins: int = 20,
+        edges: Optional[Sequence[float]] = None,
+        per_product: int = 0,
+    ) -> Dict:
+        """Quantiles and a histogram of spend over `start`..`end` (inclusive), merged from day sketches.
+
+        `measure="transaction"` describes `paid_total_credits` per transaction
+        (optionally for `product_ids` only, with the `per_product` largest
+        products listed separately); `"buyer_day"` describes how much a buyer
+        spent on a day they bought anything. Quantile values are within 1%.
+        """
+        if measure not in SPEND_MEASURES:
+            raise ValueError(f"Unsupported measure: {measure}")
+        if any(not 0 <= q <= 1 for q in quantiles):
+            raise ValueError("quantiles must be between 0 and 1")
+        if measure == "buyer_day" and (product_ids or per_product):
+            raise ValueError("buyer_day spend cannot be filtered or split by product")
+
+        by_key: Dict[int, List[QuantileSketch]] = {}
+        if developer_ids:
+            if measure == "transaction":
+                stmt = select(IncomeProductDailySketch.product_id, IncomeProductDailySketch.paid_sketch).where(
+                    IncomeProductDailySketch.developer_user_id.in_(developer_ids),
+                    IncomeProductDailySketch.day >= start,
+                    IncomeProductDailySketch.day <= end,
+                )
+                if product_ids:
+                    stmt = stmt.where(IncomeProductDailySketch.product_id.in_(product_ids))
+            else:
+                stmt = select(IncomeDailySketch.developer_user_id, IncomeDailySketch.buyer_spend_sketch).where(
+                    IncomeDailySketch.developer_user_id.in_(developer_ids),
+                    IncomeDailySketch.day >= start,
+                    IncomeDailySketch.day <= end,
+                )
+            for key, blob in (await self.session.execute(stmt)).tuples().all():
+                by_key.setdefault(key, []).append(QuantileSketch.decode(blob))
+
+        merged = {key: QuantileSketch.merge(sketches) for key, sketches in by_key.items()}
+        overall = QuantileSketch.merge(merged.values())
+        edges = list(edges) if edges else overall.default_edges(bins)
+
+        def describe(sketch: QuantileSketch) -> Dict:
+            return {
+                "count": sketch.count,
+                "sum": round(sketch.total, 6),
+                "mean": sketch.total / sketch.count if sketch.count else None,
+                "min": sketch.min if sketch.count else None,
+                "max": sketch.max if sketch.count else None,
+                "quantiles": [
+                    {"q": q, "value": value} for q, value in zip(quantiles, sketch.quantiles(quantiles))
+                ],
+            }
+
+        result: Dict = {
+            "measure": measure,
+            "relative_accuracy": RELATIVE_ACCURACY,
+            **describe(overall),
+            "histogram": [
+                {"lower": lower, "upper": upper, "count": count}
+                for lower, upper, count in zip(edges, edges[1:], overall.histogram(edges) if len(edges) > 1 else [])
+            ],
+            "products": [],
+        }
+        if measure == "transaction" and per_product:
+            top = sorted(merged.items(), key=lambda item: (-item[1].count, item[0]))[:per_product]
+            products = await NameCacheService(self.session).products(pid for pid, _ in top)
+            result["products"] = [
+                {"product_id": pid, "name": products[pid][0] if pid in products else None, **describe(sketch)}
+                for pid, sketch in top
+            ]
+        return result
+
+    async def _exact(self, result: Dict, developer_ids: list[int], start: date, end: date, granularity: str) -> Dict:
+        """Exact distinct counts from the transactions of the range (one streamed scan)."""
+        stmt = select(
+            IncomeTransaction.transaction_time,
+            IncomeTransaction.buyer_user_id,
+            IncomeTransaction.recipient_user_id,
+        ).where(
+            IncomeTransaction.developer_user_id.in_(developer_ids),
+            IncomeTransaction.transaction_time >= datetime.combine(start, time.min),
+            IncomeTransaction.transaction_time < datetime.combine(end + timedelta(days=1), time.min),
+        )
+        periods: List[np.ndarray] = []
+        buyers: List[np.ndarray] = []
+        recipients: List[np.ndarray] = []
+        stream = await self.session.stream(stmt.execution_options(yield_per=EXACT_BATCH_SIZE))
+        try:
+            async for batch in stream.partitions():
+                if not batch:
+                    continue
+                times, batch_buyers, batch_recipients = zip(*batch)
+                periods.append(_period_starts(np.array(times, dtype="datetime64[D]"), granularity))
+                buyers.append(np.array(batch_buyers, dtype=np.int64))
+                recipients.append(np.array(batch_recipients, dtype=np.int64))
+        finally:
+            await stream.close()
+        if not periods:
+            return result
+
+        keys, groups = np.unique(np.concatenate(periods), return_inverse=True)
+        buyers_all, recipients_all = np.concatenate(buyers), np.concatenate(recipients)
+        buyer_counts = _distinct_per_group(groups, buyers_all, keys.size)
+        recipient_counts = _distinct_per_group(groups, recipients_all, keys.size)
+        if granularity != "total":
+            result["periods"] = [
+                {
+                    "period": keys[i].item(),
+                    "unique_buyers": int(buyer_counts[i]),
+                    "unique_recipients": int(recipient_counts[i]),
+                }
+                for i in range(keys.size)
+            ]
+        result["total"] = {
+            "unique_buyers": int(np.unique(buyers_all).size),
+            "unique_recipients": int(np.unique(recipients_all).size),
+        }
+        return result
@@ -1,16 +1,78 @@
 from __future__ import annotations
 
-from typing import Optional, List, Tuple
+from typing import AsyncIterator, Optional, List, Sequence, Tuple
 from decimal import Decimal
 from datetime import datetime
 
-from sqlalchemy import select, func, asc, desc
+from sqlalchemy import select, func, desc
 from sqlalchemy.orm import aliased
 
 from app.models import Product, ImvuUser
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.pagination import fetch_page
+from app.core.query_cache import query_cache
+from app.core.single_flight import query_key
+from app.core.sort_spec import SortSpec, model_fields
 from app.models import IncomeTransaction
+from app.services.name_cache_service import NameCacheService
+
+
+# IncomeTransaction columns returned by `list_paginated_rows`, in row order
+TRANSACTION_COLUMNS = (
+    "transaction_id",
+    "transaction_time",
+    "product_id",
+    "developer_user_id",
+    "buyer_user_id",
+    "recipient_user_id",
+    "reseller_user_id",
+    "paid_credits",
+    "paid_promo_credits",
+    "income_credits",
+    "income_promo_credits",
+    "paid_total_credits",
+    "income_total_credits",
+    "created_at",
+)
+
+# Full row layout of `list_paginated_rows`
+ROW_COLUMNS = TRANSACTION_COLUMNS + (
+    "product_ref",
+    "product_name",
+    "price",
+    "visible",
+    "buyer_ref",
+    "buyer_name",
+    "recipient_ref",
+    "recipient_name",
+)
+
+# Row layout of `stream_export_rows`
+EXPORT_COLUMNS = TRANSACTION_COLUMNS + ("product_name", "buyer_name", "recipient_name")
+
+# Rows fetched per round trip from the server-side cursor while exporting
+EXPORT_BATCH_SIZE = 2000
+
+_Buyer = aliased(ImvuUser, name="buyer_user")
+_Recipient = aliased(ImvuUser, name="recipient_user")
+
+_ROWS = select(*(getattr(IncomeTransaction, name) for name in TRANSACTION_COLUMNS))
+
+# 'product.*', 'buyer.*' / 'buyer_user.*' and 'recipient.*' / 'recipient_user.*' sort by the joined tables
+SORT = SortSpec(
+    {
+        **model_fields(IncomeTransaction),
+        **model_fields(Product, "product.", "product"),
+        **model_fields(_Buyer, "buyer.", "buyer"),
+        **model_fields(_Buyer, "buyer_user.", "buyer"),
+        **model_fields(_Recipient, "recipient.", "recipient"),
+        **model_fields(_Recipient, "recipient_user.", "recipient"),
+    },
+    default=(desc(IncomeTransaction.transaction_id),),
+    default_direction="DESC",
+    dotted=True,
+)
 
 
 class IncomeTransactionService:
@@ -125,6 +187,32 @@ class IncomeTransactionService:
         total = int(cnt_res.scalar_one())
         return items, total
 
+    @staticmethod
+    def _where_clauses(
+        product_ids: Optional[list[int]],
+        buyer_user_ids: Optional[list[int]],
+        recipient_user_ids: Optional[list[int]],
+        developer_ids: Optional[list[int]],
+    ) -> list:
+        """Build optional WHERE clauses for IN-filters (non-empty lists only)."""
+        where_clauses = []
+        if developer_ids:
+            where_clauses.append(IncomeTransaction.developer_user_id.in_(developer_ids))
+        if product_ids:
+            where_clauses.append(IncomeTransaction.product_id.in_(product_ids))
+        if buyer_user_ids:
+            where_clauses.append(IncomeTransaction.buyer_user_id.in_(buyer_user_ids))
+        if recipient_user_ids:
+            where_clauses.append(IncomeTransaction.recipient_user_id.in_(recipient_user_ids))
+        return where_clauses
+
+    @staticmethod
+    def _count_stmt(where_clauses: list):
+        count_stmt = select(func.count()).select_from(IncomeTransaction)
+        if where_clauses:
+            count_stmt = count_stmt.where(*where_clauses)
+        return count_stmt
+
     async def list_paginated_with_relations(
         self,
         page: int = 1,
@@ -145,86 +233,154 @@ class IncomeTransactionService:
             page = 1
         offset = (page - 1) * per_page
 
-        Buyer = aliased(ImvuUser)
-        Recipient = aliased(ImvuUser)
-
         stmt = (
-            select(IncomeTransaction, Product, Buyer, Recipient)
+            select(IncomeTransaction, Product, _Buyer, _Recipient)
             .join(Product, IncomeTransaction.product_id == Product.product_id, isouter=True)
-            .join(Buyer, IncomeTransaction.buyer_user_id == Buyer.user_id, isouter=True)
-            .join(Recipient, IncomeTransaction.recipient_user_id == Recipient.user_id, isouter=True)
+            .join(_Buyer, IncomeTransaction.buyer_user_id == _Buyer.user_id, isouter=True)
+            .join(_Recipient, IncomeTransaction.recipient_user_id == _Recipient.user_id, isouter=True)
         )
 
-        # build optional WHERE clauses for IN-filters (non-empty lists only)
-        where_clauses = []
-        if developer_ids:
-            where_clauses.append(IncomeTransaction.developer_user_id.in_(developer_ids))
-        if product_ids:
-            where_clauses.append(IncomeTransaction.product_id.in_(product_ids))
-        if buyer_user_ids:
-            where_clauses.append(IncomeTransaction.buyer_user_id.in_(buyer_user_ids))
-        if recipient_user_ids:
-            where_clauses.append(IncomeTransaction.recipient_user_id.in_(recipient_user_ids))
-
+        where_clauses = self._where_clauses(product_ids, buyer_user_ids, recipient_user_ids, developer_ids)
         if where_clauses:
             stmt = stmt.where(*where_clauses)
 
-        # build ordering from `orders` similar to ImvuUserService
-        order_cols = []
-        if orders:
-            for o in orders:
-                if hasattr(o, "property"):
-                    prop = getattr(o, "property")
-                    direction = (getattr(o, "direction", None) or "DESC").upper()
-                else:
-                    prop = o.get("property")
-                    direction = (o.get("direction") or "DESC").upper()
-
-                # normalize comma-separated indices (e.g. 'buyer_user,name') to dot notation
-                if isinstance(prop, str):
-                    prop = prop.replace(",", ".").strip()
-
-                if not prop:
-                    continue
-
-                col = None
-
-                # allow ordering by joined table columns using dot notation
-                # e.g., 'product.product_name', 'buyer.user_name', 'recipient.user_name'
-                if isinstance(prop, str) and "." in prop:
-                    left, right = prop.split(".", 1)
-                    if left == "product":
-                        col = getattr(Product, right, None)
-                    elif left == "buyer" or left == "buyer_user":
-                        col = getattr(Buyer, right, None)
-                    elif left == "recipient" or left == "recipient_user":
-                        col = getattr(Recipient, right, None)
-
-                # fallback: attribute on IncomeTransaction (supports product_id, buyer_user_id, ...)
-                if col is None:
-                    col = getattr(IncomeTransaction, prop, None)
-                    if col is None and isinstance(prop, str):
-                        snake = "".join([
-                            "_" + c.lower() if c.isupper() else c for c in prop
-                        ]).lstrip("_")
-                        col = getattr(IncomeTransaction, snake, None)
-
-                if col is not None:
-                    order_cols.append(asc(col) if direction == "ASC" else desc(col))
-
-        if order_cols:
-            stmt = stmt.order_by(*order_cols)
-        else:
-            stmt = stmt.order_by(desc(IncomeTransaction.transaction_id))
-
-        stmt = stmt.offset(offset).limit(per_page)
+        order_cols, _ = SORT.order_by(orders)
+        stmt = stmt.order_by(*order_cols)
 
-        res = await self.session.execute(stmt)
-        rows = res.all()
+        return await fetch_page(
+            self.session, stmt, lambda: self._count_stmt(where_clauses), offset=offset, limit=per_page
+        )
 
-        count_stmt = select(func.count()).select_from(IncomeTransaction)
+    async def list_paginated_rows(
+        self,
+        page: int = 1,
+        per_page: int = 50,
+        orders: Optional[list] = None,
+        product_ids: Optional[list[int]] = None,
+        buyer_user_ids: Optional[list[int]] = None,
+        recipient_user_ids: Optional[list[int]] = None,
+        developer_ids: Optional[list[int]] = None,
+    ) -> Tuple[List[tuple], int]:
+        """Like `list_paginated_with_relations`, but select only the columns the list API returns.
+
+        The page query reads `income_transaction` alone (product / user tables are
+        joined only when ordering by one of their columns); product and user names
+        come from `NameCacheService`. Each row is a plain tuple in `ROW_COLUMNS` order.
+        Results are cached per data version (see `query_cache`).
+        """
+        key = query_key(
+            "income_transaction.list",
+            developer_ids,
+            page=page,
+            per_page=per_page,
+            orders=SORT.normalize(orders),
+            product_ids=product_ids,
+            buyer_user_ids=buyer_user_ids,
+            recipient_user_ids=recipient_user_ids,
+        )
+        return await query_cache.get_or_load(
+            key,
+            lambda: self._list_paginated_rows(
+                page, per_page, orders, product_ids, buyer_user_ids, recipient_user_ids, developer_ids
+            ),
+        )
+
+    async def _list_paginated_rows(
+        self,
+        page: int,
+        per_page: int,
+        orders: Optional[list],
+        product_ids: Optional[list[int]],
+        buyer_user_ids: Optional[list[int]],
+        recipient_user_ids: Optional[list[int]],
+        developer_ids: Optional[list[int]],
+    ) -> Tuple[List[tuple], int]:
+        if developer_ids is not None and len(developer_ids) == 0:
+            return [], 0
+        if page < 1:
+            page = 1
+        offset = (page - 1) * per_page
+
+        stmt = _ROWS
+
+        where_clauses = self._where_clauses(product_ids, buyer_user_ids, recipient_user_ids, developer_ids)
         if where_clauses:
-            count_stmt = count_stmt.where(*where_clauses)
-        cnt_res = await self.session.execute(count_stmt)
-        total = int(cnt_res.scalar_one())
+            stmt = stmt.where(*where_clauses)
+
+        order_cols, joins = SORT.order_by(orders)
+        if "product" in joins:
+            stmt = stmt.join(Product, IncomeTransaction.product_id == Product.product_id, isouter=True)
+        if "buyer" in joins:
+            stmt = stmt.join(_Buyer, IncomeTransaction.buyer_user_id == _Buyer.user_id, isouter=True)
+        if "recipient" in joins:
+            stmt = stmt.join(_Recipient, IncomeTransaction.recipient_user_id == _Recipient.user_id, isouter=True)
+
+        stmt = stmt.order_by(*order_cols)
+
+        page_rows, total = await fetch_page(
+            self.session, stmt, lambda: self._count_stmt(where_clauses), offset=offset, limit=per_page
+        )
+
+        names = NameCacheService(self.session)
+        products = await names.products(r[2] for r in page_rows)
+        users = await names.user_names([r[4] for r in page_rows] + [r[5] for r in page_rows])
+
+        rows = []
+        for r in page_rows:
+            product = products.get(r[2])
+            if product is not None:
+                product_part = (r[2], *product)
+            else:
+                product_part = (None, None, None, None)
+            buyer_ref = r[4] if r[4] in users else None
+            recipient_ref = r[5] if r[5] in users else None
+            rows.append(
+                tuple(r)
+                + product_part
+                + (buyer_ref, users.get(r[4]), recipient_ref, users.get(r[5]))
+            )
         return rows, total
+
+    async def stream_export_rows(
+        self,
+        orders: Optional[list] = None,
+        product_ids: Optional[list[int]] = None,
+        buyer_user_ids: Optional[list[int]] = None,
+        recipient_user_ids: Optional[list[int]] = None,
+        developer_ids: Optional[list[int]] = None,
+        with_names: bool = True,
+    ) -> AsyncIterator[Sequence[tuple]]:
+        """Yield every matching row in batches, in `EXPORT_COLUMNS` order.
+
+        Uses a server-side cursor (`stream_results` with `yield_per`), so memory
+        stays bounded by one batch however many rows match. Names are joined in
+        the same query because the connection is busy streaming until the end;
+        with `with_names=False` rows stop after the `TRANSACTION_COLUMNS`.
+        """
+        if developer_ids is not None and len(developer_ids) == 0:
+            return
+
+        stmt = _ROWS
+
+        where_clauses = self._where_clauses(product_ids, buyer_user_ids, recipient_user_ids, developer_ids)
+        if where_clauses:
+            stmt = stmt.where(*where_clauses)
+
+        order_cols, joins = SORT.order_by(orders)
+        if with_names:
+            stmt = stmt.add_columns(Product.product_name, _Buyer.user_name, _Recipient.user_name)
+            joins = {"product", "buyer", "recipient"}
+        if "product" in joins:
+            stmt = stmt.join(Product, IncomeTransaction.product_id == Product.product_id, isouter=True)
+        if "buyer" in joins:
+            stmt = stmt.join(_Buyer, IncomeTransaction.buyer_user_id == _Buyer.user_id, isouter=True)
+        if "recipient" in joins:
+            stmt = stmt.join(_Recipient, IncomeTransaction.recipient_user_id == _Recipient.user_id, isouter=True)
+        stmt = stmt.order_by(*order_cols).execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+        result = await self.session.stream(stmt)
+        try:
+            async for batch in result.partitions():
+                yield batch
+        finally:
+            await result.close()
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import LRUCache
+from app.core.data_version import get_data_version
+from app.models import ImvuUser, Product
+
+ProductInfo = Tuple[str, Decimal, bool]
+
+# Values are 1-tuples / 3-tuples for known rows and `()` for ids with no row,
+# so that dangling ids are not looked up again on every page.
+_user_names: LRUCache[int, tuple] = LRUCache(maxsize=200_000)
+_products: LRUCache[int, tuple] = LRUCache(maxsize=100_000)
+_cached_version: Optional[int] = None
+
+
+def _sync_version() -> None:
+    """Drop every cached name once an import has landed (names may have changed)."""
+    global _cached_version
+    version = get_data_version()
+    if version != _cached_version:
+        _user_names.clear()
+        _products.clear()
+        _cached_version = version
+
+
+class NameCacheService:
+    """Read-through caches for display names used by list responses.
+
+    Misses for a page are filled with a single `IN` query per entity.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def user_names(self, user_ids: Iterable[int]) -> dict[int, Optional[str]]:
+        """Return user_id -> user_name for the ids that exist in `imvu_user`."""
+        _sync_version()
+        found: dict[int, Optional[str]] = {}
+        missing = []
+        for uid in set(user_ids):
+            entry = _user_names.get(uid)
+            if entry is None:
+                missing.append(uid)
+            elif entry:
+                found[uid] = entry[0]
+
+        if missing:
+            res = await self.session.execute(
+                select(ImvuUser.user_id, ImvuUser.user_name).where(ImvuUser.user_id.in_(missing))
+            )
+            loaded = dict(res.tuples().all())
+            for uid in missing:
+                if uid in loaded:
+                    _user_names.set(uid, (loaded[uid],))
+                    found[uid] = loaded[uid]
+                else:
+                    _user_names.set(uid, ())
+        return found
+
+    async def products(self, product_ids: Iterable[int]) -> dict[int, ProductInfo]:
+        """Return product_id -> (product_name, price, visible) for the ids that exist in `product`."""
+        _sync_version()
+        found: dict[int, ProductInfo] = {}
+        missing = []
+        for pid in set(product_ids):
+            entry = _products.get(pid)
+            if entry is None:
+                missing.append(pid)
+            elif entry:
+                found[pid] = entry
+
+        if missing:
+            res = await self.session.execute(
+                select(Product.product_id, Product.product_name, Product.price, Product.visible).where(
+                    Product.product_id.in_(missing)
+                )
+            )
+            loaded = {pid: (name, price, visible) for pid, name, price, visible in res.tuples().all()}
+            for pid in missing:
+                info = loaded.get(pid)
+                _products.set(pid, info if info is not None else ())
+                if info is not None:
+                    found[pid] = info
+        return found
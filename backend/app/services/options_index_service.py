@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+from bisect import bisect_left
+from datetime import datetime
+from itertools import islice
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import desc, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.data_version import get_data_version
+from app.models import ImvuUser, IncomeTransaction, Product
+from app.services.search_index_service import SearchIndexService
+
+Option = Tuple[int, Optional[str]]
+
+
+class OptionsIndex:
+    """Typeahead index for one developer's select options.
+
+    Keeps the named entries sorted by lowercased name for prefix lookups with
+    `bisect`, plus the entries ordered by their latest transaction (most recent
+    first) for the no-keyword fallback.
+    """
+
+    def __init__(
+        self,
+        named: Iterable[Option],
+        recent: Iterable[Tuple[datetime, int, Optional[str]]],
+    ) -> None:
+        entries = sorted(((name or "").lower(), int(oid), name) for oid, name in named)
+        self.keys: List[str] = [key for key, _, _ in entries]
+        self.items: List[Option] = [(oid, name) for _, oid, name in entries]
+        self.by_id: dict[int, Optional[str]] = {oid: name for oid, name in self.items}
+        # (-timestamp, id, name) so that several developers' lists can be merged ascending
+        self.recent: List[Tuple[float, int, Optional[str]]] = [
+            (-ts.timestamp(), int(oid), name) for ts, oid, name in recent if ts is not None
+        ]
+
+    def prefix(self, keyword: str, limit: int) -> List[Tuple[str, int, Optional[str]]]:
+        kw = keyword.lower()
+        start = bisect_left(self.keys, kw)
+        out = []
+        for i in range(start, min(start + limit, len(self.keys))):
+            if not self.keys[i].startswith(kw):
+                break
+            oid, name = self.items[i]
+            out.append((self.keys[i], oid, name))
+        return out
+
+
+class _OptionsRegistry:
+    """Lazily built `OptionsIndex` per (kind, developer), rebuilt after that developer's imports.
+
+    Rows are fetched with the session; the index is built in the thread pool.
+    """
+
+    def __init__(self) -> None:
+        self._indexes: dict[Tuple[str, int], Tuple[int, OptionsIndex]] = {}
+        self._locks: dict[Tuple[str, int], asyncio.Lock] = {}
+
+    async def get(self, session: AsyncSession, kind: str, developer_id: int) -> OptionsIndex:
+        key = (kind, developer_id)
+        version = get_data_version(developer_id)
+        cached = self._indexes.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            cached = self._indexes.get(key)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            index = await self._build(session, kind, developer_id)
+            self._indexes[key] = (version, index)
+            return index
+
+    async def _build(self, session: AsyncSession, kind: str, developer_id: int) -> OptionsIndex:
+        if kind == "product":
+            named_stmt = select(Product.product_id, Product.product_name).where(
+                Product.developer_user_id == developer_id
+            )
+            subq = (
+                select(
+                    IncomeTransaction.product_id.label("oid"),
+                    func.max(IncomeTransaction.transaction_time).label("last_time"),
+                )
+                .where(IncomeTransaction.developer_user_id == developer_id)
+                .group_by(IncomeTransaction.product_id)
+                .subquery()
+            )
+            recent_stmt = (
+                select(subq.c.last_time, Product.product_id, Product.product_name)
+                .join(subq, Product.product_id == subq.c.oid)
+                .where(Product.developer_user_id == developer_id)
+                .order_by(desc(subq.c.last_time))
+            )
+        else:
+            user_col = (
+                IncomeTransaction.buyer_user_id if kind == "buyer" else IncomeTransaction.recipient_user_id
+            )
+            named_stmt = select(ImvuUser.user_id, ImvuUser.user_name).where(
+                ImvuUser.developer_user_id == developer_id
+            )
+            subq = (
+                select(user_col.label("oid"), func.max(IncomeTransaction.transaction_time).label("last_time"))
+                .where(IncomeTransaction.developer_user_id == developer_id)
+                .group_by(user_col)
+                .subquery()
+            )
+            recent_stmt = (
+                select(subq.c.last_time, ImvuUser.user_id, ImvuUser.user_name)
+                .join(subq, ImvuUser.user_id == subq.c.oid)
+                .order_by(desc(subq.c.last_time))
+            )
+
+        named = (await session.execute(named_stmt)).tuples().all()
+        recent = (await session.execute(recent_stmt)).tuples().all()
+        # sorting a large developer's entries would otherwise stall the event loop
+        return await run_in_threadpool(OptionsIndex, named, recent)
+
+
+_registry = _OptionsRegistry()
+
+
+class OptionsIndexService:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def _indexes(self, kind: str, developer_ids: list[int]) -> List[OptionsIndex]:
+        return [await _registry.get(self.session, kind, did) for did in sorted(set(developer_ids))]
+
+    async def options(
+        self,
+        kind: str,
+        developer_ids: list[int],
+        keyword: Optional[str] = None,
+        limit: int = 20,
+    ) -> List[Option]:
+        """Return select options for `kind` ("product", "buyer" or "recipient").
+
+        Without a keyword, returns the most recently sold products / most recent
+        buyers or recipients. With a keyword, returns an exact id match first,
+        then name-prefix matches in name order, then remaining substring matches
+        from the search index.
+        """
+        indexes = await self._indexes(kind, developer_ids)
+        kw = (keyword or "").strip()
+
+        if not kw:
+            seen: set[int] = set()
+            out: List[Option] = []
+            for _, oid, name in heapq.merge(*(idx.recent for idx in indexes)):
+                if oid in seen:
+                    continue
+                seen.add(oid)
+                out.append((oid, name))
+                if len(out) >= limit:
+                    break
+            return out
+
+        out = []
+        seen = set()
+        if kw.isdigit():
+            oid = int(kw)
+            for idx in indexes:
+                if oid in idx.by_id:
+                    out.append((oid, idx.by_id[oid]))
+                    seen.add(oid)
+                    break
+
+        prefixed = heapq.merge(*(idx.prefix(kw, limit) for idx in indexes))
+        for _, oid, name in islice(prefixed, limit):
+            if oid not in seen:
+                seen.add(oid)
+                out.append((oid, name))
+        if len(out) >= limit:
+            return out[:limit]
+
+        search = SearchIndexService(self.session)
+        if kind == "product":
+            more = await search.product_options(kw, developer_ids=developer_ids, limit=limit + len(out))
+        else:
+            more = await search.imvu_user_options(kw, developer_ids=developer_ids, limit=limit + len(out))
+        for oid, name in more:
+            if oid not in seen:
+                seen.add(oid)
+                out.append((oid, name))
+            if len(out) >= limit:
+                break
+        return out
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import AsyncIterator, Dict, Optional, Sequence
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import ProductDailyDelta, ProductDailyMetrics
+from app.services.name_cache_service import NameCacheService
+
+FUNNEL_FIELDS = (
+    "organic_impressions",
+    "paid_impressions",
+    "wishlist_adds",
+    "cart_adds",
+    "total_sales",
+    "direct_sales",
+    "indirect_sales",
+    "promoted_sales",
+)
+
+# Row layout of `stream_snapshot_rows`
+SNAPSHOT_COLUMNS = (
+    "product_id",
+    "snapshot_date",
+    "developer_user_id",
+    "price",
+    "profit",
+    "visible",
+    "old_sales",
+    "new_sales",
+    "total_sales",
+    "derived_product_sales",
+    "direct_sales",
+    "indirect_sales",
+    "promoted_sales",
+    "cart_adds",
+    "wishlist_adds",
+    "organic_impressions",
+    "paid_impressions",
+)
+
+SNAPSHOT_BATCH_SIZE = 5000
+
+
+def _rate(numerator: int, denominator: int) -> Optional[float]:
+    return numerator / denominator if denominator else None
+
+
+def _funnel_entry(counts: Dict[str, int]) -> Dict:
+    impressions = counts["organic_impressions"] + counts["paid_impressions"]
+    return {
+        "impressions": impressions,
+        **counts,
+        "cart_rate": _rate(counts["cart_adds"], impressions),
+        "cart_to_sale_rate": _rate(counts["total_sales"], counts["cart_adds"]),
+        "sale_rate": _rate(counts["total_sales"], impressions),
+    }
+
+
+class ProductMetricsService:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def _snapshots_at(self, latest_dates) -> Dict[int, ProductDailyMetrics]:
+        """Load the metrics rows matching a (product_id, snapshot_date) subquery."""
+        stmt = select(ProductDailyMetrics).join(
+            latest_dates,
+            and_(
+                ProductDailyMetrics.product_id == latest_dates.c.product_id,
+                ProductDailyMetrics.snapshot_date == latest_dates.c.snapshot_date,
+            ),
+        )
+        res = await self.session.execute(stmt)
+        return {row.product_id: row for row in res.scalars().all()}
+
+    def _latest_dates(self, developer_ids: list[int], product_ids: Optional[list[int]], *conditions):
+        stmt = (
+            select(
+                ProductDailyMetrics.product_id,
+                func.max(ProductDailyMetrics.snapshot_date).label("snapshot_date"),
+            )
+            .where(ProductDailyMetrics.developer_user_id.in_(developer_ids), *conditions)
+            .group_by(ProductDailyMetrics.product_id)
+        )
+        if product_ids:
+            stmt = stmt.where(ProductDailyMetrics.product_id.in_(product_ids))
+        return stmt.subquery()
+
+    async def funnel(
+        self,
+        developer_ids: list[int],
+        start: date,
+        end: date,
+        product_ids: Optional[list[int]] = None,
+        limit: int = 100,
+    ) -> Dict:
+        """Impression -> cart -> sale funnel per product for `start`..`end` (inclusive).
+
+        Snapshot counters are cumulative, so each product's figures are its last
+        snapshot in the range minus its last snapshot before `start` (zero when
+        there is none). A counter that went down is treated as reset and its
+        end value is used. Products are ordered by sales, then impressions.
+        """
+        result: Dict = {"start": start, "end": end, "product_count": 0, "totals": None, "items": []}
+        if not developer_ids:
+            return result
+
+        last = await self._snapshots_at(
+            self._latest_dates(
+                developer_ids,
+                product_ids,
+                ProductDailyMetrics.snapshot_date >= start,
+                ProductDailyMetrics.snapshot_date <= end,
+            )
+        )
+        if not last:
+            return result
+        baseline = await self._snapshots_at(
+            self._latest_dates(developer_ids, list(last), ProductDailyMetrics.snapshot_date < start)
+        )
+
+        entries = []
+        totals = {field: 0 for field in FUNNEL_FIELDS}
+        for pid, row in last.items():
+            base = baseline.get(pid)
+            counts = {}
+            for field in FUNNEL_FIELDS:
+                value = getattr(row, field)
+                previous = getattr(base, field) if base is not None else 0
+                counts[field] = value - previous if value >= previous else value
+                totals[field] += counts[field]
+            entries.append((pid, base.snapshot_date if base is not None else None, row.snapshot_date, counts))
+
+        entries.sort(
+            key=lambda e: (
+                -e[3]["total_sales"],
+                -(e[3]["organic_impressions"] + e[3]["paid_impressions"]),
+                e[0],
+            )
+        )
+        entries = entries[:limit]
+        products = await NameCacheService(self.session).products(pid for pid, *_ in entries)
+
+        result["product_count"] = len(last)
+        result["totals"] = _funnel_entry(totals)
+        result["items"] = [
+            {
+                "product_id": pid,
+                "name": products[pid][0] if pid in products else None,
+                "baseline_date": baseline_date,
+                "snapshot_date": snapshot_date,
+                **_funnel_entry(counts),
+            }
+            for pid, baseline_date, snapshot_date, counts in entries
+        ]
+        return result
+
+    async def sales_velocity(
+        self,
+        developer_ids: list[int],
+        start: date,
+        end: date,
+        product_ids: Optional[list[int]] = None,
+        limit: int = 100,
+    ) -> Dict:
+        """Sales per day for each product from the daily deltas with a snapshot in `start`..`end`.
+
+        A range scan over `product_daily_delta`; days covered by a delta that
+        spans a gap count towards the rate, so gaps do not inflate it.
+        """
+        result: Dict = {"start": start, "end": end, "items": []}
+        if not developer_ids:
+            return result
+
+        sales = func.sum(ProductDailyDelta.total_sales)
+        stmt = (
+            select(
+                ProductDailyDelta.product_id,
+                sales,
+                func.sum(ProductDailyDelta.new_sales),
+                func.sum(ProductDailyDelta.cart_adds),
+                func.sum(ProductDailyDelta.organic_impressions + ProductDailyDelta.paid_impressions),
+                func.sum(ProductDailyDelta.span_days),
+                func.min(ProductDailyDelta.previous_date),
+                func.max(ProductDailyDelta.snapshot_date),
+            )
+            .where(
+                ProductDailyDelta.developer_user_id.in_(developer_ids),
+                ProductDailyDelta.snapshot_date >= start,
+                ProductDailyDelta.snapshot_date <= end,
+            )
+            .group_by(ProductDailyDelta.product_id)
+            .order_by(sales.desc(), ProductDailyDelta.product_id)
+            .limit(limit)
+        )
+        if product_ids:
+            stmt = stmt.where(ProductDailyDelta.product_id.in_(product_ids))
+
+        rows = (await self.session.execute(stmt)).tuples().all()
+        products = await NameCacheService(self.session).products(row[0] for row in rows)
+
+        for pid, total_sales, new_sales, cart_adds, impressions, days, first, last in rows:
+            days = int(days or 0)
+            result["items"].append(
+                {
+                    "product_id": pid,
+                    "name": products[pid][0] if pid in products else None,
+                    "from_date": first,
+                    "to_date": last,
+                    "days": days,
+                    "total_sales": int(total_sales or 0),
+                    "new_sales": int(new_sales or 0),
+                    "cart_adds": int(cart_adds or 0),
+                    "impressions": int(impressions or 0),
+                    "sales_per_day": int(total_sales or 0) / days if days else None,
+                }
+            )
+        return result
+
+    async def stream_snapshot_rows(
+        self,
+        developer_ids: list[int],
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        product_ids: Optional[list[int]] = None,
+    ) -> AsyncIterator[Sequence[tuple]]:
+        """Yield typed snapshot rows (`SNAPSHOT_COLUMNS` order) in batches from a server-side cursor."""
+        if not developer_ids:
+            return
+
+        stmt = select(*(getattr(ProductDailyMetrics, name) for name in SNAPSHOT_COLUMNS)).where(
+            ProductDailyMetrics.developer_user_id.in_(developer_ids)
+        )
+        if start is not None:
+            stmt = stmt.where(ProductDailyMetrics.snapshot_date >= start)
+        if end is not None:
+            stmt = stmt.where(ProductDailyMetrics.snapshot_date <= end)
+        if product_ids:
+            stmt = stmt.where(ProductDailyMetrics.product_id.in_(product_ids))
+        stmt = stmt.order_by(ProductDailyMetrics.snapshot_date, ProductDailyMetrics.product_id)
+
+        result = await self.session.stream(stmt.execution_options(yield_per=SNAPSHOT_BATCH_SIZE))
+        try:
+            async for batch in result.partitions():
+                yield batch
+        finally:
+            await result.close()
@@ -4,10 +4,27 @@ from typing import Optional, List, Tuple
 from decimal import Decimal
 from datetime import datetime
 
-from sqlalchemy import select, func, asc, desc, or_, cast, String
+from sqlalchemy import select, func, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import Product
+from app.core.pagination import fetch_page
+from app.core.query_cache import query_cache
+from app.core.single_flight import query_key
+from app.core.sort_spec import SortSpec, model_fields
+from app.models import IncomeTransaction, Product
+from app.services.search_index_service import SearchIndexService
+
+SORT = SortSpec({**model_fields(Product), "id": Product.product_id, "name": Product.product_name})
+
+# Last sale per product, for the default ordering
+_LAST_SOLD = (
+    select(
+        IncomeTransaction.product_id.label("product_id"),
+        func.max(IncomeTransaction.transaction_time).label("last_sold"),
+    )
+    .group_by(IncomeTransaction.product_id)
+    .subquery()
+)
 
 
 class ProductService:
@@ -77,6 +94,22 @@ class ProductService:
         orders: Optional[list] = None,
         keyword: Optional[str] = None,
         developer_ids: Optional[list[int]] = None,
+    ) -> Tuple[List[Product], int]:
+        """Return (items, total_count), cached per data version (see `query_cache`)."""
+        key = query_key(
+            "product.list", developer_ids, page=page, per_page=per_page, orders=SORT.normalize(orders), keyword=keyword
+        )
+        return await query_cache.get_or_load(
+            key, lambda: self._list_paginated(page, per_page, orders, keyword, developer_ids)
+        )
+
+    async def _list_paginated(
+        self,
+        page: int,
+        per_page: int,
+        orders: Optional[list],
+        keyword: Optional[str],
+        developer_ids: Optional[list[int]],
     ) -> Tuple[List[Product], int]:
         """Return (items, total_count) for given `page` (1-based) and `per_page`."""
         if developer_ids is not None and len(developer_ids) == 0:
@@ -90,84 +123,27 @@ class ProductService:
             stmt = stmt.where(Product.developer_user_id.in_(developer_ids))
 
         # apply keyword filter when provided (fuzzy match on product_name OR product_id)
-        if keyword:
-            kw = keyword.strip()
-            if kw:
-                stmt = stmt.where(
-                    or_(
-                        Product.product_name.ilike(f"%{kw}%"),
-                        cast(Product.product_id, String).ilike(f"%{kw}%"),
-                    )
-                )
-
-        order_cols = []
-        if orders:
-            special_map = {
-                "id": "product_id",
-                "product_id": "product_id",
-                "name": "product_name",
-                "product_name": "product_name",
-                "price": "price",
-            }
-
-            for o in orders:
-                if hasattr(o, "property"):
-                    prop = getattr(o, "property")
-                    direction = (getattr(o, "direction", None) or "ASC").upper()
-                else:
-                    prop = o.get("property")
-                    direction = (o.get("direction") or "ASC").upper()
-
-                if not prop:
-                    continue
-
-                mapped = special_map.get(prop)
-                col = None
-                if mapped:
-                    col = getattr(Product, mapped, None)
-                else:
-                    col = getattr(Product, prop, None)
-                    if col is None:
-                        snake = "".join(["_" + c.lower() if c.isupper() else c for c in prop]).lstrip("_")
-                        col = getattr(Product, snake, None)
-
-                if col is not None:
-                    order_cols.append(asc(col) if direction == "ASC" else desc(col))
+        keyword_clause = await SearchIndexService(self.session).product_keyword_clause(
+            keyword, developer_ids
+        )
+        if keyword_clause is not None:
+            stmt = stmt.where(keyword_clause)
 
+        order_cols, _ = SORT.order_by(orders)
         if order_cols:
             stmt = stmt.order_by(*order_cols)
         else:
             # default: order by last sold (most recent first)
-            from app.models import IncomeTransaction
-
-            subq = (
-                select(
-                    IncomeTransaction.product_id.label("product_id"),
-                    func.max(IncomeTransaction.transaction_time).label("last_sold"),
-                )
-                .group_by(IncomeTransaction.product_id)
-                .subquery()
+            stmt = stmt.outerjoin(_LAST_SOLD, Product.product_id == _LAST_SOLD.c.product_id).order_by(
+                desc(_LAST_SOLD.c.last_sold)
             )
 
-            stmt = stmt.outerjoin(subq, Product.product_id == subq.c.product_id).order_by(desc(subq.c.last_sold))
+        def count_stmt():
+            count = select(func.count()).select_from(Product)
+            if developer_ids is not None:
+                count = count.where(Product.developer_user_id.in_(developer_ids))
+            if keyword_clause is not None:
+                count = count.where(keyword_clause)
+            return count
 
-        stmt = stmt.offset(offset).limit(per_page)
-        res = await self.session.execute(stmt)
-        items = res.scalars().all()
-
-        count_stmt = select(func.count()).select_from(Product)
-        if developer_ids is not None:
-            count_stmt = count_stmt.where(Product.developer_user_id.in_(developer_ids))
-        if keyword:
-            kw = keyword.strip()
-            if kw:
-                count_stmt = count_stmt.where(
-                    or_(
-                        Product.product_name.ilike(f"%{kw}%"),
-                        cast(Product.product_id, String).ilike(f"%{kw}%"),
-                    )
-                )
-
-        cnt_res = await self.session.execute(count_stmt)
-        total = int(cnt_res.scalar_one())
-        return items, total
+        return await fetch_page(self.session, stmt, count_stmt, offset=offset, limit=per_page, shape="scalars")
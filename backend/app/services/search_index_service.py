@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+from array import array
+from itertools import islice
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import String, cast, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.data_version import get_data_version
+from app.models import ImvuUser, Product
+
+# Grams of length 1..3 are indexed so that one- and two-character keywords are
+# served from postings as well; longer keywords intersect their trigrams.
+GRAM_SIZE = 3
+
+# Above this many matches an `IN (...)` filter stops being cheaper than scanning,
+# so list services fall back to their `ILIKE` predicate.
+MAX_IN_FILTER = 1000
+
+
+def _grams(text: str, n: int) -> set[str]:
+    if len(text) < n:
+        return set()
+    return {text[i : i + n] for i in range(len(text) - n + 1)}
+
+
+class NgramIndex:
+    """In-process n-gram index over (id, name, owner developer) entries.
+
+    Both the lowercased name and the decimal id are indexed, mirroring the
+    `name ILIKE '%kw%' OR CAST(id AS CHAR) LIKE '%kw%'` predicate it replaces.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[int, Optional[str], Optional[int]]]) -> None:
+        self.ids: List[int] = []
+        self.names: List[Optional[str]] = []
+        self.lower_names: List[str] = []
+        self.id_texts: List[str] = []
+        self.owners: List[Optional[int]] = []
+        postings: dict[str, array] = {}
+
+        for doc_id, name, owner in entries:
+            pos = len(self.ids)
+            lower = (name or "").lower()
+            id_text = str(doc_id)
+            self.ids.append(int(doc_id))
+            self.names.append(name)
+            self.lower_names.append(lower)
+            self.id_texts.append(id_text)
+            self.owners.append(owner)
+
+            grams: set[str] = set()
+            for n in range(1, GRAM_SIZE + 1):
+                grams |= _grams(lower, n)
+                grams |= _grams(id_text, n)
+            for g in grams:
+                bucket = postings.get(g)
+                if bucket is None:
+                    bucket = postings[g] = array("I")
+                bucket.append(pos)
+
+        self.postings = postings
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _candidates(self, kw: str) -> Sequence[int]:
+        n = min(len(kw), GRAM_SIZE)
+        lists = []
+        for g in _grams(kw, n):
+            bucket = self.postings.get(g)
+            if bucket is None:
+                return ()
+            lists.append(bucket)
+        if not lists:
+            return ()
+        lists.sort(key=len)
+        if len(lists) == 1:
+            return lists[0]
+        result = set(lists[0])
+        for bucket in lists[1:]:
+            result.intersection_update(bucket)
+            if not result:
+                break
+        return result
+
+    def _rank(self, pos: int, kw: str) -> Optional[Tuple[int, int, int, str]]:
+        name = self.lower_names[pos]
+        id_text = self.id_texts[pos]
+        if id_text == kw or name == kw:
+            return (0, 0, len(name), name)
+        at = name.find(kw)
+        if at == 0:
+            return (1, 0, len(name), name)
+        if at > 0:
+            word_start = not name[at - 1].isalnum()
+            return (2 if word_start else 3, at, len(name), name)
+        at = id_text.find(kw)
+        if at >= 0:
+            return (4, at, len(name), name)
+        return None
+
+    def _scored(
+        self, keyword: str, owners: Optional[Iterable[int]], limit: Optional[int]
+    ) -> List[Tuple[Tuple[int, int, int, str], int]]:
+        kw = (keyword or "").strip().lower()
+        if not kw:
+            return []
+
+        owner_set = set(owners) if owners is not None else None
+        scored = []
+        for pos in self._candidates(kw):
+            if owner_set is not None and self.owners[pos] not in owner_set:
+                continue
+            rank = self._rank(pos, kw)
+            if rank is not None:
+                scored.append((rank, pos))
+
+        if limit is not None:
+            return heapq.nsmallest(limit, scored)
+        scored.sort()
+        return scored
+
+    def search_positions(
+        self,
+        keyword: str,
+        *,
+        owners: Optional[Iterable[int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[int]:
+        """Return entry positions whose name or id contains `keyword`, best matches first.
+
+        Ranking: exact match, name prefix, word-start match, other substring
+        match, then id-only match; ties prefer earlier positions and shorter names.
+        """
+        return [pos for _, pos in self._scored(keyword, owners, limit)]
+
+    def ranked_items(
+        self, keyword: str, *, limit: Optional[int] = None
+    ) -> List[Tuple[Tuple[int, int, int, str], int, Optional[str]]]:
+        """Return (rank, id, name) for matches in rank order, for merging several indexes."""
+        return [(rank, self.ids[pos], self.names[pos]) for rank, pos in self._scored(keyword, None, limit)]
+
+    def search(self, keyword: str, **kwargs) -> List[int]:
+        """Return matching ids, best matches first (see `search_positions`)."""
+        return [self.ids[pos] for pos in self.search_positions(keyword, **kwargs)]
+
+    def search_items(self, keyword: str, **kwargs) -> List[Tuple[int, Optional[str]]]:
+        """Return matching (id, name) pairs, best matches first."""
+        return [(self.ids[pos], self.names[pos]) for pos in self.search_positions(keyword, **kwargs)]
+
+
+class _IndexRegistry:
+    """Lazily built `NgramIndex` per (kind, developer), rebuilt after that developer's imports.
+
+    Building runs in the thread pool so a large developer does not stall the event loop.
+    """
+
+    def __init__(self) -> None:
+        self._indexes: dict[Tuple[str, int], Tuple[int, NgramIndex]] = {}
+        self._locks: dict[Tuple[str, int], asyncio.Lock] = {}
+        self._developers: dict[str, Tuple[int, List[int]]] = {}
+
+    async def get(self, session: AsyncSession, kind: str, developer_id: int) -> NgramIndex:
+        key = (kind, developer_id)
+        version = get_data_version(developer_id)
+        cached = self._indexes.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            cached = self._indexes.get(key)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+
+            if kind == "product":
+                stmt = select(Product.product_id, Product.product_name, Product.developer_user_id).where(
+                    Product.developer_user_id == developer_id
+                )
+            else:
+                stmt = select(ImvuUser.user_id, ImvuUser.user_name, ImvuUser.developer_user_id).where(
+                    ImvuUser.developer_user_id == developer_id
+                )
+            rows = (await session.execute(stmt)).tuples().all()
+            index = await run_in_threadpool(NgramIndex, rows)
+            self._indexes[key] = (version, index)
+            return index
+
+    async def developer_ids(self, session: AsyncSession, kind: str) -> List[int]:
+        """Every developer with `kind` entries (for searches not scoped to developers)."""
+        version = get_data_version()
+        cached = self._developers.get(kind)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        column = Product.developer_user_id if kind == "product" else ImvuUser.developer_user_id
+        ids = list((await session.execute(select(column).distinct())).scalars().all())
+        self._developers[kind] = (version, ids)
+        return ids
+
+
+_registry = _IndexRegistry()
+
+
+class SearchIndexService:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def _search(
+        self, kind: str, keyword: str, developer_ids: Optional[list[int]], limit: Optional[int]
+    ) -> List[Tuple[int, Optional[str]]]:
+        if not (keyword or "").strip():
+            return []
+        if developer_ids is None:
+            developer_ids = await _registry.developer_ids(self.session, kind)
+        indexes = [await _registry.get(self.session, kind, did) for did in sorted(set(developer_ids))]
+        ranked = heapq.merge(*(index.ranked_items(keyword, limit=limit) for index in indexes))
+        if limit is not None:
+            ranked = islice(ranked, limit)
+        return [(oid, name) for _, oid, name in ranked]
+
+    async def search_products(
+        self,
+        keyword: str,
+        developer_ids: Optional[list[int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[int]:
+        """Return ranked product ids matching `keyword` by name or id."""
+        return [oid for oid, _ in await self._search("product", keyword, developer_ids, limit)]
+
+    async def product_options(
+        self, keyword: str, developer_ids: Optional[list[int]] = None, limit: int = 50
+    ) -> List[Tuple[int, Optional[str]]]:
+        """Return ranked (product_id, product_name) pairs for select inputs."""
+        return await self._search("product", keyword, developer_ids, limit)
+
+    async def imvu_user_options(
+        self, keyword: str, developer_ids: Optional[list[int]] = None, limit: int = 50
+    ) -> List[Tuple[int, Optional[str]]]:
+        """Return ranked (user_id, user_name) pairs for select inputs."""
+        return await self._search("imvu_user", keyword, developer_ids, limit)
+
+    async def search_imvu_users(
+        self,
+        keyword: str,
+        developer_ids: Optional[list[int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[int]:
+        """Return ranked IMVU user ids matching `keyword` by name or id."""
+        return [oid for oid, _ in await self._search("imvu_user", keyword, developer_ids, limit)]
+
+    async def product_keyword_clause(self, keyword: Optional[str], developer_ids: Optional[list[int]] = None):
+        """Return the keyword predicate for product queries, or None without a keyword.
+
+        Matches become an id `IN` list; keywords too broad for that fall back to `ILIKE`.
+        """
+        kw = (keyword or "").strip()
+        if not kw:
+            return None
+        ids = await self.search_products(kw, developer_ids=developer_ids)
+        if len(ids) <= MAX_IN_FILTER:
+            return Product.product_id.in_(ids)
+        return or_(
+            Product.product_name.ilike(f"%{kw}%"),
+            cast(Product.product_id, String).ilike(f"%{kw}%"),
+        )
+
+    async def imvu_user_keyword_clause(self, keyword: Optional[str], developer_ids: Optional[list[int]] = None):
+        """Return the keyword predicate for IMVU user queries, or None without a keyword.
+
+        Matches become an id `IN` list; keywords too broad for that fall back to `ILIKE`.
+        """
+        kw = (keyword or "").strip()
+        if not kw:
+            return None
+        ids = await self.search_imvu_users(kw, developer_ids=developer_ids)
+        if len(ids) <= MAX_IN_FILTER:
+            return ImvuUser.user_id.in_(ids)
+        return or_(
+            ImvuUser.user_name.ilike(f"%{kw}%"),
+            cast(ImvuUser.user_id, String).ilike(f"%{kw}%"),
+        )
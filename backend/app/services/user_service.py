@@ -3,12 +3,20 @@ from __future__ import annotations
 from typing import Optional, List, Tuple
 from datetime import datetime
 
-from sqlalchemy import select, func, asc, desc, or_, cast, String
+from sqlalchemy import select, func, desc, or_, cast, String
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.pagination import fetch_page
+from app.core.sort_spec import SortSpec, model_fields
 from app.models import User
 
+SORT = SortSpec(
+    {**model_fields(User), "username": User.username, "id": User.id, "last_login": User.last_login_at},
+    default=(desc(User.created_at),),
+    snake_case=False,
+)
+
 
 class UserService:
     def __init__(self, session: AsyncSession) -> None:
@@ -127,49 +135,20 @@ class UserService:
                     )
                 )
 
-        order_cols = []
-        if orders:
-            special_map = {"username": "username", "id": "id", "last_login": "last_login_at"}
-            for o in orders:
-                if hasattr(o, "property"):
-                    prop = getattr(o, "property")
-                    direction = (getattr(o, "direction", None) or "ASC").upper()
-                else:
-                    prop = o.get("property")
-                    direction = (o.get("direction") or "ASC").upper()
-
-                if not prop:
-                    continue
-
-                mapped = special_map.get(prop)
-                col = None
-                if mapped:
-                    col = getattr(User, mapped, None)
-                else:
-                    col = getattr(User, prop, None)
-                if col is not None:
-                    order_cols.append(asc(col) if direction == "ASC" else desc(col))
-
-        if order_cols:
-            stmt = stmt.order_by(*order_cols)
-        else:
-            stmt = stmt.order_by(desc(User.created_at))
-
-        stmt = stmt.offset(offset).limit(per_page)
-        res = await self.session.execute(stmt)
-        items = res.scalars().all()
-
-        count_stmt = select(func.count()).select_from(User)
-        if keyword:
-            kw = keyword.strip()
-            if kw:
-                count_stmt = count_stmt.where(
-                    or_(
-                        User.username.ilike(f"%{kw}%"),
-                        cast(User.id, String).ilike(f"%{kw}%"),
+        order_cols, _ = SORT.order_by(orders)
+        stmt = stmt.order_by(*order_cols)
+
+        def count_stmt():
+            count = select(func.count()).select_from(User)
+            if keyword:
+                kw = keyword.strip()
+                if kw:
+                    count = count.where(
+                        or_(
+                            User.username.ilike(f"%{kw}%"),
+                            cast(User.id, String).ilike(f"%{kw}%"),
+                        )
                     )
-                )
+            return count
 
-        cnt_res = await self.session.execute(count_stmt)
-        total = int(cnt_res.scalar_one())
-        return items, total
+        return await fetch_page(self.session, stmt, count_stmt, offset=offset, limit=per_page, shape="scalars")
@@ -0,0 +1,93 @@
+"""Composite indexes for the developer-scoped list and analytics queries
+
+Every hot query filters `developer_user_id` and then groups, joins or sorts by
+another column; the single-column indexes left MySQL to pick one and filesort
+or scan the rest. Single-column indexes that are now a prefix of (or replaced
+by) a composite one are dropped so imports do not maintain both.
+
+The tables predate the migrations, so existing indexes are checked first and
+tables that do not exist yet are skipped (they get these indexes from the
+models when created).
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import context, op
+
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_SPEND = ("transaction_time", "paid_total_credits", "paid_credits", "paid_promo_credits")
+
+# (table, index, columns)
+INDEXES = (
+    ("income_transaction", "ix_income_transaction_developer_time", ("developer_user_id", "transaction_time")),
+    ("income_transaction", "ix_income_transaction_developer_buyer", ("developer_user_id", "buyer_user_id") + _SPEND),
+    (
+        "income_transaction",
+        "ix_income_transaction_developer_recipient",
+        ("developer_user_id", "recipient_user_id") + _SPEND,
+    ),
+    (
+        "income_transaction",
+        "ix_income_transaction_developer_product",
+        ("developer_user_id", "product_id", "transaction_time"),
+    ),
+    ("income_transaction", "ix_income_transaction_product_time", ("product_id", "transaction_time")),
+    ("imvu_user", "ix_imvu_user_developer_last_seen", ("developer_user_id", "last_seen_at")),
+    ("product", "ix_product_developer_name", ("developer_user_id", "product_name")),
+)
+
+# Superseded single-column indexes: (table, index, column)
+REPLACED = (
+    ("income_transaction", "ix_income_transaction_product_id", "product_id"),
+    ("imvu_user", "ix_imvu_user_developer_user_id", "developer_user_id"),
+    ("product", "ix_product_developer_user_id", "developer_user_id"),
+)
+
+
+def _existing() -> dict[str, set[str]] | None:
+    """Index names per existing table, or None when only emitting SQL (`--sql`)."""
+    if context.is_offline_mode():
+        return None
+    inspector = sa.inspect(op.get_bind())
+    return {table: {ix["name"] for ix in inspector.get_indexes(table)} for table in inspector.get_table_names()}
+
+
+def _has(existing: dict[str, set[str]] | None, table: str, index: str, default: bool) -> bool | None:
+    """Whether `index` exists; None when `table` does not exist."""
+    if existing is None:
+        return default
+    if table not in existing:
+        return None
+    return index in existing[table]
+
+
+def upgrade() -> None:
+    existing = _existing()
+    for table, index, columns in INDEXES:
+        if _has(existing, table, index, default=False) is False:
+            op.create_index(index, table, list(columns))
+    # only once the composite index that takes over is in place
+    for table, index, _ in REPLACED:
+        if _has(existing, table, index, default=True):
+            op.drop_index(index, table_name=table)
+
+
+def downgrade() -> None:
+    existing = _existing()
+    for table, index, column in REPLACED:
+        if _has(existing, table, index, default=False) is False:
+            op.create_index(index, table, [column])
+    for table, index, _ in reversed(INDEXES):
+        if _has(existing, table, index, default=True):
+            op.drop_index(index, table_name=table)
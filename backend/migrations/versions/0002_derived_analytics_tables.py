@@ -0,0 +1,170 @@
+"""Derived analytics tables written by imports
+
+`income_daily_rollup`, `income_daily_sketch` and `income_product_daily_sketch`
+are refreshed by income imports, `product_daily_metrics` and
+`product_daily_delta` by product imports. Until now only the rebuild scripts
+created them. Tables that already exist (created by those scripts) are left
+as they are; backfill with `scripts/rebuild_income_rollup.py` and
+`scripts/rebuild_product_metrics.py` afterwards.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import context, op
+
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Snapshot counters shared by product_daily_metrics and product_daily_delta
+_COUNTERS = (
+    "old_sales",
+    "new_sales",
+    "total_sales",
+    "derived_product_sales",
+    "direct_sales",
+    "indirect_sales",
+    "promoted_sales",
+    "cart_adds",
+    "wishlist_adds",
+    "organic_impressions",
+    "paid_impressions",
+)
+
+_CREDITS = (
+    "paid_credits",
+    "paid_promo_credits",
+    "paid_total_credits",
+    "income_credits",
+    "income_promo_credits",
+    "income_total_credits",
+)
+
+
+def _timestamp(name: str) -> sa.Column:
+    return sa.Column(name, sa.DateTime(timezone=True), nullable=False)
+
+
+def _counters() -> list[sa.Column]:
+    return [sa.Column(name, sa.BigInteger(), nullable=False) for name in _COUNTERS]
+
+
+def _create_income_daily_rollup() -> None:
+    op.create_table(
+        "income_daily_rollup",
+        sa.Column("developer_user_id", sa.BigInteger(), primary_key=True),
+        sa.Column("product_id", sa.BigInteger(), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("transaction_count", sa.Integer(), nullable=False),
+        sa.Column("gift_count", sa.Integer(), nullable=False),
+        *(sa.Column(name, sa.Numeric(18, 6), nullable=False) for name in _CREDITS),
+        _timestamp("updated_at"),
+    )
+    op.create_index("ix_income_daily_rollup_day", "income_daily_rollup", ["day"])
+
+
+def _create_income_daily_sketch() -> None:
+    op.create_table(
+        "income_daily_sketch",
+        sa.Column("developer_user_id", sa.BigInteger(), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("buyer_count", sa.Integer(), nullable=False),
+        sa.Column("recipient_count", sa.Integer(), nullable=False),
+        sa.Column("buyer_hll", sa.LargeBinary(), nullable=False),
+        sa.Column("recipient_hll", sa.LargeBinary(), nullable=False),
+        sa.Column("buyer_spend_sketch", sa.LargeBinary(), nullable=False),
+        _timestamp("updated_at"),
+    )
+    op.create_index("ix_income_daily_sketch_day", "income_daily_sketch", ["day"])
+
+
+def _create_income_product_daily_sketch() -> None:
+    op.create_table(
+        "income_product_daily_sketch",
+        sa.Column("developer_user_id", sa.BigInteger(), primary_key=True),
+        sa.Column("product_id", sa.BigInteger(), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("paid_sketch", sa.LargeBinary(), nullable=False),
+        _timestamp("updated_at"),
+    )
+    op.create_index("ix_income_product_daily_sketch_day", "income_product_daily_sketch", ["day"])
+
+
+def _create_product_daily_metrics() -> None:
+    op.create_table(
+        "product_daily_metrics",
+        sa.Column("product_id", sa.BigInteger(), primary_key=True),
+        sa.Column("snapshot_date", sa.Date(), primary_key=True),
+        sa.Column("developer_user_id", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "sync_record_id",
+            sa.Integer(),
+            sa.ForeignKey("data_sync_records.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("price", sa.Numeric(10, 2), nullable=False),
+        sa.Column("profit", sa.Numeric(10, 2), nullable=False),
+        sa.Column("visible", sa.Boolean(), nullable=False),
+        *_counters(),
+        _timestamp("created_at"),
+    )
+    op.create_index(
+        "ix_product_daily_metrics_developer_date", "product_daily_metrics", ["developer_user_id", "snapshot_date"]
+    )
+    op.create_index("ix_product_daily_metrics_sync_record_id", "product_daily_metrics", ["sync_record_id"])
+
+
+def _create_product_daily_delta() -> None:
+    op.create_table(
+        "product_daily_delta",
+        sa.Column("product_id", sa.BigInteger(), primary_key=True),
+        sa.Column("snapshot_date", sa.Date(), primary_key=True),
+        sa.Column("developer_user_id", sa.BigInteger(), nullable=False),
+        sa.Column("previous_date", sa.Date(), nullable=False),
+        sa.Column("span_days", sa.Integer(), nullable=False),
+        sa.Column("reset", sa.Boolean(), nullable=False),
+        *_counters(),
+        _timestamp("created_at"),
+    )
+    op.create_index(
+        "ix_product_daily_delta_developer_date", "product_daily_delta", ["developer_user_id", "snapshot_date"]
+    )
+
+
+# (table, creator), in creation order
+TABLES = (
+    ("income_daily_rollup", _create_income_daily_rollup),
+    ("income_daily_sketch", _create_income_daily_sketch),
+    ("income_product_daily_sketch", _create_income_product_daily_sketch),
+    ("product_daily_metrics", _create_product_daily_metrics),
+    ("product_daily_delta", _create_product_daily_delta),
+)
+
+
+def _existing_tables() -> set[str] | None:
+    """Existing table names, or None when only emitting SQL (`--sql`)."""
+    if context.is_offline_mode():
+        return None
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade() -> None:
+    existing = _existing_tables()
+    for table, create in TABLES:
+        if existing is None or table not in existing:
+            create()
+
+
+def downgrade() -> None:
+    existing = _existing_tables()
+    for table, _ in reversed(TABLES):
+        if existing is None or table in existing:
+            op.drop_table(table)
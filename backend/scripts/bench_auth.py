@@ -0,0 +1,90 @@
+"""Microbenchmark: per-request overhead of `AuthMiddleware`.
+
+Drives a minimal Starlette app directly through the ASGI interface (no network,
+no HTTP client) with and without the middleware and prints the mean time per
+request. Run from the `backend/` directory:
+
+    uv run python scripts/bench_auth.py [-n 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from starlette.applications import Starlette  # noqa: E402
+from starlette.middleware import Middleware  # noqa: E402
+from starlette.responses import PlainTextResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from app.security.jwt import create_access_token  # noqa: E402
+from app.security.middleware import AuthMiddleware  # noqa: E402
+
+
+async def _endpoint(request):
+    return PlainTextResponse("ok")
+
+
+def _scope(path: str, token: str | None) -> dict:
+    headers = [(b"host", b"bench")]
+    if token is not None:
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": headers,
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+
+
+async def _run(app, scope: dict, n: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        return None
+
+    # warm-up
+    for _ in range(min(200, n)):
+        await app(dict(scope), receive, send)
+
+    start = time.perf_counter()
+    for _ in range(n):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+async def main(n: int) -> None:
+    routes = [Route("/item", _endpoint), Route("/health", _endpoint)]
+    bare = Starlette(routes=routes)
+    guarded = Starlette(routes=routes, middleware=[Middleware(AuthMiddleware)])
+    token = create_access_token(1, "bench", developer_ids=[1])
+
+    bare_us = await _run(bare, _scope("/item", None), n)
+    public_us = await _run(guarded, _scope("/health", None), n)
+    auth_us = await _run(guarded, _scope("/item", token), n)
+
+    print(f"requests per case:          {n}")
+    print(f"no middleware:              {bare_us:8.1f} us/request")
+    print(f"public path:                {public_us:8.1f} us/request (+{public_us - bare_us:.1f})")
+    print(f"authenticated (same token): {auth_us:8.1f} us/request (+{auth_us - bare_us:.1f})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=20000, help="requests per case")
+    args = parser.parse_args()
+    asyncio.run(main(args.n))
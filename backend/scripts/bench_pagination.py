@@ -0,0 +1,169 @@
+"""Benchmark: list page + total with a separate COUNT query vs `COUNT(*) OVER ()`.
+
+Runs the list services' page queries in both `mysql.pagination_count` modes and
+prints mean / p50 / p95 latency per list. The query cache is bypassed, so every
+iteration reaches the database. Run from the `backend/` directory, against the
+configured MySQL database (read-only):
+
+    uv run python scripts/bench_pagination.py [-n 50] [--page 1] [--page-size 50] [--developer-id 123]
+
+or against a throwaway in-memory SQLite database seeded with N transactions:
+
+    uv run python scripts/bench_pagination.py --sqlite 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.core.config import get_settings  # noqa: E402
+from app.models import Base, Developer, ImvuUser, IncomeTransaction, Product  # noqa: E402
+from app.services.buyer_service import BuyerService  # noqa: E402
+from app.services.imvu_user_service import ImvuUserService  # noqa: E402
+from app.services.income_transaction_service import IncomeTransactionService  # noqa: E402
+from app.services.product_service import ProductService  # noqa: E402
+from app.services.recipient_service import RecipientService  # noqa: E402
+
+MODES = ("separate", "window")
+
+
+def _cases(page: int, per_page: int, developer_ids: list[int]):
+    # the uncached implementations, so that every call runs its queries
+    return [
+        ("product.list", lambda s: ProductService(s)._list_paginated(page, per_page, None, None, developer_ids)),
+        ("imvu_user.list", lambda s: ImvuUserService(s)._list_paginated(page, per_page, None, None, developer_ids)),
+        ("buyer.list", lambda s: BuyerService(s)._list_paginated(page, per_page, None, None, developer_ids)),
+        ("recipient.list", lambda s: RecipientService(s)._list_paginated(page, per_page, None, None, developer_ids)),
+        (
+            "income_transaction.list",
+            lambda s: IncomeTransactionService(s)._list_paginated_rows(
+                page, per_page, None, None, None, None, developer_ids
+            ),
+        ),
+    ]
+
+
+async def seed_sqlite(session_factory, engine, n_tx: int) -> None:
+    """Create the schema and insert `n_tx` synthetic transactions for one developer."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    rnd = random.Random(0)
+    t0 = datetime(2024, 1, 1)
+    n_users, n_products = max(10, n_tx // 20), max(5, n_tx // 500)
+    async with session_factory() as session:
+        await session.execute(insert(Developer), [{"developer_user_id": 1, "first_seen_at": t0, "last_seen_at": t0}])
+        await session.execute(
+            insert(ImvuUser),
+            [
+                {
+                    "user_id": 1000 + u,
+                    "user_name": f"user{u}",
+                    "first_seen_at": t0,
+                    "last_seen_at": t0 + timedelta(minutes=u),
+                    "developer_user_id": 1,
+                }
+                for u in range(n_users)
+            ],
+        )
+        await session.execute(
+            insert(Product),
+            [
+                {"product_id": 10 + p, "developer_user_id": 1, "product_name": f"product {p}", "price": 100, "visible": True}
+                for p in range(n_products)
+            ],
+        )
+        for start in range(0, n_tx, 20000):
+            rows = []
+            for t in range(start, min(start + 20000, n_tx)):
+                paid = rnd.randint(1, 500)
+                rows.append(
+                    {
+                        "transaction_id": t + 1,
+                        "transaction_time": t0 + timedelta(minutes=t),
+                        "product_id": 10 + rnd.randrange(n_products),
+                        "developer_user_id": 1,
+                        "buyer_user_id": 1000 + rnd.randrange(n_users),
+                        "recipient_user_id": 1000 + rnd.randrange(n_users),
+                        "paid_credits": paid,
+                        "paid_promo_credits": 0,
+                        "income_credits": paid,
+                        "income_promo_credits": 0,
+                        "paid_total_credits": paid,
+                        "income_total_credits": paid,
+                        "created_at": t0,
+                    }
+                )
+            await session.execute(insert(IncomeTransaction), rows)
+        await session.commit()
+
+
+async def _bench(session_factory, call, n: int) -> list[float]:
+    timings = []
+    for i in range(n + 2):
+        async with session_factory() as session:
+            started = time.perf_counter()
+            await call(session)
+            elapsed = time.perf_counter() - started
+        if i >= 2:  # warm-up
+            timings.append(elapsed * 1000)
+    return timings
+
+
+async def _total(session_factory, call) -> int:
+    async with session_factory() as session:
+        _, total = await call(session)
+    return total
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", type=int, default=50, help="iterations per list and mode")
+    parser.add_argument("--page", type=int, default=1)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--developer-id", type=int, action="append", help="developer scope (default: all)")
+    parser.add_argument("--sqlite", type=int, metavar="N", help="seed an in-memory SQLite database with N transactions")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    if args.sqlite:
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+        await seed_sqlite(session_factory, engine, args.sqlite)
+    else:
+        from app.core.db import SessionLocal, engine
+
+        session_factory = SessionLocal
+
+    developer_ids = args.developer_id
+    if not developer_ids:
+        async with session_factory() as session:
+            developer_ids = list((await session.execute(select(Developer.developer_user_id))).scalars().all())
+
+    print(f"{'list':<26}{'mode':<10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, call in _cases(args.page, args.page_size, developer_ids):
+        results = {}
+        for mode in MODES:
+            settings.mysql.pagination_count = mode
+            timings = sorted(await _bench(session_factory, call, args.n))
+            results[mode] = await _total(session_factory, call)
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            print(f"{name:<26}{mode:<10}{statistics.fmean(timings):>10.2f}{statistics.median(timings):>10.2f}{p95:>10.2f}")
+        if results["separate"] != results["window"]:
+            print(f"  note: totals differ ({results['separate']} vs {results['window']})")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,177 @@
+"""Check that the hot list/options/analytics queries use their composite indexes.
+
+Runs each query through its service (uncached) for one developer, captures the
+SQL it sends, and EXPLAINs it. Exits non-zero when an expected index does not
+appear in any of a query's plans. Run from the `backend/` directory after
+`alembic upgrade head`, against the configured MySQL database (read-only):
+
+    uv run python scripts/check_query_plans.py [--developer-id 123]
+
+The default developer is the one with the most transactions. Against a
+throwaway in-memory SQLite database seeded with N transactions (SQLite's
+planner differs from MySQL's, so treat this as a smoke test):
+
+    uv run python scripts/check_query_plans.py --sqlite 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import re
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import event, func, select, text  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.models import IncomeTransaction  # noqa: E402
+from app.services.buyer_service import BuyerService  # noqa: E402
+from app.services.imvu_user_service import ImvuUserService  # noqa: E402
+from app.services.income_analytics_service import IncomeAnalyticsService  # noqa: E402
+from app.services.options_index_service import _OptionsRegistry  # noqa: E402
+from app.services.product_service import ProductService  # noqa: E402
+from app.services.recipient_service import RecipientService  # noqa: E402
+from bench_pagination import seed_sqlite  # noqa: E402
+
+
+def _cases(developer_id: int, start, end):
+    ids = [developer_id]
+    options = _OptionsRegistry()
+    # (name, call, indexes that must appear in the plans of the statements it runs)
+    return [
+        (
+            "buyer.list",
+            lambda s: BuyerService(s)._list_paginated(1, 50, None, None, ids),
+            {"ix_income_transaction_developer_buyer"},
+        ),
+        (
+            "recipient.list",
+            lambda s: RecipientService(s)._list_paginated(1, 50, None, None, ids),
+            {"ix_income_transaction_developer_recipient"},
+        ),
+        (
+            "imvu_user.list",
+            lambda s: ImvuUserService(s)._list_paginated(1, 50, None, None, ids),
+            {"ix_imvu_user_developer_last_seen"},
+        ),
+        (
+            "product.list",
+            lambda s: ProductService(s)._list_paginated(1, 50, None, None, ids),
+            {"ix_income_transaction_product_time"},
+        ),
+        (
+            "product.options",
+            lambda s: options._build(s, "product", developer_id),
+            {"ix_income_transaction_developer_product"},
+        ),
+        (
+            "buyer.options",
+            lambda s: options._build(s, "buyer", developer_id),
+            {"ix_income_transaction_developer_buyer"},
+        ),
+        (
+            "recipient.options",
+            lambda s: options._build(s, "recipient", developer_id),
+            {"ix_income_transaction_developer_recipient"},
+        ),
+        (
+            "analytics.income.timeseries (hourly)",
+            lambda s: IncomeAnalyticsService(s)._transaction_rows(ids, start, end, True, None, None),
+            {"ix_income_transaction_developer_time"},
+        ),
+    ]
+
+
+async def _capture(engine, session_factory, call) -> list[tuple[str, object]]:
+    """Statements (and parameters) a service call sends to the database."""
+    statements: list[tuple[str, object]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        async with session_factory() as session:
+            await call(session)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+    return statements
+
+
+async def _used_indexes(engine, statements) -> set[str]:
+    used: set[str] = set()
+    sqlite = engine.dialect.name == "sqlite"
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            if sqlite:
+                res = await conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)
+                for row in res.mappings():
+                    used.update(re.findall(r"INDEX (\w+)", row["detail"]))
+            else:
+                res = await conn.exec_driver_sql("EXPLAIN " + statement, parameters)
+                used.update(row["key"] for row in res.mappings() if row["key"])
+    return used
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--developer-id", type=int, help="developer to query as (default: most transactions)")
+    parser.add_argument("--sqlite", type=int, metavar="N", help="seed an in-memory SQLite database with N transactions")
+    args = parser.parse_args()
+
+    if args.sqlite:
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+        await seed_sqlite(session_factory, engine, args.sqlite)
+        async with engine.begin() as conn:
+            await conn.execute(text("ANALYZE"))
+    else:
+        from app.core.db import SessionLocal, engine
+
+        session_factory = SessionLocal
+
+    async with session_factory() as session:
+        developer_id = args.developer_id
+        if developer_id is None:
+            developer_id = (
+                await session.execute(
+                    select(IncomeTransaction.developer_user_id)
+                    .group_by(IncomeTransaction.developer_user_id)
+                    .order_by(func.count().desc())
+                    .limit(1)
+                )
+            ).scalar_one_or_none()
+        last = (
+            await session.execute(
+                select(func.max(IncomeTransaction.transaction_time)).where(
+                    IncomeTransaction.developer_user_id == developer_id
+                )
+            )
+        ).scalar_one_or_none()
+    if developer_id is None or last is None:
+        print("no income transactions to check against")
+        await engine.dispose()
+        return 1
+
+    end = last.date()
+    start = end - timedelta(days=30)
+    failures = 0
+    print(f"developer {developer_id}, {engine.dialect.name}")
+    for name, call, expected in _cases(developer_id, start, end):
+        statements = await _capture(engine, session_factory, call)
+        used = await _used_indexes(engine, statements)
+        missing = expected - used
+        failures += bool(missing)
+        status = "ok" if not missing else "MISSING " + ", ".join(sorted(missing))
+        print(f"{name:<38}{status}")
+        print(f"{'':<38}uses: {', '.join(sorted(used)) or '(no index)'}")
+    await engine.dispose()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
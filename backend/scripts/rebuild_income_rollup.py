@@ -0,0 +1,46 @@
+"""Regenerate the income rollup and sketch analytics tables.
+
+Both are derived data: imports keep them up to date for the days they touch,
+and this script rebuilds them from `income_transaction` after a first deploy or a
+manual data fix. The tables are created by `alembic upgrade head`. Run from the
+`backend/` directory:
+
+    uv run python scripts/rebuild_income_rollup.py [--developer-id 123 ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.db import SessionLocal, engine, missing_tables  # noqa: E402
+from app.models import IncomeDailyRollup, IncomeDailySketch, IncomeProductDailySketch  # noqa: E402
+from app.services.income_rollup_service import IncomeRollupService  # noqa: E402
+from app.services.income_sketch_service import IncomeSketchService  # noqa: E402
+
+
+async def main(developer_ids: list[int] | None) -> None:
+    missing = await missing_tables(
+        IncomeDailyRollup.__tablename__, IncomeDailySketch.__tablename__, IncomeProductDailySketch.__tablename__
+    )
+    if missing:
+        await engine.dispose()
+        raise SystemExit(f"missing tables {', '.join(missing)}; run `alembic upgrade head` first")
+
+    async with SessionLocal() as session:
+        await IncomeRollupService(session).rebuild(developer_ids)
+        await IncomeSketchService(session).rebuild(developer_ids)
+
+    await engine.dispose()
+    print("income rollup and sketches rebuilt" + (f" for developers {developer_ids}" if developer_ids else ""))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--developer-id", type=int, action="append", dest="developer_ids")
+    args = parser.parse_args()
+    asyncio.run(main(args.developer_ids))
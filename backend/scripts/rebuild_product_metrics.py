@@ -0,0 +1,61 @@
+"""Backfill `product_daily_metrics` and `product_daily_delta`.
+
+Product imports write typed metrics and deltas as they go; this script converts snapshots
+imported before that, one sync record at a time in upload order. The tables are created
+by `alembic upgrade head`. Run from the `backend/` directory:
+
+    uv run python scripts/rebuild_product_metrics.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import select  # noqa: E402
+
+from app.core.db import SessionLocal, engine, missing_tables  # noqa: E402
+from app.models import ProductDailyDelta, ProductDailyMetrics, RawProductList  # noqa: E402
+from app.services.data_sync_product_delta_service import DataSyncProductDeltaService  # noqa: E402
+from app.services.data_sync_product_metrics_service import COUNTER_FIELDS, DataSyncProductMetricsService  # noqa: E402
+
+RAW_FIELDS = ("developer_id", "product_id", "price", "profit", "visible", *COUNTER_FIELDS)
+
+
+async def main() -> None:
+    missing = await missing_tables(ProductDailyMetrics.__tablename__, ProductDailyDelta.__tablename__)
+    if missing:
+        await engine.dispose()
+        raise SystemExit(f"missing tables {', '.join(missing)}; run `alembic upgrade head` first")
+
+    async with SessionLocal() as session:
+        res = await session.execute(
+            select(RawProductList.sync_record_id, RawProductList.snapshot_date)
+            .distinct()
+            .order_by(RawProductList.sync_record_id)
+        )
+        snapshots = res.tuples().all()
+
+        svc = DataSyncProductMetricsService(session)
+        delta_svc = DataSyncProductDeltaService(session)
+        for sync_record_id, snapshot_date in snapshots:
+            res = await session.execute(
+                select(*(getattr(RawProductList, f) for f in RAW_FIELDS)).where(
+                    RawProductList.sync_record_id == sync_record_id,
+                    RawProductList.snapshot_date == snapshot_date,
+                )
+            )
+            records = [dict(zip(RAW_FIELDS, row)) for row in res.tuples().all()]
+            metrics = await svc.upsert_snapshot(sync_record_id=sync_record_id, snapshot_date=snapshot_date, records=records)
+            await delta_svc.refresh_snapshot(snapshot_date=snapshot_date, product_ids=[m.product_id for m in metrics])
+            await session.commit()
+            print(f"sync record {sync_record_id} ({snapshot_date}): {len(records)} products")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())